@@ -0,0 +1,118 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, Dict, AsyncIterator
+
+import aiohttp
+from yarl import URL
+
+from app.settings.config import env
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+HOST_LIMITS: Dict[str, int] = {
+    "api.coingecko.com": 2,
+    "pay.crypt.bot": 10,
+    "testnet-pay.crypt.bot": 10,
+    "api.yookassa.ru": 10,
+}
+
+_session: Optional[aiohttp.ClientSession] = None
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+@dataclass
+class HostMetrics:
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'avg_latency_ms': round(self.avg_latency * 1000, 1),
+            'max_latency_ms': round(self.max_latency * 1000, 1),
+        }
+
+
+_metrics: Dict[str, HostMetrics] = {}
+
+
+async def init_http():
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=env.HTTP_POOL_SIZE,
+            limit_per_host=env.HTTP_LIMIT_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=env.HTTP_TIMEOUT_SECONDS, connect=10),
+        )
+        LOG.info("HTTP client pool started")
+
+
+def get_session() -> aiohttp.ClientSession:
+    if _session is None or _session.closed:
+        raise RuntimeError("HTTP client not initialized. Call init_http() first.")
+    return _session
+
+
+async def close_http():
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+        LOG.info(f"HTTP client pool closed, stats: {get_http_metrics()}")
+
+
+def _get_semaphore(host: str) -> asyncio.Semaphore:
+    semaphore = _semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(HOST_LIMITS.get(host, env.HTTP_LIMIT_PER_HOST))
+        _semaphores[host] = semaphore
+    return semaphore
+
+
+@asynccontextmanager
+async def request(method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+    host = URL(url).host or "unknown"
+    metrics = _metrics.setdefault(host, HostMetrics())
+    session = get_session()
+
+    async with _get_semaphore(host):
+        metrics.in_flight += 1
+        started = time.monotonic()
+        failed = False
+        try:
+            async with session.request(method, url, **kwargs) as resp:
+                failed = resp.status >= 500
+                yield resp
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            metrics.in_flight -= 1
+            metrics.requests += 1
+            metrics.total_latency += elapsed
+            metrics.max_latency = max(metrics.max_latency, elapsed)
+            if failed:
+                metrics.errors += 1
+
+
+def get_http_metrics() -> Dict[str, dict]:
+    return {host: m.as_dict() for host, m in _metrics.items()}
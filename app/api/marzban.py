@@ -1,13 +1,81 @@
-from typing import Optional, List, Dict, Tuple
+from http import HTTPStatus
+from typing import Optional, List, Dict, Tuple, Union
 from dataclasses import dataclass, field
+import aiohttp
 from aiomarzban import MarzbanAPI, UserDataLimitResetStrategy
+from aiomarzban.exceptions import MarzbanException, MarzbanNotFoundException
 
+from app.api import http_client
 from app.settings.log import get_logger
 from app.settings.config import env
 
 LOG = get_logger(__name__)
 
 
+class PooledMarzbanAPI(MarzbanAPI):
+    async def _async_request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[dict] = None,
+        not_json_data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        api_url: Optional[str] = None,
+        timeout: Optional[int] = None,
+        allow_empty_headers: Optional[bool] = False,
+        _retried: bool = False,
+    ) -> Union[dict, int, list, None]:
+        if headers is None and self.headers is None and not allow_empty_headers:
+            await self.refresh_credentials()
+
+        async with http_client.request(
+            method,
+            (api_url or self.api_url) + path,
+            json=data,
+            data=not_json_data,
+            headers=headers or self.headers,
+            params=params,
+            ssl=False,
+            timeout=aiohttp.ClientTimeout(total=timeout or self.timeout),
+        ) as resp:
+            ans = await resp.json()
+            if HTTPStatus.OK <= resp.status <= HTTPStatus.IM_USED:
+                return ans
+
+            if resp.status == HTTPStatus.UNAUTHORIZED:
+                error = ans.get("detail")
+                if error == "Incorrect username or password":
+                    raise MarzbanException(error)
+                if error != "Could not validate credentials" or _retried:
+                    raise MarzbanException(f"Auth error: {error}")
+
+            elif resp.status == HTTPStatus.NOT_FOUND:
+                raise MarzbanNotFoundException(await resp.text())
+
+            else:
+                raise Exception(f"Error: {resp.status}; Body: {await resp.text()}; Data: {data}")
+
+        # the per-host slot is released here, so refreshing cannot wait on ourselves
+        await self.refresh_credentials()
+        return await self._async_request(
+            method, path,
+            data=data,
+            not_json_data=not_json_data,
+            params=params,
+            api_url=api_url,
+            timeout=timeout,
+            allow_empty_headers=allow_empty_headers,
+            _retried=True,
+        )
+
+    async def close(self) -> None:
+        pass
+
+
+_api_cache: Dict[str, MarzbanAPI] = {}
+
+
 @dataclass
 class MarzbanInstance:
     id: str = "default"
@@ -47,7 +115,7 @@ class NodeLoadMetrics:
 
 class MarzbanClient:
     def __init__(self):
-        self._instances_cache: Dict[str, MarzbanAPI] = {}
+        self._instances_cache = _api_cache
         self._instance = MarzbanInstance()
 
     def _get_active_instances(self) -> List[MarzbanInstance]:
@@ -55,7 +123,7 @@ class MarzbanClient:
 
     def _get_or_create_api(self, instance: MarzbanInstance) -> MarzbanAPI:
         if instance.id not in self._instances_cache:
-            self._instances_cache[instance.id] = MarzbanAPI(
+            self._instances_cache[instance.id] = PooledMarzbanAPI(
                 address=instance.base_url,
                 username=instance.username,
                 password=instance.password,
@@ -0,0 +1,92 @@
+import uuid
+from typing import Optional
+
+import aiohttp
+
+from app.api import http_client
+from app.settings.config import env
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+
+class YooKassaError(Exception):
+    def __init__(self, status: int, body: dict):
+        self.status = status
+        self.body = body
+        super().__init__(f"YooKassa API error {status}: {body.get('description') or body}")
+
+
+class YooKassaAPI:
+    BASE_URL = "https://api.yookassa.ru/v3"
+
+    def __init__(self, shop_id: str, secret_key: str, timeout: int = 30):
+        self.shop_id = shop_id
+        self._auth = aiohttp.BasicAuth(str(shop_id), secret_key)
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        json: Optional[dict] = None,
+        idempotency_key: Optional[str] = None
+    ) -> dict:
+        headers = {}
+        if method == "POST":
+            headers["Idempotence-Key"] = idempotency_key or str(uuid.uuid4())
+
+        async with http_client.request(
+            method,
+            f"{self.BASE_URL}{path}",
+            json=json,
+            headers=headers,
+            auth=self._auth,
+            timeout=self._timeout,
+        ) as resp:
+            data = await resp.json(content_type=None)
+            if resp.status >= 400:
+                raise YooKassaError(resp.status, data or {})
+            return data
+
+    async def create_payment(self, payment_data: dict, idempotency_key: Optional[str] = None) -> dict:
+        return await self._request("POST", "/payments", json=payment_data, idempotency_key=idempotency_key)
+
+    async def find_payment(self, payment_id: str) -> dict:
+        return await self._request("GET", f"/payments/{payment_id}")
+
+    async def cancel_payment(self, payment_id: str, idempotency_key: Optional[str] = None) -> dict:
+        return await self._request("POST", f"/payments/{payment_id}/cancel", json={}, idempotency_key=idempotency_key)
+
+
+_api: Optional[YooKassaAPI] = None
+
+
+def get_yookassa_api() -> YooKassaAPI:
+    global _api
+    if _api is None:
+        if env.YOOKASSA_T:
+            shop_id = env.YOOKASSA_ID_T
+            secret_key = env.YOOKASSA_KEY_T
+            mode = "TESTNET"
+
+            if not shop_id or not secret_key:
+                raise ValueError(
+                    "YOOKASSA_ID_T and YOOKASSA_KEY_T must be configured in .env "
+                    "when YOOKASSA_T=true"
+                )
+        else:
+            shop_id = env.YOOKASSA_ID
+            secret_key = env.YOOKASSA_KEY
+            mode = "PRODUCTION"
+
+            if not shop_id or not secret_key:
+                raise ValueError(
+                    "YOOKASSA_ID and YOOKASSA_KEY must be configured in .env "
+                    "when YOOKASSA_T=false"
+                )
+
+        _api = YooKassaAPI(shop_id, secret_key, timeout=30)
+        LOG.info(f"YooKassa configured successfully in {mode} mode (shop_id: {shop_id}, timeout=30s)")
+
+    return _api
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.db import Ban
+from app.settings.log import get_logger
+from .base import BaseRepository
+
+LOG = get_logger(__name__)
+
+BANS_KEY = "bans:set"
+BANS_READY_KEY = "bans:ready"
+BANS_CHANNEL = "bans:events"
+
+
+class BanRepository(BaseRepository):
+    async def ban(
+        self,
+        tg_id: int,
+        reason: Optional[str] = None,
+        minutes: Optional[int] = None,
+        banned_by: Optional[int] = None
+    ):
+        expires_at = datetime.utcnow() + timedelta(minutes=minutes) if minutes else None
+        stmt = insert(Ban).values(
+            tg_id=tg_id,
+            reason=reason,
+            banned_by=banned_by,
+            created_at=datetime.utcnow(),
+            expires_at=expires_at
+        )
+        await self.session.execute(stmt.on_conflict_do_update(
+            index_elements=[Ban.tg_id],
+            set_={'reason': stmt.excluded.reason, 'banned_by': stmt.excluded.banned_by,
+                  'created_at': stmt.excluded.created_at, 'expires_at': stmt.excluded.expires_at}
+        ))
+        await self.session.commit()
+
+        redis = await self.get_redis()
+        pipe = redis.pipeline()
+        pipe.sadd(BANS_KEY, tg_id)
+        pipe.publish(BANS_CHANNEL, f"ban:{tg_id}")
+        await pipe.execute()
+        LOG.info(f"User {tg_id} banned (reason={reason}, expires_at={expires_at}, by={banned_by})")
+
+    async def unban(self, tg_id: int) -> bool:
+        result = await self.session.execute(delete(Ban).where(Ban.tg_id == tg_id))
+        await self.session.commit()
+
+        redis = await self.get_redis()
+        pipe = redis.pipeline()
+        pipe.srem(BANS_KEY, tg_id)
+        pipe.publish(BANS_CHANNEL, f"unban:{tg_id}")
+        await pipe.execute()
+        LOG.info(f"User {tg_id} unbanned")
+        return result.rowcount > 0
+
+    async def get_active_ids(self) -> List[int]:
+        now = datetime.utcnow()
+        result = await self.session.execute(
+            select(Ban.tg_id).where((Ban.expires_at == None) | (Ban.expires_at > now))
+        )
+        return [row[0] for row in result.all()]
+
+    async def get_expired_ids(self) -> List[int]:
+        result = await self.session.execute(
+            select(Ban.tg_id).where(Ban.expires_at <= datetime.utcnow())
+        )
+        return [row[0] for row in result.all()]
+
+    async def sync_redis(self) -> int:
+        ids = await self.get_active_ids()
+        redis = await self.get_redis()
+        pipe = redis.pipeline()
+        pipe.delete(BANS_KEY)
+        if ids:
+            pipe.sadd(BANS_KEY, *ids)
+        pipe.set(BANS_READY_KEY, 1)
+        pipe.publish(BANS_CHANNEL, "reload")
+        await pipe.execute()
+        return len(ids)
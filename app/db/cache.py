@@ -1,7 +1,7 @@
 import os
 import redis.asyncio as redis
 from functools import wraps
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 from app.settings.log import get_logger
 
 LOG = get_logger(__name__)
@@ -15,6 +15,7 @@ class CacheTTL:
     LANG = 86400
     NOTIFICATIONS = 3600
     NODE_METRICS = 120
+    QR_FILE_ID = 2592000
 
 
 async def init_cache():
@@ -95,4 +96,16 @@ async def set_cache(key: str, value: str, ttl: Optional[int] = None) -> Optional
 @safe_redis
 async def get_cache(key: str) -> Optional[str]:
     redis = await get_redis()
-    return await redis.get(key)
\ No newline at end of file
+    return await redis.get(key)
+
+
+@safe_redis
+async def set_user_balances(balances: Dict[int, Any]) -> None:
+    if not balances:
+        return
+
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for tg_id, balance in balances.items():
+        pipe.setex(f"user:{tg_id}:balance", CacheTTL.BALANCE, str(balance))
+    await pipe.execute()
\ No newline at end of file
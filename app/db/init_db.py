@@ -1,13 +1,42 @@
+from sqlalchemy import text
+
 from app.db.db import engine, Base
 from app.settings.log import get_logger
 
 LOG = get_logger(__name__)
 
+DEDUPE_TX_HASHES = text("""
+    UPDATE payments p
+    SET tx_hash = p.tx_hash || ':dup:' || p.id
+    FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY tx_hash ORDER BY (status = 'confirmed') DESC, id
+        ) AS rn
+        FROM payments
+        WHERE tx_hash IS NOT NULL
+    ) ranked
+    WHERE ranked.id = p.id AND ranked.rn > 1
+""")
+
+
+async def _ensure_unique_tx_hash(conn):
+    exists = await conn.scalar(text("SELECT to_regclass('uq_payments_tx_hash') IS NOT NULL"))
+    if exists:
+        # databases created while the model also declared unique=True carry a second index
+        await conn.execute(text("ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_tx_hash_key"))
+        return
+
+    result = await conn.execute(DEDUPE_TX_HASHES)
+    if result.rowcount:
+        LOG.warning(f"Renamed {result.rowcount} duplicate payments.tx_hash value(s) before adding the unique index")
+    await conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_payments_tx_hash ON payments (tx_hash)"))
+
 
 async def init_database():
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await _ensure_unique_tx_hash(conn)
         LOG.info("Database tables initialized successfully")
     except Exception as e:
         LOG.error(f"Error initializing database: {e}")
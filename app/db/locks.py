@@ -0,0 +1,17 @@
+# Owner-checked operations on Redis lock keys. The value stored under a lock key
+# identifies its holder, so a holder whose lease already expired cannot release
+# or extend a lock that now belongs to someone else.
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from app.models.db import NotificationOutbox
+from app.settings.log import get_logger
+from .base import BaseRepository
+
+LOG = get_logger(__name__)
+
+
+def enqueue_notification(session, tg_id: int, kind: str, lang: Optional[str] = None, payload: Optional[dict] = None):
+    session.add(NotificationOutbox(
+        tg_id=tg_id,
+        kind=kind,
+        lang=lang or 'ru',
+        payload=payload or {},
+        status='pending',
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    ))
+
+
+class OutboxRepository(BaseRepository):
+    async def claim_due(self, limit: int = 50, inflight_seconds: float = 600) -> List[NotificationOutbox]:
+        # rows left in 'sending' past their deadline belong to a dispatcher that died mid-batch
+        now = datetime.utcnow()
+        result = await self.session.execute(
+            select(NotificationOutbox)
+            .where(
+                NotificationOutbox.status.in_(['pending', 'sending']),
+                NotificationOutbox.next_attempt_at <= now
+            )
+            .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        items = list(result.scalars().all())
+        for item in items:
+            item.status = 'sending'
+            item.next_attempt_at = now + timedelta(seconds=inflight_seconds)
+        return items
+
+    def mark_sent(self, item: NotificationOutbox):
+        item.status = 'sent'
+        item.sent_at = datetime.utcnow()
+        item.attempts += 1
+        item.last_error = None
+
+    def mark_retry(self, item: NotificationOutbox, error: str, delay_seconds: float, max_attempts: int):
+        item.attempts += 1
+        item.last_error = error[:1000]
+        if item.attempts >= max_attempts:
+            item.status = 'failed'
+            LOG.error(f"Notification {item.id} ({item.kind}) to {item.tg_id} failed after {item.attempts} attempts: {error}")
+        else:
+            item.status = 'pending'
+            item.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+
+    def postpone(self, item: NotificationOutbox, delay_seconds: float):
+        item.status = 'pending'
+        item.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+
+    def mark_dropped(self, item: NotificationOutbox, error: str):
+        item.status = 'failed'
+        item.attempts += 1
+        item.last_error = error[:1000]
@@ -1,11 +1,14 @@
 from decimal import Decimal
-from typing import Optional, List, Dict, Union
+from typing import Optional, List, Dict, Union, Tuple
 from datetime import datetime, timedelta
-import asyncio
-from sqlalchemy import select, update
-
-from app.payments.models import PaymentMethod
-from app.models.db import Payment as PaymentModel, TonTransaction
+from sqlalchemy import select, update, values, column, func, Integer, Text
+from sqlalchemy.exc import IntegrityError
+
+from app.payments.models import PaymentMethod, ConfirmedPayment
+from app.models.db import Payment as PaymentModel, TonTransaction, User
+from app.db.cache import set_user_balances
+from app.db.outbox import enqueue_notification
+from app.settings.utils.notifications import NotificationKind
 from app.settings.log import get_logger
 from .base import BaseRepository
 from app.settings.config import env
@@ -43,6 +46,113 @@ class PaymentRepository(BaseRepository):
         await self.session.refresh(payment)
         return payment.id
 
+    async def reserve_payment(
+        self,
+        tg_id: int,
+        method: str,
+        amount: Decimal,
+        currency: str,
+        comment: Optional[str] = None,
+        expected_crypto_amount: Optional[Decimal] = None
+    ) -> Tuple[int, List[Dict]]:
+        try:
+            result = await self.session.execute(
+                select(User.tg_id).where(User.tg_id == tg_id).with_for_update()
+            )
+            if result.scalar_one_or_none() is None:
+                raise ValueError(f"User {tg_id} not found")
+
+            superseded = await self.session.execute(
+                update(PaymentModel).where(
+                    PaymentModel.tg_id == tg_id,
+                    PaymentModel.status == 'reserved'
+                ).values(status='cancelled')
+            )
+            if superseded.rowcount:
+                LOG.info(f"Superseded {superseded.rowcount} in-flight reservation(s) of user {tg_id}")
+
+            result = await self.session.execute(
+                select(PaymentModel).where(
+                    PaymentModel.tg_id == tg_id,
+                    PaymentModel.status == 'pending',
+                    PaymentModel.expires_at > datetime.utcnow()
+                ).with_for_update()
+            )
+            active_payments = [p.__dict__ for p in result.scalars().all()]
+
+            payment = PaymentModel(
+                tg_id=tg_id,
+                method=method,
+                amount=amount,
+                currency=currency,
+                status='reserved',
+                comment=comment,
+                expected_crypto_amount=expected_crypto_amount
+            )
+            self.session.add(payment)
+            await self.session.flush()
+            payment_id = payment.id
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+
+        return payment_id, active_payments
+
+    async def finalize_payment(self, payment_id: int, extra_data: Optional[dict] = None) -> bool:
+        fields = {
+            'status': 'pending',
+            'expires_at': datetime.utcnow() + timedelta(minutes=env.PAYMENT_TIMEOUT_MINUTES),
+        }
+        if extra_data:
+            fields['extra_data'] = extra_data
+
+        owner = select(PaymentModel.tg_id).where(PaymentModel.id == payment_id).scalar_subquery()
+        await self.session.execute(select(User.tg_id).where(User.tg_id == owner).with_for_update())
+
+        stmt = update(PaymentModel).where(
+            PaymentModel.id == payment_id,
+            PaymentModel.status == 'reserved'
+        ).values(**fields)
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def revive_reservation(self, payment_id: int, extra_data: Optional[dict] = None) -> bool:
+        fields = {
+            'status': 'pending',
+            'expires_at': datetime.utcnow() + timedelta(minutes=env.PAYMENT_TIMEOUT_MINUTES),
+        }
+        if extra_data:
+            fields['extra_data'] = extra_data
+
+        stmt = update(PaymentModel).where(
+            PaymentModel.id == payment_id,
+            PaymentModel.status.in_(['reserved', 'failed', 'cancelled'])
+        ).values(**fields)
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def release_reservation(self, payment_id: int, status: str = 'failed') -> bool:
+        stmt = update(PaymentModel).where(
+            PaymentModel.id == payment_id,
+            PaymentModel.status == 'reserved'
+        ).values(status=status)
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def sweep_stale_reservations(self, max_age_minutes: int = 5) -> int:
+        threshold = datetime.utcnow() - timedelta(minutes=max_age_minutes)
+        stmt = update(PaymentModel).where(
+            PaymentModel.status == 'reserved',
+            PaymentModel.created_at < threshold
+        ).values(status='failed')
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount
+
     async def get_payment(self, payment_id: int) -> Optional[Dict]:
         result = await self.session.execute(select(PaymentModel).where(PaymentModel.id == payment_id))
         payment = result.scalar_one_or_none()
@@ -137,6 +247,153 @@ class PaymentRepository(BaseRepository):
         )
         return result.scalar_one_or_none()
 
+    async def _confirm_batch(
+        self,
+        paid: Dict[int, str],
+        allow_expired: bool = True,
+        notify: bool = True
+    ) -> List[ConfirmedPayment]:
+        now = datetime.utcnow()
+        statuses = ['pending', 'expired'] if allow_expired else ['pending']
+
+        paid_values = values(
+            column('id', Integer), column('tx_hash', Text), name='paid'
+        ).data(list(paid.items()))
+
+        confirmed = (
+            update(PaymentModel)
+            .where(
+                PaymentModel.id == paid_values.c.id,
+                PaymentModel.status.in_(statuses),
+                PaymentModel.tx_hash == None
+            )
+            .values(status='confirmed', tx_hash=paid_values.c.tx_hash, confirmed_at=now)
+            .returning(PaymentModel.id, PaymentModel.tg_id, PaymentModel.amount, PaymentModel.tx_hash)
+            .cte('confirmed')
+        )
+        credits = (
+            select(confirmed.c.tg_id, func.sum(confirmed.c.amount).label('amount'))
+            .group_by(confirmed.c.tg_id)
+            .subquery('credits')
+        )
+        credited = (
+            update(User)
+            .where(User.tg_id == credits.c.tg_id)
+            .values(balance=User.balance + credits.c.amount)
+            .returning(User.tg_id, User.balance, User.lang, User.subscription_end)
+            .cte('credited')
+        )
+
+        result = await self.session.execute(
+            select(
+                confirmed.c.id, confirmed.c.tg_id, confirmed.c.amount, confirmed.c.tx_hash,
+                credited.c.balance, credited.c.lang, credited.c.subscription_end
+            ).join(credited, credited.c.tg_id == confirmed.c.tg_id)
+        )
+
+        confirmed = [
+            ConfirmedPayment(
+                payment_id=row.id,
+                tg_id=row.tg_id,
+                amount=row.amount,
+                tx_hash=row.tx_hash,
+                balance=row.balance,
+                lang=row.lang or 'ru',
+                has_active_subscription=bool(row.subscription_end and row.subscription_end > now)
+            )
+            for row in result.all()
+        ]
+
+        if notify:
+            for c in confirmed:
+                enqueue_notification(
+                    self.session, c.tg_id, NotificationKind.PAYMENT_SUCCESS, c.lang,
+                    {'amount': str(c.amount), 'has_active_subscription': c.has_active_subscription}
+                )
+
+        return confirmed
+
+    async def _after_confirm(self, confirmed: List[ConfirmedPayment]):
+        for c in confirmed:
+            LOG.info(f"Payment confirmed: id={c.payment_id}, user={c.tg_id}, amount={c.amount}, "
+                     f"balance={c.balance}, tx_hash={c.tx_hash}")
+        await set_user_balances({c.tg_id: c.balance for c in confirmed})
+
+    async def confirm_payments(
+        self,
+        paid: Dict[int, str],
+        allow_expired: bool = True,
+        notify: bool = True
+    ) -> List[ConfirmedPayment]:
+        if not paid:
+            return []
+
+        try:
+            confirmed = await self._confirm_batch(paid, allow_expired, notify)
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            if len(paid) == 1:
+                LOG.warning(f"Transaction already used, skipping confirmation: {paid}")
+                return []
+
+            confirmed = []
+            for payment_id, tx_hash in paid.items():
+                confirmed += await self.confirm_payments({payment_id: tx_hash}, allow_expired, notify)
+            return confirmed
+        except Exception as e:
+            await self.session.rollback()
+            LOG.error(f"Error confirming payments {list(paid)}: {type(e).__name__}: {e}")
+            return []
+
+        await self._after_confirm(confirmed)
+        return confirmed
+
+    async def confirm_ton_matches(self, payment_ids: Optional[List[int]] = None) -> List[ConfirmedPayment]:
+        query = (
+            select(PaymentModel.id, TonTransaction.tx_hash)
+            .join(TonTransaction, TonTransaction.comment == PaymentModel.comment)
+            .where(
+                TonTransaction.processed_at == None,
+                PaymentModel.method == PaymentMethod.TON.value,
+                PaymentModel.status.in_(['pending', 'expired']),
+                PaymentModel.tx_hash == None,
+                TonTransaction.amount >= PaymentModel.expected_crypto_amount * Decimal("0.95")
+            )
+            .order_by(PaymentModel.id, TonTransaction.created_at.desc())
+            .with_for_update(of=[PaymentModel, TonTransaction], skip_locked=True)
+        )
+        if payment_ids:
+            query = query.where(PaymentModel.id.in_(payment_ids))
+
+        try:
+            result = await self.session.execute(query)
+
+            paid: Dict[int, str] = {}
+            for payment_id, tx_hash in result.all():
+                if payment_id not in paid and tx_hash not in paid.values():
+                    paid[payment_id] = tx_hash
+
+            if not paid:
+                await self.session.rollback()
+                return []
+
+            await self.session.execute(
+                update(TonTransaction)
+                .where(TonTransaction.tx_hash.in_(list(paid.values())))
+                .values(processed_at=datetime.utcnow())
+            )
+            confirmed = await self._confirm_batch(paid, allow_expired=True)
+            await self.session.commit()
+
+        except Exception as e:
+            await self.session.rollback()
+            LOG.error(f"Error confirming TON matches: {type(e).__name__}: {e}")
+            return []
+
+        await self._after_confirm(confirmed)
+        return confirmed
+
     async def is_tx_hash_already_used(self, tx_hash: str) -> bool:
         result = await self.session.execute(
             select(PaymentModel).where(
@@ -167,9 +424,9 @@ class PaymentRepository(BaseRepository):
                 yookassa_payment_id = extra_data.get('yookassa_payment_id')
                 if yookassa_payment_id:
                     try:
-                        from yookassa import Payment as YooKassaPayment
-                        yookassa_payment = await asyncio.to_thread(YooKassaPayment.find_one, yookassa_payment_id)
-                        if yookassa_payment and getattr(yookassa_payment, "status", None) == 'succeeded':
+                        from app.api.yookassa import get_yookassa_api
+                        yookassa_payment = await get_yookassa_api().find_payment(yookassa_payment_id)
+                        if yookassa_payment and yookassa_payment.get("status") == 'succeeded':
                             LOG.warning(f"Cannot cancel payment {payment_id}: already succeeded in YooKassa")
                             return False
                     except Exception as e:
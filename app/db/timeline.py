@@ -0,0 +1,117 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.db.cache import get_redis
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+TIMELINE_KEY = "timeline:expiry"
+
+NOTIFY_3D = "3d"
+NOTIFY_1D = "1d"
+RENEWAL = "renew"
+EXPIRED = "expired"
+CLEANUP = "cleanup"
+
+CLEANUP_AFTER_DAYS = 14
+
+# milestone -> (offset from subscription end, how long past due it is still worth firing)
+MILESTONES: Dict[str, Tuple[float, Optional[float]]] = {
+    NOTIFY_3D: (-3 * 86400, 2 * 86400),
+    NOTIFY_1D: (-86400, 86400),
+    RENEWAL: (-6 * 3600, 6 * 3600),
+    EXPIRED: (0, 86400),
+    CLEANUP: (CLEANUP_AFTER_DAYS * 86400, None),
+}
+
+POP_DUE_SCRIPT = """
+if KEYS[2] and redis.call('GET', KEYS[2]) ~= ARGV[3] then
+    return false
+end
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #items > 0 then
+    redis.call('ZREM', KEYS[1], unpack(items))
+end
+return items
+"""
+
+_pop_due = None
+
+
+def member(kind: str, tg_id: int) -> str:
+    return f"{kind}:{tg_id}"
+
+
+def parse_member(value: str) -> Tuple[str, int]:
+    kind, tg_id = value.split(":", 1)
+    return kind, int(tg_id)
+
+
+def due_at(kind: str, end_ts: float) -> float:
+    return end_ts + MILESTONES[kind][0]
+
+
+def is_stale(kind: str, end_ts: float, now: float) -> bool:
+    grace = MILESTONES[kind][1]
+    return grace is not None and now - due_at(kind, end_ts) > grace
+
+
+def milestones(end_ts: float, now: Optional[float] = None) -> Dict[str, float]:
+    now = now or time.time()
+    return {kind: due_at(kind, end_ts) for kind in MILESTONES if not is_stale(kind, end_ts, now)}
+
+
+async def schedule_expiry(tg_id: int, end_ts: Optional[float], pipe=None):
+    redis = await get_redis()
+    own_pipe = pipe is None
+    if own_pipe:
+        pipe = redis.pipeline(transaction=False)
+
+    if end_ts is None:
+        pipe.zrem(TIMELINE_KEY, *(member(kind, tg_id) for kind in MILESTONES))
+    else:
+        due = milestones(end_ts)
+        stale = [member(kind, tg_id) for kind in MILESTONES if kind not in due]
+        if due:
+            pipe.zadd(TIMELINE_KEY, {member(kind, tg_id): score for kind, score in due.items()})
+        if stale:
+            pipe.zrem(TIMELINE_KEY, *stale)
+
+    if own_pipe:
+        await pipe.execute()
+
+
+async def schedule_expiry_safe(tg_id: int, end_ts: Optional[float]):
+    try:
+        await schedule_expiry(tg_id, end_ts)
+    except Exception as e:
+        LOG.warning(f"Failed to update expiry timeline for {tg_id}, the next rebuild will fix it: {e}")
+
+
+async def reschedule(kind: str, tg_id: int, score: float):
+    redis = await get_redis()
+    await redis.zadd(TIMELINE_KEY, {member(kind, tg_id): score})
+
+
+# with a (lock key, value) fence nothing is popped, and None is returned, unless the lock still holds that value
+async def pop_due(
+    limit: int = 100,
+    now: Optional[float] = None,
+    fence: Optional[Tuple[str, str]] = None
+) -> Optional[List[Tuple[str, int]]]:
+    global _pop_due
+    redis = await get_redis()
+    if _pop_due is None:
+        _pop_due = redis.register_script(POP_DUE_SCRIPT)
+
+    keys, args = [TIMELINE_KEY], [now or time.time(), limit]
+    if fence is not None:
+        keys.append(fence[0])
+        args.append(fence[1])
+
+    items = await _pop_due(keys=keys, args=args)
+    if items is None:
+        return None
+    return [parse_member(item) for item in items]
+
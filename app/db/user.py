@@ -15,6 +15,8 @@ from app.settings.log import get_logger
 from .base import BaseRepository
 from app.settings.config import env
 from app.db.cache import invalidate_user_cache, get_cache, set_cache, CacheTTL
+from app.db.outbox import enqueue_notification
+from app.db.timeline import schedule_expiry_safe
 
 LOG = get_logger(__name__)
 
@@ -241,6 +243,7 @@ class UserRepository(BaseRepository):
         await self.session.commit()
 
         await set_cache(f"user:{tg_id}:sub_end", str(timestamp), CacheTTL.SUB_END)
+        await schedule_expiry_safe(tg_id, timestamp)
 
         if usernames:
             import asyncio
@@ -255,7 +258,7 @@ class UserRepository(BaseRepository):
             return False
         return time.time() < sub_end
 
-    async def buy_subscription(self, tg_id: int, days: int, price: float) -> bool:
+    async def buy_subscription(self, tg_id: int, days: int, price: float, notification: Optional[str] = None) -> bool:
         price_decimal = Decimal(str(price))
         now_ts = time.time()
 
@@ -293,10 +296,19 @@ class UserRepository(BaseRepository):
         result = await self.session.execute(select(Config.username).where(Config.tg_id == tg_id, Config.deleted == False))
         usernames = [r[0] for r in result.all()]
 
+        if notification:
+            enqueue_notification(self.session, tg_id, notification, user.lang, {
+                'days': days,
+                'price': str(price_decimal),
+                'balance': str(new_balance),
+                'expire_date': user.subscription_end.strftime('%Y.%m.%d'),
+            })
+
         await self.session.commit()
 
         await set_cache(f"user:{tg_id}:sub_end", str(new_end_ts), CacheTTL.SUB_END)
         await set_cache(f"user:{tg_id}:balance", str(new_balance), CacheTTL.BALANCE)
+        await schedule_expiry_safe(tg_id, new_end_ts)
 
         if usernames:
             import asyncio
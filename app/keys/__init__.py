@@ -1 +1,2 @@
 from .keyboards import *
+from .screens import *
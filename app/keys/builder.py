@@ -1,7 +1,80 @@
-from typing import Any
+import copy
+from functools import wraps
+from typing import Any, Callable, Dict
 
-from aiogram.types import InlineKeyboardMarkup
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from pydantic import ConfigDict
+
+
+def _immutable(self, *args: Any, **kwargs: Any):
+    raise TypeError("Cached keyboards are shared between users; build a new markup instead of changing this one")
+
+
+class FrozenList(list):
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict) -> list:
+        return [copy.deepcopy(item, memo) for item in self]
+
+    def __reduce_ex__(self, protocol: int):
+        return list, (list(self),)
+
+
+class FrozenInlineKeyboardButton(InlineKeyboardButton):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenInlineKeyboardMarkup(InlineKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+def freeze_markup(markup: InlineKeyboardMarkup) -> FrozenInlineKeyboardMarkup:
+    if isinstance(markup, FrozenInlineKeyboardMarkup):
+        return markup
+    rows = FrozenList(
+        FrozenList(
+            FrozenInlineKeyboardButton.model_construct(_fields_set=button.model_fields_set, **dict(button))
+            for button in row
+        )
+        for row in markup.inline_keyboard
+    )
+    return FrozenInlineKeyboardMarkup.model_construct(_fields_set=markup.model_fields_set, inline_keyboard=rows)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, InlineKeyboardMarkup):
+        return freeze_markup(value)
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def memoize_by_lang(maxsize: int = 4096) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        cache: Dict[tuple, Any] = {}
+
+        @wraps(func)
+        def wrapper(t: Callable[[str], str], *args: Any, **kwargs: Any) -> Any:
+            lang = getattr(t, 'lang', None)
+            if lang is None:
+                return func(t, *args, **kwargs)
+
+            key = (lang, args, tuple(sorted(kwargs.items()))) if kwargs else (lang, args)
+            value = cache.get(key)
+            if value is None:
+                if len(cache) >= maxsize:
+                    cache.clear()
+                value = cache[key] = _freeze(func(t, *args, **kwargs))
+            return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
 
 
 def build_keyboard(
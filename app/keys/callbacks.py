@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+SEP = ":"
+
+_specs: Dict[str, "CallbackSpec"] = {}
+
+
+@dataclass(frozen=True)
+class CallbackSpec:
+    prefix: str
+    fields: Tuple[Tuple[str, Callable[[str], Any]], ...] = ()
+
+    def pack(self, *values: Any) -> str:
+        if len(values) != len(self.fields):
+            raise ValueError(f"Callback {self.prefix} takes {len(self.fields)} values, got {len(values)}")
+        if not values:
+            return self.prefix
+        return SEP.join((self.prefix, *map(str, values)))
+
+    def unpack(self, payload: str) -> Dict[str, Any]:
+        values = payload.split(SEP) if payload else []
+        if len(values) != len(self.fields):
+            raise ValueError(f"Callback {self.prefix} expects {len(self.fields)} values, got {payload!r}")
+        return {name: convert(value) for (name, convert), value in zip(self.fields, values)}
+
+
+def _spec(prefix: str, *fields: Tuple[str, Callable[[str], Any]]) -> CallbackSpec:
+    if SEP in prefix or prefix in _specs:
+        raise ValueError(f"Invalid or duplicate callback prefix: {prefix}")
+    spec = _specs[prefix] = CallbackSpec(prefix, fields)
+    return spec
+
+
+def _amount(value: str) -> int | str:
+    return value if value == "custom" else int(value)
+
+
+class Cb:
+    BACK_MAIN = _spec("back_main")
+    MYVPN = _spec("myvpn")
+    ADD_CONFIG = _spec("add_config")
+    CONFIG = _spec("cfg", ("cfg_id", int))
+    DELETE_CONFIG = _spec("dcfg", ("cfg_id", int))
+    QR_CONFIG = _spec("qcfg", ("cfg_id", int))
+    DELETE_QR_MSG = _spec("delete_qr_msg")
+
+    ADMIN_PANEL = _spec("admin_panel")
+
+    SETTINGS = _spec("settings")
+    REFERRAL = _spec("referral")
+    CHANGE_LANG = _spec("change_lang")
+    SET_LANG = _spec("set_lang", ("lang_code", str))
+
+    BUY_SUB = _spec("buy_sub")
+    RENEW_SUBSCRIPTION = _spec("renew_subscription")
+    SUB_1M = _spec("sub_1m")
+    SUB_3M = _spec("sub_3m")
+    SUB_6M = _spec("sub_6m")
+    SUB_12M = _spec("sub_12m")
+
+    BALANCE = _spec("balance")
+    ADD_FUNDS = _spec("add_funds")
+    SELECT_METHOD = _spec("pm", ("method", str))
+    AMOUNT = _spec("amt", ("method", str), ("amount", _amount))
+    PAYMENT_SENT = _spec("paid", ("payment_id", int))
+
+    PLANS = {spec.prefix: spec for spec in (SUB_1M, SUB_3M, SUB_6M, SUB_12M)}
+
+    @classmethod
+    def plan(cls, key: str) -> CallbackSpec:
+        spec = cls.PLANS.get(key)
+        if spec is None:
+            raise ValueError(f"No callback for subscription plan {key}")
+        return spec
+
+
+_LEGACY_PREFIXES = (
+    ("delete_cfg_", Cb.DELETE_CONFIG),
+    ("qr_cfg_", Cb.QR_CONFIG),
+    ("cfg_", Cb.CONFIG),
+    ("select_method_", Cb.SELECT_METHOD),
+    ("amount_", Cb.AMOUNT),
+    ("payment_sent_", Cb.PAYMENT_SENT),
+)
+
+
+def _decode_legacy(data: str) -> Optional[Tuple[CallbackSpec, Dict[str, Any]]]:
+    for prefix, spec in _LEGACY_PREFIXES:
+        if data.startswith(prefix):
+            return spec, spec.unpack(data[len(prefix):].replace("_", SEP))
+    return None
+
+
+def decode(data: str) -> Optional[Tuple[CallbackSpec, Dict[str, Any]]]:
+    prefix, _, payload = data.partition(SEP)
+    spec = _specs.get(prefix)
+    try:
+        if spec is None:
+            return _decode_legacy(data)
+        return spec, spec.unpack(payload)
+    except ValueError:
+        return None
@@ -3,60 +3,71 @@ from typing import Any
 
 from aiogram.types import InlineKeyboardMarkup
 
-from .builder import build_keyboard
+from .builder import build_keyboard, memoize_by_lang
+from .callbacks import Cb
 from app.settings.config import env
 
 
+@memoize_by_lang()
 def qr_delete_kb(t: Callable[[str], str]) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': t('delete_config'), 'callback_data': 'delete_qr_msg'},
+        {'text': t('delete_config'), 'callback_data': Cb.DELETE_QR_MSG.pack()},
     ])
 
 
 def main_kb(t: Callable[[str], str], user_id: int | None = None) -> InlineKeyboardMarkup:
+    return _main_kb(t, bool(user_id and env.is_admin(user_id)))
+
+
+@memoize_by_lang()
+def _main_kb(t: Callable[[str], str], is_admin: bool) -> InlineKeyboardMarkup:
     buttons = [
-        {'text': t('my_vpn'), 'callback_data': 'myvpn'},
-        {'text': t('balance'), 'callback_data': 'balance'},
-        {'text': t('settings'), 'callback_data': 'settings'},
+        {'text': t('my_vpn'), 'callback_data': Cb.MYVPN.pack()},
+        {'text': t('balance'), 'callback_data': Cb.BALANCE.pack()},
+        {'text': t('settings'), 'callback_data': Cb.SETTINGS.pack()},
     ]
 
-    if user_id and env.is_admin(user_id):
-        buttons.append({'text': t('admin'), 'callback_data': 'admin_panel'})
+    if is_admin:
+        buttons.append({'text': t('admin'), 'callback_data': Cb.ADMIN_PANEL.pack()})
     else:
         buttons.append({'text': t('help'), 'url': f'https://t.me/{env.SUPPORT_USER}'})
 
     return build_keyboard(buttons, adjust=[1, 1, 2])
 
 
+@memoize_by_lang()
 def balance_kb(t: Callable[[str], str], show_renew: bool = False) -> InlineKeyboardMarkup:
-    buttons = [{'text': t('add_funds'), 'callback_data': 'add_funds'}]
+    buttons = [{'text': t('add_funds'), 'callback_data': Cb.ADD_FUNDS.pack()}]
 
     if show_renew:
-        buttons.append({'text': t('renew_subscription_btn'), 'callback_data': 'renew_subscription'})
+        buttons.append({'text': t('renew_subscription_btn'), 'callback_data': Cb.RENEW_SUBSCRIPTION.pack()})
 
-    buttons.append({'text': t('back_main'), 'callback_data': 'back_main'})
+    buttons.append({'text': t('back_main'), 'callback_data': Cb.BACK_MAIN.pack()})
 
     return build_keyboard(buttons)
 
 
+@memoize_by_lang()
 def balance_button_kb(t: Callable[[str], str]) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': t('balance'), 'callback_data': 'balance'},
+        {'text': t('balance'), 'callback_data': Cb.BALANCE.pack()},
     ])
 
 
+@memoize_by_lang()
 def renewal_notification_kb(t: Callable[[str], str]) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': t('extend'), 'callback_data': 'renew_subscription'},
-        {'text': t('balance'), 'callback_data': 'balance'},
+        {'text': t('extend'), 'callback_data': Cb.RENEW_SUBSCRIPTION.pack()},
+        {'text': t('balance'), 'callback_data': Cb.BALANCE.pack()},
     ], adjust=2)
 
 
+@memoize_by_lang()
 def set_kb(t: Callable[[str], str]) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': t('referral'), 'callback_data': 'referral'},
-        {'text': t('change_language'), 'callback_data': 'change_lang'},
-        {'text': t('back_main'), 'callback_data': 'back_main'},
+        {'text': t('referral'), 'callback_data': Cb.REFERRAL.pack()},
+        {'text': t('change_language'), 'callback_data': Cb.CHANGE_LANG.pack()},
+        {'text': t('back_main'), 'callback_data': Cb.BACK_MAIN.pack()},
     ])
 
 
@@ -70,7 +81,7 @@ def myvpn_kb(
     if not configs:
         buttons.append({
             'text': t('add_config' if has_active_sub else 'buy_sub'),
-            'callback_data': 'add_config' if has_active_sub else 'buy_sub',
+            'callback_data': (Cb.ADD_CONFIG if has_active_sub else Cb.BUY_SUB).pack(),
         })
 
     for i, cfg in enumerate(configs, 1):
@@ -78,36 +89,36 @@ def myvpn_kb(
         display_name = cfg.get('name') or f"{t('config')} {i}"
         buttons.append({
             'text': display_name,
-            'callback_data': f"cfg_{cfg['id']}"
+            'callback_data': Cb.CONFIG.pack(cfg['id'])
         })
 
     if has_active_sub or configs:
-        buttons.append({'text': t('extend'), 'callback_data': 'renew_subscription'})
+        buttons.append({'text': t('extend'), 'callback_data': Cb.RENEW_SUBSCRIPTION.pack()})
 
-    buttons.append({'text': t('back_main'), 'callback_data': 'back_main'})
+    buttons.append({'text': t('back_main'), 'callback_data': Cb.BACK_MAIN.pack()})
 
     return build_keyboard(buttons)
 
 
-def actions_kb(t: Callable[[str], str], cfg_id: int | None = None) -> InlineKeyboardMarkup:
-    delete_callback = f"delete_cfg_{cfg_id}" if cfg_id else "delete_config"
-    qr_callback = f"qr_cfg_{cfg_id}" if cfg_id else "qr_config"
-
+@memoize_by_lang()
+def actions_kb(t: Callable[[str], str], cfg_id: int) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': t('delete_config'), 'callback_data': delete_callback},
-        {'text': t('qr_code'), 'callback_data': qr_callback},
-        {'text': t('back'), 'callback_data': 'myvpn'},
+        {'text': t('delete_config'), 'callback_data': Cb.DELETE_CONFIG.pack(cfg_id)},
+        {'text': t('qr_code'), 'callback_data': Cb.QR_CONFIG.pack(cfg_id)},
+        {'text': t('back'), 'callback_data': Cb.MYVPN.pack()},
     ], adjust=2)
 
 
+@memoize_by_lang()
 def language_kb(t: Callable[[str], str]) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': '🇺🇸 English', 'callback_data': 'set_lang:en'},
-        {'text': '🇷🇺 Русский', 'callback_data': 'set_lang:ru'},
-        {'text': t('back'), 'callback_data': 'settings'},
+        {'text': '🇺🇸 English', 'callback_data': Cb.SET_LANG.pack('en')},
+        {'text': '🇷🇺 Русский', 'callback_data': Cb.SET_LANG.pack('ru')},
+        {'text': t('back'), 'callback_data': Cb.SETTINGS.pack()},
     ])
 
 
+@memoize_by_lang()
 def sub_kb(t: Callable[[str], str], is_extension: bool = False) -> InlineKeyboardMarkup:
     monthly_price = env.plans['sub_1m']['price']
 
@@ -131,54 +142,58 @@ def sub_kb(t: Callable[[str], str], is_extension: bool = False) -> InlineKeyboar
         else:
             text = base_text
 
-        buttons.append({'text': text, 'callback_data': key})
+        buttons.append({'text': text, 'callback_data': Cb.plan(key).pack()})
 
-    buttons.append({'text': t('back_main'), 'callback_data': 'back_main'})
+    buttons.append({'text': t('back_main'), 'callback_data': Cb.BACK_MAIN.pack()})
 
     return build_keyboard(buttons)
 
 
+@memoize_by_lang()
 def payment_methods_kb(t: Callable[[str], str]) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': 'YooKassa (RUB)', 'callback_data': 'select_method_yookassa'},
-        {'text': 'TON', 'callback_data': 'select_method_ton'},
-        {'text': t('pm_stars'), 'callback_data': 'select_method_stars'},
-        {'text': 'CryptoBot (USDT)', 'callback_data': 'select_method_cryptobot'},
-        {'text': t('back'), 'callback_data': 'balance'},
+        {'text': 'YooKassa (RUB)', 'callback_data': Cb.SELECT_METHOD.pack('yookassa')},
+        {'text': 'TON', 'callback_data': Cb.SELECT_METHOD.pack('ton')},
+        {'text': t('pm_stars'), 'callback_data': Cb.SELECT_METHOD.pack('stars')},
+        {'text': 'CryptoBot (USDT)', 'callback_data': Cb.SELECT_METHOD.pack('cryptobot')},
+        {'text': t('back'), 'callback_data': Cb.BALANCE.pack()},
     ], adjust=1)
 
 
 def referral_kb(t: Callable[[str], str], ref_link: str) -> InlineKeyboardMarkup:
     return build_keyboard([
         {'text': t('share'), 'switch_inline_query': ref_link},
-        {'text': t('back'), 'callback_data': 'back_main'},
+        {'text': t('back'), 'callback_data': Cb.BACK_MAIN.pack()},
     ])
 
 
+@memoize_by_lang()
 def back_balance(t: Callable[[str], str]) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': t('back'), 'callback_data': 'balance'},
+        {'text': t('back'), 'callback_data': Cb.BALANCE.pack()},
     ])
 
 
+@memoize_by_lang()
 def payment_amounts_kb(t: Callable[[str], str], method: str) -> InlineKeyboardMarkup:
     return build_keyboard([
-        {'text': '200 RUB', 'callback_data': f'amount_{method}_200'},
-        {'text': '500 RUB', 'callback_data': f'amount_{method}_500'},
-        {'text': '1000 RUB', 'callback_data': f'amount_{method}_1000'},
-        {'text': t('custom_amount'), 'callback_data': f'amount_{method}_custom'},
-        {'text': t('back'), 'callback_data': 'add_funds'},
+        {'text': '200 RUB', 'callback_data': Cb.AMOUNT.pack(method, 200)},
+        {'text': '500 RUB', 'callback_data': Cb.AMOUNT.pack(method, 500)},
+        {'text': '1000 RUB', 'callback_data': Cb.AMOUNT.pack(method, 1000)},
+        {'text': t('custom_amount'), 'callback_data': Cb.AMOUNT.pack(method, 'custom')},
+        {'text': t('back'), 'callback_data': Cb.ADD_FUNDS.pack()},
     ], adjust=[3, 1, 1])
 
 
+@memoize_by_lang()
 def payment_success_actions(t: Callable[[str], str], has_active_sub: bool) -> InlineKeyboardMarkup:
     if has_active_sub:
         return build_keyboard([
-            {'text': t('extend'), 'callback_data': 'renew_subscription'},
-            {'text': t('back_main'), 'callback_data': 'back_main'},
+            {'text': t('extend'), 'callback_data': Cb.RENEW_SUBSCRIPTION.pack()},
+            {'text': t('back_main'), 'callback_data': Cb.BACK_MAIN.pack()},
         ])
     else:
         return build_keyboard([
-            {'text': t('buy_sub'), 'callback_data': 'buy_sub'},
-            {'text': t('back_main'), 'callback_data': 'back_main'},
+            {'text': t('buy_sub'), 'callback_data': Cb.BUY_SUB.pack()},
+            {'text': t('back_main'), 'callback_data': Cb.BACK_MAIN.pack()},
         ])
@@ -0,0 +1,28 @@
+from collections.abc import Callable
+
+from aiogram.types import InlineKeyboardMarkup
+
+from .builder import memoize_by_lang
+from .keyboards import set_kb, language_kb, payment_methods_kb, payment_amounts_kb
+
+Screen = tuple[str, InlineKeyboardMarkup]
+
+
+@memoize_by_lang()
+def settings_screen(t: Callable[[str], str]) -> Screen:
+    return t('settings_text'), set_kb(t)
+
+
+@memoize_by_lang()
+def language_screen(t: Callable[[str], str]) -> Screen:
+    return t('choose_language'), language_kb(t)
+
+
+@memoize_by_lang()
+def add_funds_screen(t: Callable[[str], str]) -> Screen:
+    return t('payment_method'), payment_methods_kb(t)
+
+
+@memoize_by_lang()
+def select_amount_screen(t: Callable[[str], str], method: str) -> Screen:
+    return t('select_amount'), payment_amounts_kb(t, method)
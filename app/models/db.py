@@ -23,7 +23,7 @@ class Payment(Base):
     currency = Column(String)
     status = Column(String)
     comment = Column(Text)
-    tx_hash = Column(Text)
+    tx_hash = Column(Text)  # unique via uq_payments_tx_hash, built in init_db after dedupe
     created_at = Column(DateTime, default=datetime.utcnow)
     confirmed_at = Column(DateTime, nullable=True)
     expires_at = Column(DateTime, nullable=True)
@@ -60,4 +60,27 @@ class User(Base):
     lang = Column(String, default="ru")
     configs = Column(Integer, default=0)
     referrer_id = Column(BigInteger)
-    first_buy = Column(Boolean, default=True)
\ No newline at end of file
+    first_buy = Column(Boolean, default=True)
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    id = Column(BigInteger, primary_key=True)
+    tg_id = Column(BigInteger, index=True)
+    kind = Column(String)
+    lang = Column(String, default="ru")
+    payload = Column(JSON)
+    status = Column(String, default="pending", index=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+
+class Ban(Base):
+    __tablename__ = "bans"
+    tg_id = Column(BigInteger, primary_key=True)
+    reason = Column(Text, nullable=True)
+    banned_by = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True, index=True)
@@ -4,7 +4,7 @@ import asyncio
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional
 
-from .types import *
+from .registry import get_gateway
 from app.payments.models import PaymentResult, PaymentMethod
 from app.db.payments import PaymentRepository
 from app.db.user import UserRepository
@@ -13,22 +13,64 @@ from app.db.cache import get_redis
 
 LOG = logging.getLogger(__name__)
 
+_polling_task: Optional[asyncio.Task] = None
+
+
+async def run_polling_loop():
+    while True:
+        try:
+            async with get_session() as session:
+                redis_client = await get_redis()
+                payment_repo = PaymentRepository(session, redis_client)
+
+                ton_pendings = await payment_repo.get_pending_payments(PaymentMethod.TON.value)
+                if ton_pendings:
+                    from app.settings.tasks.types.ton_monitoring import check_ton_transactions
+                    await check_ton_transactions()
+
+                cryptobot_pendings = await payment_repo.get_pending_payments(PaymentMethod.CRYPTOBOT.value)
+                if cryptobot_pendings:
+                    await get_gateway(PaymentMethod.CRYPTOBOT).check_pending_payments(session, cryptobot_pendings)
+
+                yookassa_pendings = await payment_repo.get_pending_or_recent_expired_payments(
+                    PaymentMethod.YOOKASSA.value,
+                    expired_hours=1
+                )
+
+                yookassa = get_gateway(PaymentMethod.YOOKASSA)
+                for payment in yookassa_pendings:
+                    await yookassa.check_payment(session, payment['id'])
+
+                if not ton_pendings and not cryptobot_pendings and not yookassa_pendings:
+                    break
+        except Exception as e:
+            LOG.error(f"Polling loop error: {type(e).__name__}: {e}")
+        await asyncio.sleep(60)
+
+
+def start_polling_if_needed():
+    global _polling_task
+    if _polling_task is None or _polling_task.done():
+        _polling_task = asyncio.create_task(run_polling_loop())
+
+
+async def stop_polling():
+    global _polling_task
+    if _polling_task is not None:
+        _polling_task.cancel()
+        try:
+            await _polling_task
+        except asyncio.CancelledError:
+            pass
+        _polling_task = None
+
+
 class PaymentManager:
-    def __init__(self, session, redis_client=None, bot=None):
+    def __init__(self, session, redis_client=None):
         self.session = session
         self.redis_client = redis_client
-        self.bot = bot
         self.payment_repo = PaymentRepository(session, redis_client)
         self.user_repo = UserRepository(session, redis_client)
-        self.polling_task: Optional[asyncio.Task] = None
-        
-        self.gateways: dict[PaymentMethod, BasePaymentGateway] = {
-            PaymentMethod.TON: TonGateway(session, redis_client, bot=bot),
-            PaymentMethod.STARS: TelegramStarsGateway(bot, session, redis_client),
-            PaymentMethod.CRYPTOBOT: CryptoBotGateway(session, redis_client, bot=bot),
-            PaymentMethod.YOOKASSA: YooKassaGateway(session, redis_client, bot=bot),
-        }
-
 
     async def create_payment(
         self,
@@ -38,38 +80,20 @@ class PaymentManager:
         amount: Decimal,
         chat_id: Optional[int] = None,
     ) -> PaymentResult:
-        try:
-            from app.models.db import User
-            from sqlalchemy import select
-
-            result = await self.session.execute(
-                select(User)
-                .where(User.tg_id == tg_id)
-                .with_for_update()
+        currency = "RUB"
+        comment = None
+        expected_crypto_amount = None
+
+        if method == PaymentMethod.TON:
+            comment = uuid.uuid4().hex[:10]
+            from app.settings.utils.rates import get_ton_price
+            ton_price = await get_ton_price()
+            expected_crypto_amount = (Decimal(amount) / ton_price).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
             )
-            user = result.scalar_one_or_none()
-            if not user:
-                raise ValueError(f"User {tg_id} not found")
-
-            active_payments = await self.payment_repo.get_active_pending_payments(tg_id)
-            if active_payments:
-                LOG.info(f"User {tg_id} has {len(active_payments)} active payment(s). Auto-canceling...")
-                for payment in active_payments:
-                    await self.cancel_payment(payment['id'])
-
-            currency = "RUB"
-            comment = None
-            expected_crypto_amount = None
-
-            if method == PaymentMethod.TON:
-                comment = uuid.uuid4().hex[:10]
-                from app.settings.utils.rates import get_ton_price
-                ton_price = await get_ton_price()
-                expected_crypto_amount = (Decimal(amount) / ton_price).quantize(
-                    Decimal("0.01"), rounding=ROUND_HALF_UP
-                )
 
-            payment_id = await self.payment_repo.create_payment(
+        try:
+            payment_id, active_payments = await self.payment_repo.reserve_payment(
                 tg_id=tg_id,
                 method=method.value,
                 amount=amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
@@ -77,9 +101,19 @@ class PaymentManager:
                 comment=comment,
                 expected_crypto_amount=expected_crypto_amount
             )
+        except Exception as e:
+            LOG.error(f"Create payment error for user {tg_id}: {type(e).__name__}: {e}")
+            raise
+
+        if active_payments:
+            LOG.info(f"User {tg_id} has {len(active_payments)} active payment(s). Auto-canceling...")
+            for payment in active_payments:
+                await self.cancel_payment(payment['id'])
 
-            gateway = self.gateways[method]
+        try:
+            gateway = get_gateway(method)
             result = await gateway.create_payment(
+                self.session,
                 t,
                 tg_id=tg_id,
                 amount=amount,
@@ -87,17 +121,26 @@ class PaymentManager:
                 payment_id=payment_id,
                 comment=comment
             )
+        except Exception as e:
+            LOG.error(f"Create payment error for user {tg_id}: {type(e).__name__}: {e}")
+            await self.payment_repo.release_reservation(payment_id)
+            raise
 
-            LOG.info(f"Payment created: {method} for user {tg_id}, amount {amount}, id={payment_id}")
+        if not await self.payment_repo.finalize_payment(payment_id, result.extra_data):
+            LOG.error(f"Reservation {payment_id} for user {tg_id} was swept or superseded before finalization")
+            if not await gateway.discard_payment(result.extra_data):
+                # the remote payment is still payable; keep the row pollable so a late payment is credited
+                await self.payment_repo.revive_reservation(payment_id, result.extra_data)
+                start_polling_if_needed()
+                LOG.warning(f"Could not discard remote payment {payment_id}, kept it pending for polling")
+            raise ValueError(f"Payment reservation {payment_id} expired")
 
-            if method in [PaymentMethod.TON, PaymentMethod.CRYPTOBOT, PaymentMethod.YOOKASSA]:
-                await self.start_polling_if_needed()
+        LOG.info(f"Payment created: {method} for user {tg_id}, amount {amount}, id={payment_id}")
 
-            return result
+        if method in [PaymentMethod.TON, PaymentMethod.CRYPTOBOT, PaymentMethod.YOOKASSA]:
+            start_polling_if_needed()
 
-        except Exception as e:
-            LOG.error(f"Create payment error for user {tg_id}: {type(e).__name__}: {e}")
-            raise
+        return result
 
     async def cancel_payment(self, payment_id: int):
         payment = await self.payment_repo.get_payment(payment_id)
@@ -109,10 +152,10 @@ class PaymentManager:
         
         try:
             method = PaymentMethod(payment['method'])
-            gateway = self.gateways.get(method)
-            
-            if gateway and hasattr(gateway, 'cancel_payment'):
-                await gateway.cancel_payment(payment_id)
+            gateway = get_gateway(method)
+
+            if hasattr(gateway, 'cancel_payment'):
+                await gateway.cancel_payment(self.session, payment_id)
             
         except Exception as e:
             LOG.error(f"Remote cancellation for payment {payment_id} failed: {e}", exc_info=True)
@@ -134,67 +177,17 @@ class PaymentManager:
             LOG.error(f"Confirm payment error for user {tg_id}: {type(e).__name__}: {e}")
             raise
 
-    async def run_polling_loop(self):
-        while True:
-            try:
-                async with get_session() as session:
-                    redis_client = await get_redis()
-                    temp_payment_repo = PaymentRepository(session, redis_client)
-
-                    ton_pendings = await temp_payment_repo.get_pending_payments(PaymentMethod.TON.value)
-                    if ton_pendings:
-                        from app.settings.tasks.types.ton_monitoring import check_ton_transactions
-                        await check_ton_transactions()
-
-                    cryptobot_pendings = await temp_payment_repo.get_pending_payments(PaymentMethod.CRYPTOBOT.value)
-                    if cryptobot_pendings:
-                        for payment in cryptobot_pendings:
-                            async with get_session() as check_session:
-                                check_redis = await get_redis()
-                                check_gateway = CryptoBotGateway(check_session, check_redis, bot=self.bot)
-                                await check_gateway.check_payment(payment['id'])
-
-                    yookassa_pendings = await temp_payment_repo.get_pending_or_recent_expired_payments(
-                        PaymentMethod.YOOKASSA.value,
-                        expired_hours=1
-                    )
-
-                    for payment in yookassa_pendings:
-                        check_gateway = YooKassaGateway(session, redis_client, bot=self.bot)
-                        await check_gateway.check_payment(payment['id'])
-
-                    if not ton_pendings and not cryptobot_pendings and not yookassa_pendings:
-                        break
-            except Exception as e:
-                LOG.error(f"Polling loop error: {type(e).__name__}: {e}")
-            await asyncio.sleep(60)
-
-    async def start_polling_if_needed(self):
-        if self.polling_task is None or self.polling_task.done():
-            self.polling_task = asyncio.create_task(self.run_polling_loop())
-
     async def check_payment(self, payment_id: int) -> bool:
         try:
             payment = await self.payment_repo.get_payment(payment_id)
             if not payment or payment['status'] != 'pending':
                 return False
 
-            gateway = self.gateways[PaymentMethod(payment['method'])]
-            confirmed = await gateway.check_payment(payment_id)
-
-
-
-            return confirmed
+            gateway = get_gateway(PaymentMethod(payment['method']))
+            return await gateway.check_payment(self.session, payment_id)
         except Exception as e:
             LOG.error(f"Check payment error for payment {payment_id}: {type(e).__name__}: {e}")
             return False
 
     async def get_pending_payments(self, method: Optional[PaymentMethod | str] = None):
         return await self.payment_repo.get_pending_payments(method if method else None)
-
-    async def close(self):
-        for gateway in self.gateways.values():
-            if hasattr(gateway, 'close'):
-                await gateway.close()
-        if self.polling_task:
-            self.polling_task.cancel()
\ No newline at end of file
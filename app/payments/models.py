@@ -11,6 +11,7 @@ class PaymentMethod(str, Enum):
     YOOKASSA = "yookassa"
 
 class PaymentStatus(str, Enum):
+    RESERVED = "reserved"
     PENDING = "pending"
     CONFIRMED = "confirmed"
     FAILED = "failed"
@@ -28,6 +29,17 @@ class PaymentResult:
     expected_crypto_amount: Optional[Decimal] = None
     pay_url: Optional[str] = None
     invoice_id: Optional[str] = None
+    extra_data: Optional[dict] = None
+
+@dataclass
+class ConfirmedPayment:
+    payment_id: int
+    tg_id: int
+    amount: Decimal
+    tx_hash: str
+    balance: Decimal
+    lang: str
+    has_active_subscription: bool
 
 @dataclass
 class Payment:
@@ -0,0 +1,42 @@
+from typing import Dict, Optional
+
+from aiogram import Bot
+
+from app.payments.models import PaymentMethod
+from app.payments.types import BasePaymentGateway, TonGateway, TelegramStarsGateway, CryptoBotGateway, YooKassaGateway
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+_gateways: Dict[PaymentMethod, BasePaymentGateway] = {}
+
+
+def init_gateways(bot: Optional[Bot] = None):
+    if _gateways:
+        return
+
+    _gateways.update({
+        PaymentMethod.TON: TonGateway(bot),
+        PaymentMethod.STARS: TelegramStarsGateway(bot),
+        PaymentMethod.CRYPTOBOT: CryptoBotGateway(bot),
+        PaymentMethod.YOOKASSA: YooKassaGateway(bot),
+    })
+
+
+def get_gateways() -> Dict[PaymentMethod, BasePaymentGateway]:
+    if not _gateways:
+        raise RuntimeError("Payment gateways not initialized. Call init_gateways() first.")
+    return _gateways
+
+
+def get_gateway(method: PaymentMethod) -> BasePaymentGateway:
+    return get_gateways()[method]
+
+
+async def close_gateways():
+    for method, gateway in _gateways.items():
+        try:
+            await gateway.close()
+        except Exception as e:
+            LOG.warning(f"Error closing {method.value} gateway: {type(e).__name__}: {e}")
+    _gateways.clear()
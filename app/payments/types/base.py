@@ -1,22 +1,25 @@
 from abc import ABC, abstractmethod
 from decimal import Decimal
-from typing import Optional
-from datetime import datetime
-from app.payments.models import PaymentResult
+from typing import Optional, Dict, List
+from aiogram import Bot
+from app.payments.models import PaymentResult, ConfirmedPayment
+from app.db.payments import PaymentRepository
 
-from app.db.cache import invalidate_user_cache
 from app.settings.log import get_logger
 
 LOG = get_logger(__name__)
 
 class BasePaymentGateway(ABC):
 
+    def __init__(self, bot: Optional[Bot] = None):
+        self.bot = bot
+
     @abstractmethod
-    async def create_payment(self, tg_id: int, amount: Decimal, chat_id: Optional[int] = None) -> PaymentResult:
+    async def create_payment(self, session, t, tg_id: int, amount: Decimal, chat_id: Optional[int] = None) -> PaymentResult:
         pass
 
     @abstractmethod
-    async def check_payment(self, payment_id: int) -> bool:
+    async def check_payment(self, session, payment_id: int) -> bool:
         pass
 
     @property
@@ -27,81 +30,35 @@ class BasePaymentGateway(ABC):
     async def on_payment_confirmed(self, payment_id: int, tx_hash: Optional[str] = None):
         pass
 
-    async def _confirm_payment_atomic(
-        self,
-        payment_id: int,
-        tx_hash: str,
-        amount: Decimal,
-        allow_expired: bool = False
-    ) -> bool:
-        from app.models.db import Payment as PaymentModel, User
-        from sqlalchemy import select
-
-        try:
-            result = await self.session.execute(
-                select(PaymentModel)
-                .where(PaymentModel.id == payment_id)
-                .with_for_update()
-            )
-            payment = result.scalar_one_or_none()
-
-            if not payment:
-                LOG.warning(f"Payment {payment_id} not found during confirmation")
-                return False
-
-            valid_statuses = ['pending', 'expired'] if allow_expired else ['pending']
-            if payment.status not in valid_statuses:
-                LOG.debug(f"Payment {payment_id} has status {payment.status}, cannot confirm")
-                return False
-
-            if payment.status == 'expired' and allow_expired:
-                LOG.warning(f"Recovering expired payment {payment_id} - late confirmation")
-
-            result = await self.session.execute(
-                select(User)
-                .where(User.tg_id == payment.tg_id)
-                .with_for_update()
-            )
-            user = result.scalar_one_or_none()
+    async def discard_payment(self, extra_data: Optional[dict]) -> bool:
+        return not extra_data
 
-            if not user:
-                LOG.error(f"User {payment.tg_id} not found for payment {payment_id}")
-                return False
+    async def warm_up(self):
+        pass
 
-            if payment.tx_hash is not None:
-                LOG.warning(f"Payment {payment_id} already has tx_hash: {payment.tx_hash}")
-                return False
+    async def close(self):
+        pass
 
-            result = await self.session.execute(
-                select(PaymentModel).where(PaymentModel.tx_hash == tx_hash)
+    async def payment_repo(self, session) -> PaymentRepository:
+        return PaymentRepository(session, await self.get_redis())
+
+    async def _confirm_paid(self, session, paid: Dict[int, str], allow_expired: bool = True) -> List[ConfirmedPayment]:
+        repo = await self.payment_repo(session)
+        confirmed = await repo.confirm_payments(paid, allow_expired=allow_expired)
+        await self.notify_confirmed(confirmed)
+        return confirmed
+
+    async def notify_confirmed(self, confirmed: List[ConfirmedPayment]):
+        for c in confirmed:
+            await self.on_payment_confirmed(
+                payment_id=c.payment_id,
+                tx_hash=c.tx_hash,
+                tg_id=c.tg_id,
+                total_amount=c.amount,
+                lang=c.lang,
+                has_active_subscription=c.has_active_subscription
             )
-            existing_payment = result.scalar_one_or_none()
-            if existing_payment:
-                LOG.warning(f"Transaction {tx_hash} already used for payment {existing_payment.id}")
-                return False
-
-            old_balance = user.balance
-
-            payment.status = 'confirmed'
-            payment.tx_hash = tx_hash
-            payment.confirmed_at = datetime.utcnow()
-            user.balance += amount
-
-            await self.session.commit()
-
-            LOG.info(f"Payment confirmed: id={payment_id}, user={user.tg_id}, "
-                    f"amount={amount}, balance: {old_balance} → {user.balance}, tx_hash={tx_hash}")
-
-            await invalidate_user_cache(user.tg_id, 'balance')
-            return True
-
-        except Exception as e:
-            await self.session.rollback()
-            LOG.error(f"Error confirming payment {payment_id}: {type(e).__name__}: {e}")
-            return False
 
     async def get_redis(self):
-        if hasattr(self, 'redis_client') and self.redis_client:
-            return self.redis_client
         from app.db.cache import get_redis
         return await get_redis()
\ No newline at end of file
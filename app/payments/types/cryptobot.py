@@ -1,27 +1,37 @@
 import logging
 from decimal import Decimal
-from typing import Optional
+from typing import Optional, List, Dict
 from aiogram import Bot
 from aiocryptopay import AioCryptoPay, Networks
 
+from app.api import http_client
 from .base import BasePaymentGateway
 from app.payments.models import PaymentResult, PaymentMethod
-from app.db.payments import PaymentRepository
 from app.settings.utils.rates import get_usdt_rub_rate
-from app.db.cache import invalidate_user_cache
 from app.settings.config import env
+from app.settings.utils.identity import get_cryptopay_bot_username
 
 LOG = logging.getLogger(__name__)
 
+INVOICES_PER_REQUEST = 100
+
+
+class PooledCryptoPay(AioCryptoPay):
+    async def _make_request(self, method: str, url, **kwargs) -> dict:
+        async with http_client.request(method, str(url), **kwargs) as response:
+            data = await response.json(content_type="application/json")
+        return self._validate_response(data)
+
+    async def close(self):
+        pass
+
 
 class CryptoBotGateway(BasePaymentGateway):
     requires_polling = True
 
-    def __init__(self, session, redis_client=None, bot: Optional[Bot] = None):
-        self.session = session
-        self.payment_repo = PaymentRepository(session, redis_client)
+    def __init__(self, bot: Optional[Bot] = None):
+        super().__init__(bot)
         self._cryptopay: Optional[AioCryptoPay] = None
-        self.bot = bot
 
     async def _get_cryptopay(self) -> AioCryptoPay:
         if self._cryptopay is None:
@@ -29,12 +39,17 @@ class CryptoBotGateway(BasePaymentGateway):
                 raise ValueError("CRYPTOBOT_TOKEN is not configured in .env")
 
             network = Networks.TEST_NET if env.CRYPTOBOT_TESTNET else Networks.MAIN_NET
-            self._cryptopay = AioCryptoPay(token=env.CRYPTOBOT_TOKEN, network=network)
+            self._cryptopay = PooledCryptoPay(token=env.CRYPTOBOT_TOKEN, network=network)
 
         return self._cryptopay
 
+    async def warm_up(self):
+        cryptopay = await self._get_cryptopay()
+        await get_cryptopay_bot_username(cryptopay)
+
     async def create_payment(
         self,
+        session,
         t,
         tg_id: int,
         amount: Decimal,
@@ -54,8 +69,7 @@ class CryptoBotGateway(BasePaymentGateway):
 
             LOG.info(f"Converting {amount} RUB to {usdt_amount:.2f} USDT (rate: {usdt_rate})")
 
-            profile = await cryptopay.get_me()
-            bot_username = profile.payment_processing_bot_username
+            bot_username = await get_cryptopay_bot_username(cryptopay)
 
             invoice = await cryptopay.create_invoice(
                 asset='USDT',
@@ -68,11 +82,6 @@ class CryptoBotGateway(BasePaymentGateway):
                 allow_anonymous=False,
             )
 
-            await self.payment_repo.update_payment_metadata(
-                payment_id=payment_id,
-                metadata={'invoice_id': invoice.invoice_id}
-            )
-
             pay_url = invoice.bot_invoice_url
 
             text = (
@@ -88,119 +97,74 @@ class CryptoBotGateway(BasePaymentGateway):
                 amount=amount,
                 text=text,
                 pay_url=pay_url,
-                invoice_id=invoice.invoice_id
+                invoice_id=invoice.invoice_id,
+                extra_data={'invoice_id': invoice.invoice_id}
             )
 
         except Exception as e:
             LOG.error(f"Error creating CryptoBot invoice: {e}")
             raise ValueError(f"Failed to create CryptoBot invoice: {e}")
 
-    async def check_payment(self, payment_id: int) -> bool:
+    async def discard_payment(self, extra_data: Optional[dict]) -> bool:
+        invoice_id = (extra_data or {}).get('invoice_id')
+        if not invoice_id:
+            return True
         try:
-            from app.models.db import Payment as PaymentModel, User
-            from sqlalchemy import select
-
-            payment = await self.payment_repo.get_payment(payment_id)
-            if not payment:
-                LOG.warning(f"Payment {payment_id} not found")
-                return False
-
-            current_status = payment.get('status')
-            if current_status == 'confirmed':
-                LOG.debug(f"CryptoBot payment {payment_id} already confirmed")
-                return False
-
-            if current_status not in ['pending', 'expired']:
-                LOG.debug(f"CryptoBot payment {payment_id} has status {current_status}, cannot process")
-                return False
-
-            extra_data = payment.get('extra_data', {})
-            invoice_id = extra_data.get('invoice_id') if extra_data else None
-
-            if not invoice_id:
-                LOG.debug(f"CryptoBot payment {payment_id} has no invoice_id")
-                return False
-
             cryptopay = await self._get_cryptopay()
+            return bool(await cryptopay.delete_invoice(invoice_id))
+        except Exception as e:
+            LOG.error(f"Error deleting CryptoBot invoice {invoice_id}: {e}")
+            return False
 
-            invoices = await cryptopay.get_invoices(invoice_ids=[invoice_id])
-
-            if not invoices:
-                LOG.warning(f"CryptoBot invoice {invoice_id} not found")
-                return False
-
-            invoice = invoices[0]
-
-            if invoice.status == 'paid':
-                result = await self.session.execute(
-                    select(PaymentModel)
-                    .where(PaymentModel.id == payment_id)
-                    .with_for_update()
-                )
-                payment_locked = result.scalar_one_or_none()
-
-                if not payment_locked:
-                    LOG.debug(f"Payment {payment_id} not found during lock")
-                    return False
-
-                if payment_locked.status not in ['pending', 'expired']:
-                    LOG.debug(f"Payment {payment_id} has status {payment_locked.status}, cannot confirm")
-                    return False
-
-                if payment_locked.status == 'expired':
-                    LOG.warning(f"Recovering expired payment {payment_id} - user paid after local timeout but succeeded on CryptoBot")
-
-                result = await self.session.execute(
-                    select(User)
-                    .where(User.tg_id == payment_locked.tg_id)
-                    .with_for_update()
-                )
-                user = result.scalar_one_or_none()
-                if not user:
-                    LOG.error(f"User {payment_locked.tg_id} not found for payment {payment_id}")
-                    return False
-
-                if payment_locked.tx_hash is not None:
-                    LOG.warning(f"Payment {payment_id} already has tx_hash: {payment_locked.tx_hash}")
-                    return False
-
-                from datetime import datetime
-
-                old_balance = user.balance
-                tx_hash = f"cryptobot_{invoice_id}"
+    async def check_payment(self, session, payment_id: int) -> bool:
+        repo = await self.payment_repo(session)
+        payment = await repo.get_payment(payment_id)
+        if not payment:
+            LOG.warning(f"Payment {payment_id} not found")
+            return False
 
-                payment_locked.status = 'confirmed'
-                payment_locked.tx_hash = tx_hash
-                payment_locked.confirmed_at = datetime.utcnow()
+        return bool(await self.check_pending_payments(session, [payment]))
 
-                user.balance += payment_locked.amount
+    async def check_pending_payments(self, session, payments: List[Dict]) -> int:
+        invoices_to_payments = {}
+        for payment in payments:
+            if payment.get('status') not in ['pending', 'expired']:
+                LOG.debug(f"CryptoBot payment {payment['id']} has status {payment.get('status')}, cannot process")
+                continue
 
-                await self.session.commit()
+            extra_data = payment.get('extra_data') or {}
+            invoice_id = extra_data.get('invoice_id')
+            if not invoice_id:
+                LOG.debug(f"CryptoBot payment {payment['id']} has no invoice_id")
+                continue
 
-                LOG.info(f"CryptoBot payment confirmed: payment_id={payment_id}, user={user.tg_id}, "
-                        f"amount={payment_locked.amount}, balance: {old_balance} → {user.balance}, "
-                        f"invoice={invoice_id}")
+            invoices_to_payments[invoice_id] = payment['id']
 
-                from datetime import datetime
-                has_active_sub = user.subscription_end and user.subscription_end > datetime.utcnow()
+        if not invoices_to_payments:
+            return 0
 
-                await invalidate_user_cache(user.tg_id, 'balance')
+        try:
+            cryptopay = await self._get_cryptopay()
+        except Exception as e:
+            LOG.error(f"CryptoBot client unavailable, cannot check invoices: {e}")
+            return 0
 
-                await self.on_payment_confirmed(
-                    payment_id=payment_id,
-                    tx_hash=tx_hash,
-                    tg_id=user.tg_id,
-                    total_amount=payment_locked.amount,
-                    lang=user.lang,
-                    has_active_subscription=has_active_sub
-                )
-                return True
+        invoice_ids = list(invoices_to_payments)
+        paid = {}
+        for start in range(0, len(invoice_ids), INVOICES_PER_REQUEST):
+            chunk = invoice_ids[start:start + INVOICES_PER_REQUEST]
+            try:
+                invoices = await cryptopay.get_invoices(invoice_ids=chunk, count=len(chunk))
+            except Exception as e:
+                LOG.error(f"Error fetching CryptoBot invoices {chunk}: {e}")
+                continue
 
-            return False
+            for invoice in invoices or []:
+                if invoice.status == 'paid' and invoice.invoice_id in invoices_to_payments:
+                    paid[invoices_to_payments[invoice.invoice_id]] = f"cryptobot_{invoice.invoice_id}"
 
-        except Exception as e:
-            LOG.error(f"Error checking CryptoBot payment {payment_id}: {e}")
-            return False
+        confirmed = await self._confirm_paid(session, paid, allow_expired=True)
+        return len(confirmed)
 
     async def on_payment_confirmed(
         self,
@@ -213,20 +177,7 @@ class CryptoBotGateway(BasePaymentGateway):
     ):
         LOG.info(f"CryptoBot payment confirmed callback: id={payment_id}, tx={tx_hash}")
 
-        if self.bot and tg_id and total_amount:
-            from app.settings.utils.payment_notifications import send_payment_notification
-
-            try:
-                await send_payment_notification(
-                    bot=self.bot,
-                    tg_id=tg_id,
-                    amount=total_amount,
-                    lang=lang,
-                    has_active_subscription=has_active_subscription
-                )
-            except Exception as e:
-                LOG.error(f"Error sending payment notification to {tg_id}: {e}")
-
     async def close(self):
         if self._cryptopay:
             await self._cryptopay.close()
+            self._cryptopay = None
@@ -1,10 +1,8 @@
 import logging
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional
-from aiogram import Bot
 from .base import BasePaymentGateway
 from app.payments.models import PaymentResult, PaymentMethod
-from app.db.payments import PaymentRepository
 from app.settings.config import env
 
 LOG = logging.getLogger(__name__)
@@ -12,13 +10,9 @@ LOG = logging.getLogger(__name__)
 class TonGateway(BasePaymentGateway):
     requires_polling = True
 
-    def __init__(self, session, redis_client=None, bot: Optional[Bot] = None):
-        self.session = session
-        self.payment_repo = PaymentRepository(session, redis_client)
-        self.bot = bot
-
     async def create_payment(
         self,
+        session,
         t,
         tg_id: int,
         amount: Decimal,
@@ -56,66 +50,17 @@ class TonGateway(BasePaymentGateway):
             expected_crypto_amount=expected_ton
         )
 
-    async def check_payment(self, payment_id: int) -> bool:
-        payment = await self.payment_repo.get_payment(payment_id)
-        if not payment:
-            LOG.warning(f"Payment {payment_id} not found")
-            return False
-
-        if not payment.get('comment') or not payment.get('expected_crypto_amount'):
-            LOG.debug(f"TON payment {payment_id} incomplete: {payment}")
-            return False
-
-        current_status = payment.get('status')
-        if current_status == 'confirmed':
-            LOG.debug(f"TON payment {payment_id} already confirmed")
-            return False
+    async def check_payment(self, session, payment_id: int) -> bool:
+        repo = await self.payment_repo(session)
+        confirmed = await repo.confirm_ton_matches(payment_ids=[payment_id])
+        await self.notify_confirmed(confirmed)
+        return bool(confirmed)
 
-        if current_status not in ['pending', 'expired']:
-            LOG.debug(f"TON payment {payment_id} has status {current_status}, cannot process")
-            return False
-
-        tx = await self.payment_repo.get_pending_ton_transaction(
-            comment=payment.get('comment'),
-            amount=payment.get('expected_crypto_amount')
-        )
-
-        if not tx:
-            return False
-
-        from datetime import datetime
-        tx.processed_at = datetime.utcnow()
-
-        confirmed = await self._confirm_payment_atomic(
-            payment_id=payment_id,
-            tx_hash=tx.tx_hash,
-            amount=payment['amount'],
-            allow_expired=True
-        )
-
-        if confirmed:
-            from app.models.db import User
-            from sqlalchemy import select
-
-            async with self.session.begin():
-                result = await self.session.execute(
-                    select(User).where(User.tg_id == payment['tg_id'])
-                )
-                user = result.scalar_one_or_none()
-
-                if user:
-                    has_active_sub = user.subscription_end and user.subscription_end > datetime.utcnow()
-
-                    await self.on_payment_confirmed(
-                        payment_id=payment_id,
-                        tx_hash=tx.tx_hash,
-                        tg_id=user.tg_id,
-                        total_amount=payment['amount'],
-                        lang=user.lang,
-                        has_active_subscription=has_active_sub
-                    )
-
-        return confirmed
+    async def process_new_transactions(self, session) -> int:
+        repo = await self.payment_repo(session)
+        confirmed = await repo.confirm_ton_matches()
+        await self.notify_confirmed(confirmed)
+        return len(confirmed)
 
     async def on_payment_confirmed(
         self,
@@ -127,17 +72,3 @@ class TonGateway(BasePaymentGateway):
         has_active_subscription: bool = False
     ):
         LOG.info(f"TON payment confirmed callback: id={payment_id}, tx={tx_hash}")
-
-        if self.bot and tg_id and total_amount:
-            from app.settings.utils.payment_notifications import send_payment_notification
-
-            try:
-                await send_payment_notification(
-                    bot=self.bot,
-                    tg_id=tg_id,
-                    amount=total_amount,
-                    lang=lang,
-                    has_active_subscription=has_active_subscription
-                )
-            except Exception as e:
-                LOG.error(f"Error sending payment notification to {tg_id}: {e}")
@@ -3,14 +3,13 @@ import asyncio
 import uuid
 from decimal import Decimal
 from typing import Optional
+import aiohttp
 from aiogram import Bot
-from yookassa import Configuration, Payment as YooKassaPayment
-from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError, TimeoutError as Urllib3TimeoutError
-from requests.exceptions import ConnectTimeout, ReadTimeout, Timeout as RequestsTimeout
+from app.api.yookassa import YooKassaAPI, get_yookassa_api
 from .base import BasePaymentGateway
 from app.payments.models import PaymentResult, PaymentMethod
-from app.db.payments import PaymentRepository
 from app.settings.config import env
+from app.settings.utils.identity import get_bot_username
 
 LOG = logging.getLogger(__name__)
 
@@ -18,42 +17,22 @@ LOG = logging.getLogger(__name__)
 class YooKassaGateway(BasePaymentGateway):
     requires_polling = True
 
-    def __init__(self, session, redis_client=None, bot: Optional[Bot] = None):
-        self.session = session
-        self.payment_repo = PaymentRepository(session, redis_client)
-        self._configured = False
-        self.bot = bot
-
-    async def _ensure_configured(self):
-        if not self._configured:
-            if env.YOOKASSA_T:
-                shop_id = env.YOOKASSA_ID_T
-                secret_key = env.YOOKASSA_KEY_T
-                mode = "TESTNET"
-
-                if not shop_id or not secret_key:
-                    raise ValueError(
-                        "YOOKASSA_ID_T and YOOKASSA_KEY_T must be configured in .env "
-                        "when YOOKASSA_T=true"
-                    )
-            else:
-                shop_id = env.YOOKASSA_ID
-                secret_key = env.YOOKASSA_KEY
-                mode = "PRODUCTION"
+    def __init__(self, bot: Optional[Bot] = None):
+        super().__init__(bot)
+        self._api: Optional[YooKassaAPI] = None
 
-                if not shop_id or not secret_key:
-                    raise ValueError(
-                        "YOOKASSA_ID and YOOKASSA_KEY must be configured in .env "
-                        "when YOOKASSA_T=false"
-                    )
+    async def _ensure_configured(self) -> YooKassaAPI:
+        if self._api is None:
+            self._api = get_yookassa_api()
+        return self._api
 
-            await asyncio.to_thread(Configuration.configure, shop_id, secret_key)
-            Configuration.timeout = 30
-            self._configured = True
-            LOG.info(f"YooKassa configured successfully in {mode} mode (shop_id: {shop_id}, timeout=30s)")
+    async def warm_up(self):
+        await self._ensure_configured()
+        await get_bot_username(self.bot)
 
     async def create_payment(
         self,
+        session,
         t,
         tg_id: int,
         amount: Decimal,
@@ -65,10 +44,9 @@ class YooKassaGateway(BasePaymentGateway):
             raise ValueError("payment_id is required for YooKassa")
 
         try:
-            await self._ensure_configured()
+            api = await self._ensure_configured()
 
-            bot_info = await self.bot.get_me()
-            bot_username = bot_info.username
+            bot_username = await get_bot_username(self.bot)
             return_url = f"https://t.me/{bot_username}"
 
             payment_data = {
@@ -110,6 +88,7 @@ class YooKassaGateway(BasePaymentGateway):
             
             max_retries = 3
             last_error = None
+            idempotency_key = str(uuid.uuid4())
             
             for attempt in range(max_retries):
                 try:
@@ -119,12 +98,10 @@ class YooKassaGateway(BasePaymentGateway):
                                   f"waiting {wait_time}s before retry...")
                         await asyncio.sleep(wait_time)
                     
-                    yookassa_payment = await asyncio.to_thread(YooKassaPayment.create, payment_data)
+                    yookassa_payment = await api.create_payment(payment_data, idempotency_key)
                     break
                     
-                except (ConnectTimeoutError, ReadTimeoutError, Urllib3TimeoutError,
-                        ConnectTimeout, ReadTimeout, RequestsTimeout,
-                        TimeoutError, asyncio.TimeoutError) as timeout_err:
+                except (aiohttp.ServerTimeoutError, TimeoutError, asyncio.TimeoutError) as timeout_err:
                     last_error = timeout_err
                     error_type = type(timeout_err).__name__
                     LOG.warning(f"YooKassa API timeout (attempt {attempt + 1}/{max_retries}) for payment {payment_id}: "
@@ -145,21 +122,16 @@ class YooKassaGateway(BasePaymentGateway):
                 else:
                     raise ValueError("YooKassa API failed: unknown error")
 
-            if not yookassa_payment or not yookassa_payment.id:
+            if not yookassa_payment or not yookassa_payment.get('id'):
                 raise ValueError("YooKassa returned invalid payment response")
 
-            if not hasattr(yookassa_payment, 'confirmation') or not yookassa_payment.confirmation:
+            if not yookassa_payment.get('confirmation'):
                 raise ValueError("YooKassa payment missing confirmation")
 
-            confirmation_url = yookassa_payment.confirmation.confirmation_url
+            confirmation_url = yookassa_payment['confirmation'].get('confirmation_url')
             if not confirmation_url:
                 raise ValueError("YooKassa payment missing confirmation URL")
 
-            await self.payment_repo.update_payment_metadata(
-                payment_id=payment_id,
-                metadata={'yookassa_payment_id': yookassa_payment.id}
-            )
-
             text = (
                 t("yookassa_payment_intro") + "\n\n"
                 + t("yookassa_amount", amount=amount) + "\n\n"
@@ -168,7 +140,7 @@ class YooKassaGateway(BasePaymentGateway):
 
             mode = "TESTNET" if env.YOOKASSA_T else "PRODUCTION"
             LOG.info(f"YooKassa payment created successfully: payment_id={payment_id}, "
-                    f"yookassa_id={yookassa_payment.id}, amount={amount}, "
+                    f"yookassa_id={yookassa_payment['id']}, amount={amount}, "
                     f"url={confirmation_url}, mode={mode}")
 
             return PaymentResult(
@@ -176,7 +148,8 @@ class YooKassaGateway(BasePaymentGateway):
                 method=PaymentMethod.YOOKASSA,
                 amount=amount,
                 text=text,
-                pay_url=confirmation_url
+                pay_url=confirmation_url,
+                extra_data={'yookassa_payment_id': yookassa_payment['id']}
             )
 
         except ValueError as ve:
@@ -188,12 +161,10 @@ class YooKassaGateway(BasePaymentGateway):
                      f"amount={amount}: {error_type}: {error_msg}", exc_info=True)
             raise ValueError(f"Failed to create YooKassa payment: {error_type}: {error_msg}")
 
-    async def check_payment(self, payment_id: int) -> bool:
+    async def check_payment(self, session, payment_id: int) -> bool:
         try:
-            from app.models.db import Payment as PaymentModel, User
-            from sqlalchemy import select
-
-            payment = await self.payment_repo.get_payment(payment_id)
+            repo = await self.payment_repo(session)
+            payment = await repo.get_payment(payment_id)
             if not payment:
                 LOG.warning(f"Payment {payment_id} not found")
                 return False
@@ -214,79 +185,21 @@ class YooKassaGateway(BasePaymentGateway):
                 LOG.debug(f"YooKassa payment {payment_id} has no yookassa_payment_id")
                 return False
 
-            await self._ensure_configured()
+            api = await self._ensure_configured()
 
-            yookassa_payment = await asyncio.to_thread(YooKassaPayment.find_one, yookassa_payment_id)
+            yookassa_payment = await api.find_payment(yookassa_payment_id)
 
             if not yookassa_payment:
                 LOG.warning(f"YooKassa payment {yookassa_payment_id} not found")
                 return False
 
-            if yookassa_payment.status == 'succeeded':
-                result = await self.session.execute(
-                    select(PaymentModel)
-                    .where(PaymentModel.id == payment_id)
-                    .with_for_update()
-                )
-                payment_locked = result.scalar_one_or_none()
-
-                if not payment_locked:
-                    LOG.debug(f"Payment {payment_id} not found during lock")
-                    return False
-
-                if payment_locked.status not in ['pending', 'expired']:
-                    LOG.debug(f"Payment {payment_id} has status {payment_locked.status}, cannot confirm")
-                    return False
-
-                if payment_locked.status == 'expired':
-                    LOG.warning(f"Recovering expired payment {payment_id}")
-
-                result = await self.session.execute(
-                    select(User)
-                    .where(User.tg_id == payment_locked.tg_id)
-                    .with_for_update()
-                )
-                user = result.scalar_one_or_none()
-                if not user:
-                    LOG.error(f"User {payment_locked.tg_id} not found for payment {payment_id}")
-                    return False
-
-                if payment_locked.tx_hash is not None:
-                    LOG.warning(f"Payment {payment_id} already has tx_hash: {payment_locked.tx_hash}")
-                    return False
-
-                from datetime import datetime
-
-                old_balance = user.balance
-                tx_hash = f"yookassa_{yookassa_payment_id}"
-
-                payment_locked.status = 'confirmed'
-                payment_locked.tx_hash = tx_hash
-                payment_locked.confirmed_at = datetime.utcnow()
-                user.balance += payment_locked.amount
-
-                await self.session.commit()
-
-                LOG.info(f"YooKassa payment confirmed: payment_id={payment_id}, user={user.tg_id}, "
-                        f"amount={payment_locked.amount}, balance: {old_balance} → {user.balance}")
-
-                has_active_sub = user.subscription_end and user.subscription_end > datetime.utcnow()
-
-                try:
-                    redis = await self.payment_repo.get_redis()
-                    await redis.delete(f"user:{user.tg_id}:balance")
-                except Exception as e:
-                    LOG.warning(f"Redis error invalidating cache for user {user.tg_id}: {e}")
-
-                await self.on_payment_confirmed(
-                    payment_id=payment_id,
-                    tx_hash=tx_hash,
-                    tg_id=user.tg_id,
-                    total_amount=payment_locked.amount,
-                    lang=user.lang,
-                    has_active_subscription=has_active_sub
+            if yookassa_payment.get('status') == 'succeeded':
+                confirmed = await self._confirm_paid(
+                    session,
+                    {payment_id: f"yookassa_{yookassa_payment_id}"},
+                    allow_expired=True
                 )
-                return True
+                return bool(confirmed)
 
             return False
 
@@ -294,9 +207,10 @@ class YooKassaGateway(BasePaymentGateway):
             LOG.error(f"Error checking YooKassa payment {payment_id}: {e}")
             return False
 
-    async def cancel_payment(self, payment_id: int) -> bool:
+    async def cancel_payment(self, session, payment_id: int) -> bool:
         try:
-            payment = await self.payment_repo.get_payment(payment_id)
+            repo = await self.payment_repo(session)
+            payment = await repo.get_payment(payment_id)
             if not payment or payment.get('status') != 'pending':
                 LOG.warning(f"Payment {payment_id} not found or not pending")
                 return False
@@ -312,24 +226,35 @@ class YooKassaGateway(BasePaymentGateway):
                 LOG.warning(f"Payment {payment_id} has no yookassa_payment_id, skipping remote cancel")
                 return True
 
-            await self._ensure_configured()
-            idempotency_key = uuid.uuid4()
+            return await self._cancel_remote(yookassa_payment_id)
 
-            LOG.info(f"Cancelling YooKassa payment {yookassa_payment_id}")
+        except Exception as e:
+            LOG.error(f"Error cancelling YooKassa payment {payment_id}: {e}", exc_info=True)
+            return False
 
-            cancelled_payment = await asyncio.to_thread(
-                YooKassaPayment.cancel, yookassa_payment_id, idempotency_key
-            )
+    async def discard_payment(self, extra_data: Optional[dict]) -> bool:
+        yookassa_payment_id = (extra_data or {}).get('yookassa_payment_id')
+        if not yookassa_payment_id:
+            return True
+        try:
+            return await self._cancel_remote(yookassa_payment_id)
+        except Exception as e:
+            LOG.error(f"Error discarding YooKassa payment {yookassa_payment_id}: {e}")
+            return False
 
-            if getattr(cancelled_payment, 'status', None) == 'canceled':
-                LOG.info(f"Successfully cancelled YooKassa payment {yookassa_payment_id}")
-                return True
-            else:
-                LOG.warning(f"Could not cancel YooKassa payment {yookassa_payment_id}")
-                return False
+    async def _cancel_remote(self, yookassa_payment_id: str) -> bool:
+        api = await self._ensure_configured()
+        idempotency_key = str(uuid.uuid4())
 
-        except Exception as e:
-            LOG.error(f"Error cancelling YooKassa payment {payment_id}: {e}", exc_info=True)
+        LOG.info(f"Cancelling YooKassa payment {yookassa_payment_id}")
+
+        cancelled_payment = await api.cancel_payment(yookassa_payment_id, idempotency_key)
+
+        if cancelled_payment.get('status') == 'canceled':
+            LOG.info(f"Successfully cancelled YooKassa payment {yookassa_payment_id}")
+            return True
+        else:
+            LOG.warning(f"Could not cancel YooKassa payment {yookassa_payment_id}")
             return False
 
     async def on_payment_confirmed(
@@ -342,15 +267,3 @@ class YooKassaGateway(BasePaymentGateway):
         has_active_subscription: bool = False
     ):
         LOG.info(f"YooKassa payment confirmed: id={payment_id}, tx={tx_hash}")
-        if self.bot and tg_id and total_amount:
-            from app.settings.utils.payment_notifications import send_payment_notification
-            try:
-                await send_payment_notification(
-                    bot=self.bot,
-                    tg_id=tg_id,
-                    amount=total_amount,
-                    lang=lang,
-                    has_active_subscription=has_active_subscription
-                )
-            except Exception as e:
-                LOG.error(f"Error sending payment notification to {tg_id}: {e}")
\ No newline at end of file
@@ -1,11 +1,13 @@
 from aiogram import Router
 
-from . import auth, configs, subscriptions, payments, settings
+from . import admin, dispatch, auth, configs, subscriptions, payments, settings
 
 
 def get_router() -> Router:
     main_router = Router()
 
+    main_router.include_router(admin.router)
+    main_router.include_router(dispatch.router)
     main_router.include_router(auth.router)
     main_router.include_router(configs.router)
     main_router.include_router(subscriptions.router)
@@ -0,0 +1,54 @@
+from aiogram import Router, F
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from app.settings.config import env
+from app.settings.utils.bans import ban_user, unban_user
+from app.settings.tasks.leases import get_job_status
+
+router = Router()
+router.message.filter(F.from_user.id.in_(env.ADMIN_TG_IDS))
+
+
+@router.message(Command("ban"))
+async def ban_command(message: Message, command: CommandObject):
+    args = (command.args or "").split(maxsplit=1)
+    if not args or not args[0].isdigit():
+        await message.answer("Usage: /ban <tg_id> [minutes] [reason]")
+        return
+
+    tg_id = int(args[0])
+    rest = args[1] if len(args) > 1 else ""
+    first, _, remainder = rest.partition(" ")
+    if first.isdigit():
+        minutes, reason = int(first), remainder.strip() or None
+    else:
+        minutes, reason = None, rest.strip() or None
+
+    await ban_user(tg_id, reason=reason, minutes=minutes, banned_by=message.from_user.id)
+    duration = f"for {minutes} min" if minutes else "permanently"
+    await message.answer(f"User {tg_id} banned {duration}")
+
+
+@router.message(Command("unban"))
+async def unban_command(message: Message, command: CommandObject):
+    arg = (command.args or "").strip()
+    if not arg.isdigit():
+        await message.answer("Usage: /unban <tg_id>")
+        return
+
+    removed = await unban_user(int(arg))
+    await message.answer(f"User {arg} unbanned" if removed else f"User {arg} was not banned")
+
+
+@router.message(Command("jobs"))
+async def jobs_command(message: Message):
+    lines = []
+    for job in await get_job_status():
+        last = f"{job['seconds_since_run']}s ago" if job["seconds_since_run"] is not None else "never"
+        holder = f"running on {job['holder']} ({job['lease_ttl_ms']} ms left)" if job["holder"] else "idle"
+        lines.append(
+            f"{job['job']}: {holder}; last run {last}, {job['last_result'] or '-'}, "
+            f"{job['last_duration_ms'] or 0} ms, token {job['last_token'] or '-'} on {job['last_owner'] or '-'}"
+        )
+    await message.answer("\n".join(lines) or "No scheduled jobs")
@@ -1,10 +1,13 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.filters import CommandStart
 from aiogram.types import Message, CallbackQuery
 
 from app.keys import main_kb, referral_kb
+from app.keys.callbacks import Cb
 from app.db.user import UserRepository
 from app.settings.config import env
+from app.settings.utils.identity import get_bot_username
+from .dispatch import callbacks
 from .helpers import safe_answer_callback, extract_referrer_id
 
 router = Router()
@@ -41,7 +44,7 @@ async def cmd_start(message: Message, t, user_repo: UserRepository):
         await message.answer(t("free_trial_activated"))
 
 
-@router.callback_query(F.data == 'back_main')
+@callbacks.on(Cb.BACK_MAIN)
 async def back_to_main(callback: CallbackQuery, t):
     await safe_answer_callback(callback)
     tg_id = callback.from_user.id
@@ -52,12 +55,12 @@ async def back_to_main(callback: CallbackQuery, t):
     )
 
 
-@router.callback_query(F.data == 'referral')
+@callbacks.on(Cb.REFERRAL)
 async def referral(callback: CallbackQuery, t):
     await safe_answer_callback(callback)
     tg_id = callback.from_user.id
 
-    bot_username = (await callback.message.bot.get_me()).username
+    bot_username = await get_bot_username(callback.bot)
     ref_link = f"https://t.me/{bot_username}?start=ref_{tg_id}"
 
     text = t('referral_text', ref_link=f"<pre><code>{ref_link}</code></pre>")
@@ -1,25 +1,27 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import CallbackQuery, LinkPreviewOptions
 from sqlalchemy.exc import OperationalError, TimeoutError as SQLTimeoutError
 
 from app.keys import actions_kb, sub_kb, qr_delete_kb
+from app.keys.callbacks import Cb
 from app.db.user import UserRepository
 from app.settings.log import get_logger
 from app.settings.config import env
-from app.settings.utils.qrcode import generate_qr_code
+from app.settings.utils.qrcode import answer_qr
+from .dispatch import callbacks
 from .helpers import safe_answer_callback, update_configs_view
 
 router = Router()
 LOG = get_logger(__name__)
 
 
-@router.callback_query(F.data == "myvpn")
+@callbacks.on(Cb.MYVPN)
 async def myvpn_callback(callback: CallbackQuery, t, user_repo: UserRepository):
     await safe_answer_callback(callback)
     await update_configs_view(callback, t, user_repo, callback.from_user.id)
 
 
-@router.callback_query(F.data == "add_config")
+@callbacks.on(Cb.ADD_CONFIG)
 async def add_config_callback(callback: CallbackQuery, t, user_repo: UserRepository):
     tg_id = callback.from_user.id
 
@@ -50,10 +52,9 @@ async def add_config_callback(callback: CallbackQuery, t, user_repo: UserReposit
         await safe_answer_callback(callback, t('error_creating_config'), show_alert=True)
 
 
-@router.callback_query(F.data.startswith("cfg_"))
-async def config_selected(callback: CallbackQuery, t, lang: str, user_repo: UserRepository):
+@callbacks.on(Cb.CONFIG)
+async def config_selected(callback: CallbackQuery, t, lang: str, user_repo: UserRepository, cfg_id: int):
     await safe_answer_callback(callback)
-    cfg_id = int(callback.data.split("_")[1])
     tg_id = callback.from_user.id
 
     configs = await user_repo.get_configs(tg_id)
@@ -74,9 +75,8 @@ async def config_selected(callback: CallbackQuery, t, lang: str, user_repo: User
     )
 
 
-@router.callback_query(F.data.startswith("delete_cfg_"))
-async def config_delete(callback: CallbackQuery, t, user_repo: UserRepository):
-    cfg_id = int(callback.data.split("_")[2])
+@callbacks.on(Cb.DELETE_CONFIG)
+async def config_delete(callback: CallbackQuery, t, user_repo: UserRepository, cfg_id: int):
     tg_id = callback.from_user.id
 
     try:
@@ -89,10 +89,9 @@ async def config_delete(callback: CallbackQuery, t, user_repo: UserRepository):
         await safe_answer_callback(callback, t('error_deleting_config'), show_alert=True)
 
 
-@router.callback_query(F.data.startswith("qr_cfg_"))
-async def qr_config(callback: CallbackQuery, t, user_repo: UserRepository):
+@callbacks.on(Cb.QR_CONFIG)
+async def qr_config(callback: CallbackQuery, t, user_repo: UserRepository, cfg_id: int):
     await safe_answer_callback(callback)
-    cfg_id = int(callback.data.split("_")[2])
     tg_id = callback.from_user.id
 
     configs = await user_repo.get_configs(tg_id)
@@ -103,9 +102,9 @@ async def qr_config(callback: CallbackQuery, t, user_repo: UserRepository):
         return
 
     try:
-        photo = generate_qr_code(cfg['vless_link'])
-        await callback.message.answer_photo(
-            photo=photo,
+        await answer_qr(
+            callback.message,
+            cfg['vless_link'],
             caption=t('your_config'),
             reply_markup=qr_delete_kb(t)
         )
@@ -115,7 +114,7 @@ async def qr_config(callback: CallbackQuery, t, user_repo: UserRepository):
         await safe_answer_callback(callback, t('error_creating_config'), show_alert=True)
 
 
-@router.callback_query(F.data == "delete_qr_msg")
+@callbacks.on(Cb.DELETE_QR_MSG)
 async def delete_qr_message(callback: CallbackQuery):
     await safe_answer_callback(callback)
     await callback.message.delete()
\ No newline at end of file
@@ -0,0 +1,50 @@
+from typing import Any, Callable, Dict
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.types import CallbackQuery
+
+from app.keys.callbacks import CallbackSpec, decode
+
+
+class CallbackTable:
+    def __init__(self, name: str = "callbacks"):
+        self._routes: Dict[str, CallableObject] = {}
+        self.router = Router(name=name)
+        self.router.callback_query.register(self._dispatch, self._match)
+
+    def on(self, *specs: CallbackSpec) -> Callable:
+        def decorator(handler: Callable) -> Callable:
+            for spec in specs:
+                if spec.prefix in self._routes:
+                    raise ValueError(f"Callback {spec.prefix} already has a handler")
+                self._routes[spec.prefix] = CallableObject(handler)
+            return handler
+        return decorator
+
+    async def _match(self, callback: CallbackQuery) -> bool | Dict[str, Any]:
+        if not callback.data:
+            return False
+
+        decoded = decode(callback.data)
+        if decoded is None:
+            return False
+
+        spec, values = decoded
+        route = self._routes.get(spec.prefix)
+        if route is None:
+            return False
+        return {"callback_route": route, "callback_values": values}
+
+    async def _dispatch(
+        self,
+        callback: CallbackQuery,
+        callback_route: CallableObject,
+        callback_values: Dict[str, Any],
+        **data: Any
+    ) -> Any:
+        return await callback_route.call(callback, **{**data, **callback_values})
+
+
+callbacks = CallbackTable()
+router = callbacks.router
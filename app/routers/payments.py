@@ -8,18 +8,18 @@ from aiogram.types import Message, CallbackQuery, PreCheckoutQuery, ContentType,
 from sqlalchemy.exc import OperationalError, TimeoutError as SQLTimeoutError
 
 from app.keys import (
-    balance_kb, payment_methods_kb, payment_amounts_kb,
-    back_balance, payment_success_actions
+    balance_kb, back_balance, payment_success_actions,
+    add_funds_screen, select_amount_screen
 )
+from app.keys.callbacks import Cb
 from app.db.user import UserRepository
 from app.db.payments import PaymentRepository
-from app.payments.manager import PaymentManager
 from app.payments.models import PaymentMethod
 from app.settings.log import get_logger
-from app.db.cache import get_redis
 from app.settings.config import env
+from app.settings.middlewares import UpdateContainer
+from .dispatch import callbacks
 from .helpers import safe_answer_callback, get_user_balance, format_expire_date
-from app.settings.factory import create_bot
 
 router = Router()
 
@@ -30,7 +30,7 @@ class PaymentState(StatesGroup):
     waiting_custom_amount = State()
 
 
-@router.callback_query(F.data == 'balance')
+@callbacks.on(Cb.BALANCE)
 async def balance_callback(callback: CallbackQuery, t, state: FSMContext, user_repo: UserRepository):
     await safe_answer_callback(callback)
     await state.clear()
@@ -57,52 +57,47 @@ async def balance_callback(callback: CallbackQuery, t, state: FSMContext, user_r
     await callback.message.edit_text(text, reply_markup=balance_kb(t, show_renew=show_renew_button))
 
 
-@router.callback_query(F.data == 'add_funds')
+@callbacks.on(Cb.ADD_FUNDS)
 async def add_funds_callback(callback: CallbackQuery, t):
     await safe_answer_callback(callback)
-    await callback.message.edit_text(
-        t('payment_method'),
-        reply_markup=payment_methods_kb(t)
-    )
+    text, kb = add_funds_screen(t)
+    await callback.message.edit_text(text, reply_markup=kb)
 
 
-@router.callback_query(F.data.startswith('select_method_'))
-async def select_payment_method(callback: CallbackQuery, t):
+@callbacks.on(Cb.SELECT_METHOD)
+async def select_payment_method(callback: CallbackQuery, t, method: str):
     await safe_answer_callback(callback)
-    method = callback.data.replace('select_method_', '')
-    await callback.message.edit_text(
-        t('select_amount'),
-        reply_markup=payment_amounts_kb(t, method)
-    )
+    text, kb = select_amount_screen(t, method)
+    await callback.message.edit_text(text, reply_markup=kb)
 
 
-@router.callback_query(F.data.startswith('amount_'))
-async def process_amount_selection(callback: CallbackQuery, t, state: FSMContext):
+@callbacks.on(Cb.AMOUNT)
+async def process_amount_selection(
+    callback: CallbackQuery,
+    t,
+    state: FSMContext,
+    container: UpdateContainer,
+    method: str,
+    amount: int | str
+):
     await safe_answer_callback(callback)
-    parts = callback.data.split('_')
-    method_str = parts[1]
-    amount_str = parts[2]
 
-    if amount_str == 'custom':
+    if amount == 'custom':
         await state.set_state(PaymentState.waiting_custom_amount)
-        await state.set_data({'method': method_str})
+        await state.set_data({'method': method})
         await callback.message.edit_text(t('enter_amount'), reply_markup=back_balance(t))
         return
 
-    try:
-        amount = Decimal(amount_str)
-        if amount <= 0 or amount < env.MIN_PAYMENT_AMOUNT or amount > env.MAX_PAYMENT_AMOUNT:
-            raise ValueError("Invalid preset amount")
-    except (ValueError, TypeError) as e:
-        LOG.error(f"Invalid preset amount: {amount_str} - {e}")
+    if amount <= 0 or amount < env.MIN_PAYMENT_AMOUNT or amount > env.MAX_PAYMENT_AMOUNT:
+        LOG.error(f"Invalid preset amount: {amount}")
         await callback.message.edit_text(t('invalid_amount'), reply_markup=balance_kb(t))
         return
 
-    await process_payment(callback, t, method_str, amount)
+    await process_payment(callback, t, container, method, Decimal(amount))
 
 
 @router.message(StateFilter(PaymentState.waiting_custom_amount))
-async def process_custom_amount(message: Message, state: FSMContext, t):
+async def process_custom_amount(message: Message, state: FSMContext, t, container: UpdateContainer):
     tg_id = message.from_user.id
 
     try:
@@ -125,13 +120,13 @@ async def process_custom_amount(message: Message, state: FSMContext, t):
         await state.clear()
         return
     await state.clear()
-    await process_payment(message, t, method_str, amount)
+    await process_payment(message, t, container, method_str, amount)
 
 
 def _build_payment_keyboard(t, method: PaymentMethod, result):
     if method == PaymentMethod.TON:
         return InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text=t('payment_sent'), callback_data=f'payment_sent_{result.payment_id}')]
+            [InlineKeyboardButton(text=t('payment_sent'), callback_data=Cb.PAYMENT_SENT.pack(result.payment_id))]
         ])
     elif method == PaymentMethod.STARS and result.url:
         return InlineKeyboardMarkup(inline_keyboard=[
@@ -147,7 +142,7 @@ def _build_payment_keyboard(t, method: PaymentMethod, result):
             return None
         return InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text=t('pay_button'), url=result.pay_url)],
-            [InlineKeyboardButton(text=t('payment_sent'), callback_data=f'payment_sent_{result.payment_id}')]
+            [InlineKeyboardButton(text=t('payment_sent'), callback_data=Cb.PAYMENT_SENT.pack(result.payment_id))]
         ])
 
     return None
@@ -164,7 +159,7 @@ def _build_payment_text(t, method: PaymentMethod, result):
     return result.text
 
 
-async def process_payment(msg_or_callback, t, method_str: str, amount: Decimal):
+async def process_payment(msg_or_callback, t, container: UpdateContainer, method_str: str, amount: Decimal):
     tg_id = msg_or_callback.from_user.id
     is_callback = isinstance(msg_or_callback, CallbackQuery)
 
@@ -181,34 +176,28 @@ async def process_payment(msg_or_callback, t, method_str: str, amount: Decimal):
 
     payment_id = None
     try:
-        redis_client = await get_redis()
-        from app.db.db import get_session
-        async with get_session() as session:
-            manager = PaymentManager(session, redis_client)
-            chat_id = msg_or_callback.message.chat.id if is_callback else msg_or_callback.chat.id
-            
-            result = await manager.create_payment(t, tg_id=tg_id, method=method, amount=amount, chat_id=chat_id)
-            payment_id = result.payment_id
-
-            text = _build_payment_text(t, method, result)
-            kb = _build_payment_keyboard(t, method, result)
-            parse_mode = "HTML" if method == PaymentMethod.TON else None
-
-            if is_callback:
-                await msg_or_callback.message.answer(text, reply_markup=kb, parse_mode=parse_mode)
-            else:
-                await msg_or_callback.answer(text, reply_markup=kb, parse_mode=parse_mode)
+        manager = container.payment_manager
+        chat_id = msg_or_callback.message.chat.id if is_callback else msg_or_callback.chat.id
+
+        result = await manager.create_payment(t, tg_id=tg_id, method=method, amount=amount, chat_id=chat_id)
+        payment_id = result.payment_id
+
+        text = _build_payment_text(t, method, result)
+        kb = _build_payment_keyboard(t, method, result)
+        parse_mode = "HTML" if method == PaymentMethod.TON else None
+
+        if is_callback:
+            await msg_or_callback.message.answer(text, reply_markup=kb, parse_mode=parse_mode)
+        else:
+            await msg_or_callback.answer(text, reply_markup=kb, parse_mode=parse_mode)
 
     except (ValueError, OperationalError, SQLTimeoutError) as e:
         LOG.error(f"Payment error for user {tg_id}: {type(e).__name__}: {e}", exc_info=True)
         
         if payment_id:
             try:
-                redis_client = await get_redis()
-                from app.db.db import get_session
-                async with get_session() as session:
-                    manager = PaymentManager(session, redis_client)
-                    await manager.cancel_payment(payment_id)
+                await container.session.rollback()
+                await container.payment_manager.cancel_payment(payment_id)
                 LOG.info(f"Cancelled payment {payment_id} for user {tg_id} due to gateway error")
             except Exception as cancel_err:
                 LOG.error(f"Failed to cancel payment {payment_id}: {cancel_err}", exc_info=True)
@@ -224,11 +213,8 @@ async def process_payment(msg_or_callback, t, method_str: str, amount: Decimal):
         
         if payment_id:
             try:
-                redis_client = await get_redis()
-                from app.db.db import get_session
-                async with get_session() as session:
-                    manager = PaymentManager(session, redis_client)
-                    await manager.cancel_payment(payment_id)
+                await container.session.rollback()
+                await container.payment_manager.cancel_payment(payment_id)
                 LOG.info(f"Cancelled payment {payment_id} for user {tg_id} due to unexpected error")
             except Exception as cancel_err:
                 LOG.error(f"Failed to cancel payment {payment_id}: {cancel_err}", exc_info=True)
@@ -292,7 +278,7 @@ async def pre_checkout(pre_checkout_query: PreCheckoutQuery):
 
 
 @router.message(F.content_type == ContentType.SUCCESSFUL_PAYMENT)
-async def successful_payment(message: Message, t, user_repo: UserRepository):
+async def successful_payment(message: Message, t, container: UpdateContainer):
     tg_id = message.from_user.id
 
     if not message.successful_payment:
@@ -309,139 +295,102 @@ async def successful_payment(message: Message, t, user_repo: UserRepository):
 
     rub_amount = Decimal(stars_paid) * Decimal(str(env.TELEGRAM_STARS_RATE))
 
-    from app.db.db import get_session
-    async with get_session() as session:
-        try:
-            from app.models.db import Payment as PaymentModel, User
-            from sqlalchemy import select
+    session = container.session
+    try:
+        from app.models.db import Payment as PaymentModel
+        from sqlalchemy import select
+
+        result = await session.execute(
+            select(PaymentModel).where(
+                PaymentModel.tg_id == tg_id,
+                PaymentModel.method == 'stars',
+                PaymentModel.status == 'pending',
+                PaymentModel.amount == rub_amount
+            ).order_by(PaymentModel.created_at.desc()).limit(1)
+        )
+        payment = result.scalar_one_or_none()
 
-            result = await session.execute(
-                select(User).where(User.tg_id == tg_id).with_for_update()
-            )
-            user = result.scalar_one_or_none()
-            if not user:
-                LOG.error(f"User {tg_id} not found for Stars payment")
-                await message.answer(t('user_not_found'))
-                return
-
-            result = await session.execute(
-                select(PaymentModel).where(
-                    PaymentModel.tg_id == tg_id,
-                    PaymentModel.method == 'stars',
-                    PaymentModel.status == 'pending',
-                    PaymentModel.amount == rub_amount
-                ).with_for_update()
-            )
-            payment = result.scalar_one_or_none()
-
-            if not payment:
-                result = await session.execute(
-                    select(PaymentModel).where(
-                        PaymentModel.tx_hash == payment_id,
-                        PaymentModel.status == 'confirmed'
-                    )
-                )
-                existing = result.scalar_one_or_none()
-                if existing:
-                    LOG.warning(f"Stars payment {payment_id} already confirmed")
-                    await message.answer(t('payment_already_processed'))
-                    return
-
-                LOG.error(f"No pending Stars payment found for user {tg_id} with amount {rub_amount}")
-                await message.answer(t('payment_not_found'))
-                return
-
-            if payment.expires_at and datetime.utcnow() > payment.expires_at:
-                LOG.warning(f"Stars payment {payment.id} expired")
-                payment.status = 'expired'
-                await session.commit()
-                await message.answer(t('payment_expired'))
-                return
-
-            if payment.tx_hash is not None:
-                LOG.warning(f"Payment {payment.id} already has tx_hash: {payment.tx_hash}")
-                await message.answer(t('payment_already_processed'))
-                return
-
-            old_balance = user.balance
-
-            payment.status = 'confirmed'
-            payment.tx_hash = payment_id
-            payment.confirmed_at = datetime.utcnow()
-            user.balance += rub_amount
-            new_balance = user.balance
+        if not payment:
+            LOG.error(f"No pending Stars payment found for user {tg_id} with amount {rub_amount}")
+            await message.answer(t('payment_not_found'))
+            return
 
+        if payment.expires_at and datetime.utcnow() > payment.expires_at:
+            LOG.warning(f"Stars payment {payment.id} expired")
+            payment.status = 'expired'
             await session.commit()
+            await message.answer(t('payment_expired'))
+            return
 
-            LOG.info(f"Stars payment confirmed: payment_id={payment.id}, user={tg_id}, "
-                    f"amount={rub_amount}, balance: {old_balance} → {new_balance}")
+        confirmed = await container.payment_repo.confirm_payments(
+            {payment.id: payment_id},
+            allow_expired=False,
+            notify=False
+        )
 
-            try:
-                redis = await user_repo.get_redis()
-                await redis.delete(f"user:{tg_id}:balance")
-            except Exception as redis_err:
-                LOG.warning(f"Redis error invalidating cache for user {tg_id}: {redis_err}")
+        if not confirmed:
+            LOG.warning(f"Stars payment {payment_id} already processed")
+            await message.answer(t('payment_already_processed'))
+            return
 
-            has_active_sub = await user_repo.has_active_subscription(tg_id)
-            success_text = t('payment_success', amount=float(rub_amount))
+        success_text = t('payment_success', amount=float(rub_amount))
 
-            await message.answer(
-                success_text,
-                reply_markup=payment_success_actions(t, has_active_sub)
-            )
+        await message.answer(
+            success_text,
+            reply_markup=payment_success_actions(t, confirmed[0].has_active_subscription)
+        )
 
-        except Exception as e:
-            await session.rollback()
-            LOG.error(f"Error confirming Stars payment for user {tg_id}: {type(e).__name__}: {e}")
-            await message.answer(t('error_creating_payment'))
-            raise
+    except Exception as e:
+        await session.rollback()
+        LOG.error(f"Error confirming Stars payment for user {tg_id}: {type(e).__name__}: {e}")
+        await message.answer(t('error_creating_payment'))
+        raise
 
 
-@router.callback_query(F.data.startswith('payment_sent_'))
+@callbacks.on(Cb.PAYMENT_SENT)
 async def payment_sent_callback(
     callback: CallbackQuery, 
     t,
     user_repo: UserRepository,
-    payment_repo: PaymentRepository
+    payment_repo: PaymentRepository,
+    container: UpdateContainer,
+    payment_id: int
 ):
     await safe_answer_callback(callback, t('payment_checking'), show_alert=True)
 
     tg_id = callback.from_user.id
-    payment_id = int(callback.data.replace('payment_sent_', ''))
 
-    from app.db.db import get_session
-    async with get_session() as session:
-        try:
-            redis_client = await get_redis()
-            manager = PaymentManager(session, redis_client)
+    try:
+        manager = container.payment_manager
 
-            payment = await payment_repo.get_payment(payment_id)
+        payment = await payment_repo.get_payment(payment_id)
 
-            if not payment:
-                raise ValueError(f"Payment {payment_id} not found")
+        if not payment:
+            raise ValueError(f"Payment {payment_id} not found")
 
-            confirmed = await manager.check_payment(payment_id)
+        confirmed = await manager.check_payment(payment_id)
 
-            balance = await get_user_balance(user_repo, tg_id)
-            has_active_sub = await user_repo.has_active_subscription(tg_id)
+        balance = await get_user_balance(user_repo, tg_id)
+        has_active_sub = await user_repo.has_active_subscription(tg_id)
 
-            if confirmed:
-                text = t('payment_success', amount=float(payment['amount'])) + "\n\n" + t('balance_text', balance=balance)
-            else:
-                text = t('payment_not_found') + "\n\n" + t('balance_text', balance=balance)
+        if confirmed:
+            text = t('payment_success', amount=float(payment['amount'])) + "\n\n" + t('balance_text', balance=balance)
+        else:
+            text = t('payment_not_found') + "\n\n" + t('balance_text', balance=balance)
 
-            if has_active_sub:
-                sub_end = await user_repo.get_subscription_end(tg_id)
-                expire_date = format_expire_date(sub_end)
-                text += f"\n\n{t('subscription_active_until', expire_date=expire_date)}"
-            else:
-                cheapest = min(env.plans.values(), key=lambda x: x['price'])
-                text += f"\n\n{t('subscription_from', price=cheapest['price'])}"
+        if has_active_sub:
+            sub_end = await user_repo.get_subscription_end(tg_id)
+            expire_date = format_expire_date(sub_end)
+            text += f"\n\n{t('subscription_active_until', expire_date=expire_date)}"
+        else:
+            cheapest = min(env.plans.values(), key=lambda x: x['price'])
+            text += f"\n\n{t('subscription_from', price=cheapest['price'])}"
 
-            await callback.message.edit_text(text, reply_markup=balance_kb(t))
+        await callback.message.edit_text(text, reply_markup=balance_kb(t))
 
-        except Exception as e:
-            LOG.error(f"Error checking payment {payment_id}: {e}")
-            balance = await get_user_balance(user_repo, tg_id)
-            text = t('balance_text', balance=balance)
-            await callback.message.edit_text(text, reply_markup=balance_kb(t))
\ No newline at end of file
+    except Exception as e:
+        LOG.error(f"Error checking payment {payment_id}: {e}")
+        await container.session.rollback()
+        balance = await get_user_balance(user_repo, tg_id)
+        text = t('balance_text', balance=balance)
+        await callback.message.edit_text(text, reply_markup=balance_kb(t))
\ No newline at end of file
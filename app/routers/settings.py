@@ -1,31 +1,32 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import CallbackQuery
 
-from app.keys import set_kb, language_kb
+from app.keys import settings_screen, language_screen
+from app.keys.callbacks import Cb
 from app.db.user import UserRepository
+from .dispatch import callbacks
 from .helpers import safe_answer_callback
 
 router = Router()
 
 
-@router.callback_query(F.data == 'settings')
+@callbacks.on(Cb.SETTINGS)
 async def settings_callback(callback: CallbackQuery, t):
     await safe_answer_callback(callback)
-    await callback.message.edit_text(t("settings_text"), reply_markup=set_kb(t))
+    text, kb = settings_screen(t)
+    await callback.message.edit_text(text, reply_markup=kb)
 
 
-@router.callback_query(F.data == 'change_lang')
+@callbacks.on(Cb.CHANGE_LANG)
 async def change_lang_callback(callback: CallbackQuery, t):
     await safe_answer_callback(callback)
-    await callback.message.edit_text(
-        t("choose_language"),
-        reply_markup=language_kb(t)
-    )
+    text, kb = language_screen(t)
+    await callback.message.edit_text(text, reply_markup=kb)
 
 
-@router.callback_query(F.data.startswith("set_lang:"))
-async def set_lang_callback(callback: CallbackQuery, t, user_repo: UserRepository):
-    lang = callback.data.split(":")[1]
+@callbacks.on(Cb.SET_LANG)
+async def set_lang_callback(callback: CallbackQuery, t, user_repo: UserRepository, lang_code: str):
+    lang = lang_code
     tg_id = callback.from_user.id
 
     await user_repo.set_lang(tg_id, lang)
@@ -33,8 +34,5 @@ async def set_lang_callback(callback: CallbackQuery, t, user_repo: UserRepositor
     await safe_answer_callback(callback, t("language_updated"), show_alert=True)
 
     from app.settings.locales import get_translator
-    new_t = get_translator(lang)
-    await callback.message.edit_text(
-        new_t("settings_text"),
-        reply_markup=set_kb(new_t)
-    )
+    text, kb = settings_screen(get_translator(lang))
+    await callback.message.edit_text(text, reply_markup=kb)
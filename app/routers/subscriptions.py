@@ -1,17 +1,19 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import CallbackQuery
 
 from app.keys import sub_kb, myvpn_kb
+from app.keys.callbacks import Cb
 from app.db.user import UserRepository
 from app.settings.log import get_logger
 from app.settings.config import env
+from .dispatch import callbacks
 from .helpers import safe_answer_callback, get_user_balance, format_expire_date
 
 router = Router()
 LOG = get_logger(__name__)
 
 
-@router.callback_query(F.data == "buy_sub")
+@callbacks.on(Cb.BUY_SUB)
 async def buy_sub_callback(callback: CallbackQuery, t, user_repo: UserRepository):
     await safe_answer_callback(callback)
     tg_id = callback.from_user.id
@@ -30,7 +32,7 @@ async def buy_sub_callback(callback: CallbackQuery, t, user_repo: UserRepository
     )
 
 
-@router.callback_query(F.data.in_({"sub_1m", "sub_3m", "sub_6m", "sub_12m"}))
+@callbacks.on(Cb.SUB_1M, Cb.SUB_3M, Cb.SUB_6M, Cb.SUB_12M)
 async def sub_buy_callback(callback: CallbackQuery, t, user_repo: UserRepository):
     plan = env.plans[callback.data]
     days, price = plan["days"], plan["price"]
@@ -68,7 +70,7 @@ async def sub_buy_callback(callback: CallbackQuery, t, user_repo: UserRepository
         )
 
 
-@router.callback_query(F.data == "renew_subscription")
+@callbacks.on(Cb.RENEW_SUBSCRIPTION)
 async def renew_subscription_callback(callback: CallbackQuery, t, user_repo: UserRepository):
     await safe_answer_callback(callback)
     tg_id = callback.from_user.id
@@ -39,6 +39,43 @@ class EnvSettingsFile(BaseSettings):
     TELEGRAM_STARS_RATE: float = 1.5
     FREE_TRIAL_DAYS: int = 3
     PAYMENT_TIMEOUT_MINUTES: int = 15
+    RATES_REFRESH_SECONDS: int = 60
+    RATES_MAX_STALE_SECONDS: int = 1800
+    HTTP_POOL_SIZE: int = 100
+    HTTP_LIMIT_PER_HOST: int = 20
+    HTTP_TIMEOUT_SECONDS: int = 30
+    NOTIFICATION_DISPATCH_SECONDS: int = 5
+    JOB_LEASE_SECONDS: int = 60
+    EXPIRY_TIMELINE_SECONDS: int = 5
+    NOTIFICATION_BATCH_SIZE: int = 50
+    NOTIFICATION_MAX_ATTEMPTS: int = 10
+    NOTIFICATION_INFLIGHT_SECONDS: int = 600
+    RATE_LIMIT_BACKEND: str = "local"
+    USER_LOCK_BACKEND: str = "local"
+    USER_LOCK_LEASE_MS: int = 30000
+    USER_LOCK_WAIT_SECONDS: float = 10
+    LANE_PAYMENTS_CONCURRENCY: int = 20
+    LANE_PROVISIONING_CONCURRENCY: int = 10
+    LANE_NAVIGATION_CONCURRENCY: int = 50
+    LANE_QUEUE_SIZE: int = 500
+    QR_WORKERS: int = 1
+    QR_CACHE_DIR: str = "cache/qr"
+    TELEGRAM_GLOBAL_RATE: float = 30
+    TELEGRAM_CHAT_RATE: float = 1
+    CAMPAIGN_RATE_PER_SECOND: float = 25
+    CAMPAIGN_CONCURRENCY: int = 20
+    CAMPAIGN_JITTER_MS: int = 200
+    WEBHOOK_URL: str = ""
+    WEBHOOK_PATH: str = "/telegram/webhook"
+    WEBHOOK_SECRET: str = ""
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    UPDATE_STREAMS: bool = False
+    STREAM_PARTITIONS: int = 16
+    STREAM_MAXLEN: int = 100000
+    STREAM_CLAIM_IDLE_MS: int = 60000
+    STREAM_MAX_DELIVERIES: int = 5
+    WORKER_COUNT: int = 1
     REFERRAL_BONUS: int
     IS_LOGGING: bool = True
     LOG_LEVEL: str = "INFO"
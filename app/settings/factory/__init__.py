@@ -1,5 +1,11 @@
 from .factory import create_bot
+from .dispatcher import create_dispatcher, create_rate_limiter
+from .lifecycle import startup, shutdown
 
 __all__ = [
-    'create_bot'
-]
\ No newline at end of file
+    'create_bot',
+    'create_dispatcher',
+    'create_rate_limiter',
+    'startup',
+    'shutdown',
+]
@@ -0,0 +1,52 @@
+from aiogram import Dispatcher
+
+from app.routers import router
+from app.settings.locales import LocaleMiddleware
+from app.settings.middlewares import (
+    BlacklistMiddleware, RateLimitMiddleware, RedisRateLimitBackend, RepositoryMiddleware, UserLockMiddleware,
+    get_update_lanes
+)
+from app.settings.config import env
+
+
+def create_rate_limiter() -> RateLimitMiddleware:
+    return RateLimitMiddleware(
+        default_limit=0.8,
+        custom_limits={
+            '/start': 1,
+            'add_funds': 1.0,
+            'pm:ton': 5.0,
+            'pm:stars': 5.0,
+            'buy_sub': 2.0,
+            'sub_1m': 2.0,
+            'sub_3m': 2.0,
+            'sub_6m': 2.0,
+            'sub_12m': 2.0,
+        },
+        backend=RedisRateLimitBackend() if env.RATE_LIMIT_BACKEND == "redis" else None,
+    )
+
+
+def create_dispatcher(limiter: RateLimitMiddleware) -> Dispatcher:
+    dp = Dispatcher()
+    dp.include_router(router)
+
+    dp.update.outer_middleware(BlacklistMiddleware())
+    dp.update.outer_middleware(get_update_lanes())
+    dp.update.outer_middleware(RepositoryMiddleware())
+
+    dp.message.middleware(LocaleMiddleware())
+    dp.callback_query.middleware(LocaleMiddleware())
+
+    dp.message.middleware(limiter)
+    dp.callback_query.middleware(limiter)
+
+    user_lock = UserLockMiddleware(
+        distributed=env.USER_LOCK_BACKEND == "redis",
+        lease_ms=env.USER_LOCK_LEASE_MS,
+        wait_timeout=env.USER_LOCK_WAIT_SECONDS,
+    )
+    dp.message.middleware(user_lock)
+    dp.callback_query.middleware(user_lock)
+
+    return dp
@@ -1,5 +1,10 @@
 from aiogram import Bot
 from app.settings.config import env
+from app.settings.middlewares.flood_control import get_flood_control
+from app.settings.middlewares.views import get_noop_edits
 
 def create_bot() -> Bot:
-    return Bot(token=env.BOT_TOKEN)
\ No newline at end of file
+    bot = Bot(token=env.BOT_TOKEN)
+    bot.session.middleware(get_noop_edits())
+    bot.session.middleware(get_flood_control())
+    return bot
\ No newline at end of file
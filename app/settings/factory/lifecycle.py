@@ -0,0 +1,40 @@
+from aiogram import Bot
+
+from app.db.cache import init_cache, close_cache
+from app.db.db import close_db
+from app.db.init_db import init_database
+from app.api.http_client import init_http, close_http
+from app.settings.utils.rates import init_rates, close_rates
+from app.payments.manager import stop_polling
+from app.payments.registry import init_gateways, close_gateways
+from app.settings.middlewares import get_flood_control, get_update_lanes, get_noop_edits
+from app.settings.utils.bans import init_bans, close_bans
+from app.settings.utils.qrcode import init_qr_pool, close_qr_pool
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+
+async def startup(bot: Bot):
+    await init_database()
+    await init_cache()
+    await init_http()
+    await init_rates()
+    await init_bans()
+    init_gateways(bot)
+    init_qr_pool()
+
+
+async def shutdown(bot: Bot):
+    await close_bans()
+    await stop_polling()
+    await close_gateways()
+    close_qr_pool()
+    await close_rates()
+    await bot.session.close()
+    LOG.info(f"Telegram send queue stats: {get_flood_control().get_metrics()}")
+    LOG.info(f"Update lane stats: {get_update_lanes().get_metrics()}")
+    LOG.info(f"Absorbed {get_noop_edits().not_modified} no-op message edits")
+    await close_http()
+    await close_db()
+    await close_cache()
@@ -1,7 +1,8 @@
-from .locales import get_translator
+from .locales import get_translator, Translator
 from .locales_mw import LocaleMiddleware
 
 __all__ = [
     'get_translator',
+    'Translator',
     'LocaleMiddleware',
 ]
\ No newline at end of file
@@ -0,0 +1,120 @@
+MESSAGES = {
+    "welcome": "Welcome to OrbitVPN! Choose an option:",
+    "change_language": "Language",
+    "no_configs": "You don't have any VPN configs yet.",
+    "your_configs": "Your VPN configs:",
+    "config_created": "Config created. Your VPN configs:",
+    'your_config': 'Your config:',
+    "config_selected": "Click to copy:",
+    "config_deleted": "Config deleted",
+    "balance_text": "Your balance is {balance} RUB",
+    "settings_text": "Your settings:",
+    "choose_language": "Choose your language:",
+    "language_updated": "Language updated.",
+    "balance": "Balance 💵",
+    "my_vpn": "My VPN 👤",
+    "help": "Help 💬",
+    "settings": "Settings ⚙️",
+    "low_balance": "Not enough funds.",
+    "add_funds": "Add Funds 💸",
+    "referral": "Referral",
+    "error_creating_config": "Error creating config. Try later or contact support.",
+    "back_main": "Back to main",
+    "back": "Back",
+    "delete_config": "Delete",
+    "qr_code": "QR Code",
+    "error_creating_payment": "Error creating payment. Try later.",
+    "creating_config": "Creating config...",
+    "max_configs_reached": "Max configs reached (1). Delete old one.",
+    "buy_sub_text": "Choose subscription:",
+    "sub_1m": "1 mo - {price} RUB",
+    "sub_3m": "3 mo - {price} RUB",
+    "sub_6m": "6 mo - {price} RUB",
+    "sub_12m": "12 mo - {price} RUB",
+    "sub_success": "Subscription bought! Config created.",
+    "payment_method": "Choose payment method:",
+    "pm_stars": "Telegram Stars",
+    "select_amount": "Select top-up amount:",
+    "enter_amount": "Enter top-up amount (RUB, min 200):",
+    "invalid_amount": "Invalid amount. Enter number >=200.",
+    "pay_button": "Pay",
+    "payment_created": "Pay {amount} Stars to top up {amount} RUB.",
+    'renew_config': 'Renew',
+    'config_expired': 'Expired',
+    'config_active': 'Active',
+    "free_trial_activated": "You have access to a free 3-day trial period",
+    "referral_text": "Invite a friend — each of you get 50 RUB.\n\nYour referral link:\n{ref_link}",
+    "sub_renewed_auto": "Subscription renewed automatically.",
+    "sub_expired_low_balance": "Subscription expired (low balance for auto-renew).",
+    "sub_renewed": "Subscription renewed.",
+    'buy_sub': 'Subscribe',
+    "subscription_expired": "Your subscription has expired. Renew your subscription to continue using VPN.",
+    "your_configs_with_sub": "Your subscription:\n\nActive until: {expire_date}",
+    "no_configs_has_sub": "You have no configurations\n\nSubscription active until: {expire_date}",
+    "subscription_active_until": "Subscription active until: {expire_date}",
+    "subscription_expired_on": "Subscription expired: {expire_date}",
+    "renew_subscription_btn": "Renew Subscription",
+    "no_subscription": "No active subscription",
+    "sub_purchased": "Subscription purchased successfully!",
+    "sub_purchased_create_config": "Subscription purchased! Create a configuration.",
+    "create_first_config": "Subscription activated!\n\nNow create your first VPN configuration:",
+    "error_buying_sub": "Error purchasing subscription",
+    "sub_success_with_expire": "Subscription active until: {expire_date}",
+    "extend_subscription": "Select the duration:",
+    "current_sub_until": "Subscription valid until: {expire_date}",
+    "add_config": "Add configuration",
+    'share': 'Share',
+    "too_fast": "You're sending too many requests",
+    'custom_amount': 'Custom amount',
+    'subscription_from': 'Subscription from {price} RUB/mo',
+    'config': 'Config',
+    'payment_success': '✓ Balance topped up by {amount:.2f} RUB\n\nYou can now:',
+    'extend': 'Extend',
+    'extend_by_1m': '+ 1 mo {price} RUB',
+    'extend_by_3m': '+ 3 mo {price} RUB',
+    'extend_by_6m': '+ 6 mo {price} RUB',
+    'extend_by_12m': '+ 12 mo {price} RUB',
+    'ton_payment_instruction': (
+            "Payment via TON\n\n"
+            "Send {ton_amount} to the wallet:\n"
+            "{wallet}\n\n"
+            "Comment: {comment}\n\n"
+            "Payment without the comment will not be credited."
+    ),
+    'stars_add_title': 'Add funds to balance',
+    'stars_add_description': 'Add {amount} RUB to your balance',
+    'how_to_install': 'How to install',
+    'stars_invoice_sent': 'Invoice sent. Check your messages',
+    'stars_price_label': 'Top-up',
+    'config_not_found': 'Configuration not found',
+    'error_deleting_config': 'Error deleting configuration',
+    'no_servers_or_cache_error': 'No available servers. Try again later',
+    'payment_already_processed': 'Payment already processed',
+    'ton_payment_intro': 'Payment via TON',
+    'ton_send_amount': 'Amount to pay: {expected_ton} TON (~{amount} RUB)',
+    'ton_wallet': 'Wallet: {wallet}',
+    'ton_comment': 'Comment: {comment}',
+    'ton_comment_warning': '⚠️ Important: Payment without comment will not be credited!',
+    'cryptobot_payment_intro': 'Payment via CryptoBot',
+    'cryptobot_amount': 'Amount to pay: {amount} RUB',
+    'cryptobot_click_button': 'Click the button below to pay',
+    'yookassa_payment_intro': 'Payment via YooKassa',
+    'yookassa_amount': 'Amount to pay: {amount} RUB',
+    'yookassa_click_button': 'Click the button below to pay',
+    'cancel_payment': 'Cancel payment',
+    'payment_cancelled': 'Payment cancelled',
+    'payment_expired': 'Payment expired',
+    'payment_not_found': 'Payment not found or already processed',
+    'service_temporarily_unavailable': 'Service temporarily unavailable. Please try again later.',
+    'payment_sent': 'Payment sent',
+    'payment_checking': 'Checking payment...\n\nBalance will be credited automatically after blockchain confirmation.\n\nUsually takes 1-2 minutes.',
+    'access_denied': 'Access denied',
+    'sub_expiry_3days': 'Your subscription expires in 3 days!\n\nWe recommend renewing it in advance to avoid VPN service interruptions.',
+    'sub_expiry_1day': '1 day left until your subscription expires.\n\nRenew now — it takes less than a minute!',
+    'quick_renewal_info': '💰 Month: {price}₽ | Need: {needed}₽',
+    'quick_renewal_ready': '✓ Balance sufficient! Month: {price}₽',
+    'sub_expired': 'Your subscription has expired.\n\nRenew now to enjoy safe and fast VPN without limitations again!',
+    'auto_renewal_success': '✓ Subscription auto-renewed!\n\n📅 +{days} days for {price:.0f}₽\n💰 Balance: {balance:.2f}₽\n⏰ Active until: {expire_date}',
+    'confirm_yes': 'Yes, delete',
+    'confirm_no': 'Cancel',
+}
@@ -1,253 +1,126 @@
-LOCALES = {
-    "ru": {
-        "welcome": "Добро пожаловать в OrbitVPN! Выберите опцию:",
-        "change_language": "Язык",
-        "no_configs": "У вас ещё нет VPN конфигураций.",
-        "your_configs": "Ваши VPN конфигурации:",
-        "config_created": "Конфигурация создана. Ваши VPN конфигурации:",
-        'your_config': 'Ваша подписка:',
-        "config_selected": "Нажмите чтобы скопировать:",
-        "config_deleted": "Конфигурация удалена",
-        "balance_text": "Ваш баланс: {balance} RUB",
-        "settings_text": "Ваши настройки:",
-        "choose_language": "Выберите язык:",
-        "language_updated": "Язык обновлён.",
-        "balance": "Баланс 💵",
-        "my_vpn": "Мой VPN 👤",
-        "help": "Помощь 💬",
-        "settings": "Настройки ⚙️",
-        "low_balance": "Недостаточно средств.",
-        "add_funds": "Пополнить баланс 💸",
-        "referral": "Реферал",
-        "error_creating_config": "Ошибка при создании конфигурации. Попробуйте позже или свяжитесь с поддержкой.",
-        "add_config": "Добавить конфигурацию",
-        "back_main": "В главное меню",
-        "back": "Назад",
-        "delete_config": "Удалить",
-        "qr_code": "QR-код",
-        "error_creating_payment": "Ошибка при создании платежа. Попробуйте позже.",
-        "creating_config": "Создаём конфигурацию...",
-        "max_configs_reached": "Достигнут максимум конфигураций (1). Удалите старую.",
-        "buy_sub_text": "Выберите подписку:",
-        "sub_1m": "1 мес - {price} RUB",
-        "sub_3m": "3 мес - {price} RUB",
-        "sub_6m": "6 мес - {price} RUB",
-        "sub_12m": "12 мес - {price} RUB",
-        "sub_success": "Подписка куплена! Конфигурация создана.",
-        "payment_method": "Выберите способ оплаты:",
-        "pm_stars": "Telegram Stars",
-        "select_amount": "Выберите сумму пополнения:",
-        "enter_amount": "Введите сумму пополнения (RUB, минимум 200):",
-        "invalid_amount": "Неверная сумма. Введите число >=200.",
-        "pay_button": "Оплатить",
-        "payment_created": "Оплатите {amount} Stars для пополнения {amount} RUB.",
-        'renew_config': 'Продлить',
-        'config_expired': 'Истёк',
-        'config_active': 'Активно',
-        "free_trial_activated": "Вам доступен бесплатный пробный период 3 дня",
-        "referral_text": "Пригласите друга — каждый получит 50 RUB.\n\nВаша реферальная ссылка:\n{ref_link}",
-        "sub_renewed_auto": "Подписка продлена автоматически.",
-        "sub_expired_low_balance": "Подписка истекла (недостаточно средств для авто-продления).",
-        "sub_renewed": "Подписка продлена.",
-        'buy_sub': 'Купить подписку',
-        "subscription_expired": "Ваша подписка истекла. Продлите подписку, чтобы продолжить использование VPN.",
-        "your_configs_with_sub": "Ваша подписка:\n\nАктивна до: {expire_date}",
-        "no_configs_has_sub": "У вас нет конфигураций\n\nПодписка активна до: {expire_date}",
-        "subscription_active_until": "Подписка активна до: {expire_date}",
-        "subscription_expired_on": "Подписка истекла: {expire_date}",
-        "renew_subscription_btn": "Продлить подписку",
-        "no_subscription": "Нет активной подписки",
-        "sub_purchased": "Подписка успешно приобретена!",
-        "sub_purchased_create_config": "Подписка куплена! Создайте конфигурацию.",
-        "create_first_config": "Подписка активирована!\n\nТеперь создайте свою первую конфигурацию VPN:",
-        "error_buying_sub": "Ошибка при покупке подписки",
-        "sub_success_with_expire": "Подписка активна до: {expire_date}",
-        "extend_subscription": "Выберите срок продления:",
-        "current_sub_until": "Подписка действует до: {expire_date}",
-        'share': 'Поделиться',
-        "too_fast": "Вы отправляете слишком много запросов",
-        'custom_amount': 'Другая сумма',
-        'subscription_from': 'Подписка от {price} RUB/мес',
-        'config': 'Конфигурация',
-        'payment_success': '✓ Баланс пополнен на {amount:.2f} RUB\n\nТеперь вы можете:',
-        'extend': 'Продлить',
-        'extend_by_1m': '+ 1 мес {price} RUB',
-        'extend_by_3m': '+ 3 мес {price} RUB',
-        'extend_by_6m': '+ 6 мес {price} RUB',
-        'extend_by_12m': '+ 12 мес {price} RUB',
-        'ton_payment_instruction': (
-                "Оплата через TON\n\n"
-                "Отправьте {ton_amount} на кошелек:\n"
-                "{wallet}\n\n"
-                "Комментарий: {comment}\n\n"
-                "Без комментария платёж не будет засчитан."    
-        ),
-        'stars_add_title': 'Пополнение баланса',
-        'stars_add_description': 'Пополните баланс на {amount} RUB',
-        'how_to_install': 'Инструкция по установке',
-        'stars_invoice_sent': 'Счёт отправлен. Проверьте сообщения',
-        'stars_price_label': 'Пополнение',
-        'config_not_found': 'Конфигурация не найдена',
-        'error_deleting_config': 'Ошибка при удалении конфигурации',
-        'no_servers_or_cache_error': 'Нет доступных серверов. Попробуйте позже',
-        'payment_already_processed': 'Платёж уже обработан',
-        'ton_payment_intro': 'Оплата через TON',
-        'ton_send_amount': 'Сумма к оплате: {expected_ton} TON (~{amount} RUB)',
-        'ton_wallet': 'Кошелёк: {wallet}',
-        'ton_comment': 'Комментарий: {comment}',
-        'ton_comment_warning': '⚠️ Важно: Без комментария платёж не будет засчитан!',
-        'cryptobot_payment_intro': 'Оплата через CryptoBot',
-        'cryptobot_amount': 'Сумма к оплате: {amount} RUB',
-        'cryptobot_click_button': 'Нажмите кнопку ниже для оплаты',
-        'yookassa_payment_intro': 'Оплата через YooKassa',
-        'yookassa_amount': 'Сумма к оплате: {amount} RUB',
-        'yookassa_click_button': 'Нажмите кнопку ниже для оплаты',
-        'cancel_payment': 'Отменить платёж',
-        'payment_cancelled': 'Платёж отменён',
-        'payment_expired': 'Платёж истёк',
-        'payment_not_found': 'Платёж не найден или уже обработан',
-        'service_temporarily_unavailable': 'Сервис временно недоступен. Пожалуйста, попробуйте позже.',
-        'payment_sent': 'Отправил оплату',
-        'payment_checking': 'Проверяем платёж...\n\nБаланс будет зачислен автоматически после подтверждения транзакции в блокчейне.\n\nОбычно это занимает 1-2 минуты.',
-        'sub_expiry_3days': 'Ваша подписка истекает через 3 дня!\n\nРекомендуем продлить её заранее, чтобы избежать перебоев в работе VPN.',
-        'sub_expiry_1day': 'До окончания подписки остался 1 день.\n\nПродлите сейчас — это займёт меньше минуты!',
-        'quick_renewal_info': '💰 Месяц: {price}₽ | Нужно: {needed}₽',
-        'quick_renewal_ready': '✓ Баланс достаточен! Месяц: {price}₽',
-        'sub_expired': 'Срок действия вашей подписки истёк.\n\nПродлите подписку, чтобы снова пользоваться безопасным и быстрым VPN без ограничений!',
-        'auto_renewal_success': '✓ Подписка автоматически продлена!\n\n📅 +{days} дней за {price:.0f}₽\n💰 Баланс: {balance:.2f}₽\n⏰ Активна до: {expire_date}',
-        'confirm_yes': 'Да, удалить',
-        'confirm_no': 'Отмена',
-    },
-    "en": {
-        "welcome": "Welcome to OrbitVPN! Choose an option:",
-        "change_language": "Language",
-        "no_configs": "You don't have any VPN configs yet.",
-        "your_configs": "Your VPN configs:",
-        "config_created": "Config created. Your VPN configs:",
-        'your_config': 'Your config:',
-        "config_selected": "Click to copy:",
-        "config_deleted": "Config deleted",
-        "balance_text": "Your balance is {balance} RUB",
-        "settings_text": "Your settings:",
-        "choose_language": "Choose your language:",
-        "language_updated": "Language updated.",
-        "balance": "Balance 💵",
-        "my_vpn": "My VPN 👤",
-        "help": "Help 💬",
-        "settings": "Settings ⚙️",
-        "low_balance": "Not enough funds.",
-        "add_funds": "Add Funds 💸",
-        "referral": "Referral",
-        "error_creating_config": "Error creating config. Try later or contact support.",
-        "back_main": "Back to main",
-        "back": "Back",
-        "delete_config": "Delete",
-        "qr_code": "QR Code",
-        "error_creating_payment": "Error creating payment. Try later.",
-        "creating_config": "Creating config...",
-        "max_configs_reached": "Max configs reached (1). Delete old one.",
-        "buy_sub_text": "Choose subscription:",
-        "sub_1m": "1 mo - {price} RUB",
-        "sub_3m": "3 mo - {price} RUB",
-        "sub_6m": "6 mo - {price} RUB",
-        "sub_12m": "12 mo - {price} RUB",
-        "sub_success": "Subscription bought! Config created.",
-        "payment_method": "Choose payment method:",
-        "pm_stars": "Telegram Stars",
-        "select_amount": "Select top-up amount:",
-        "enter_amount": "Enter top-up amount (RUB, min 200):",
-        "invalid_amount": "Invalid amount. Enter number >=200.",
-        "pay_button": "Pay",
-        "payment_created": "Pay {amount} Stars to top up {amount} RUB.",
-        'renew_config': 'Renew',
-        'config_expired': 'Expired',
-        'config_active': 'Active',
-        "free_trial_activated": "You have access to a free 3-day trial period",
-        "referral_text": "Invite a friend — each of you get 50 RUB.\n\nYour referral link:\n{ref_link}",
-        "sub_renewed_auto": "Subscription renewed automatically.",
-        "sub_expired_low_balance": "Subscription expired (low balance for auto-renew).",
-        "sub_renewed": "Subscription renewed.",
-        'buy_sub': 'Subscribe',
-        "subscription_expired": "Your subscription has expired. Renew your subscription to continue using VPN.",
-        "your_configs_with_sub": "Your subscription:\n\nActive until: {expire_date}",
-        "no_configs_has_sub": "You have no configurations\n\nSubscription active until: {expire_date}",
-        "subscription_active_until": "Subscription active until: {expire_date}",
-        "subscription_expired_on": "Subscription expired: {expire_date}",
-        "renew_subscription_btn": "Renew Subscription",
-        "no_subscription": "No active subscription",
-        "sub_purchased": "Subscription purchased successfully!",
-        "sub_purchased_create_config": "Subscription purchased! Create a configuration.",
-        "create_first_config": "Subscription activated!\n\nNow create your first VPN configuration:",
-        "error_buying_sub": "Error purchasing subscription",
-        "sub_success_with_expire": "Subscription active until: {expire_date}",
-        "extend_subscription": "Select the duration:",
-        "current_sub_until": "Subscription valid until: {expire_date}",
-        "add_config": "Add configuration",
-        'share': 'Share',
-        "too_fast": "You're sending too many requests",
-        'custom_amount': 'Custom amount',
-        'subscription_from': 'Subscription from {price} RUB/mo',
-        'config': 'Config',
-        'payment_success': '✓ Balance topped up by {amount:.2f} RUB\n\nYou can now:',
-        'extend': 'Extend',
-        'extend_by_1m': '+ 1 mo {price} RUB',
-        'extend_by_3m': '+ 3 mo {price} RUB',
-        'extend_by_6m': '+ 6 mo {price} RUB',
-        'extend_by_12m': '+ 12 mo {price} RUB',
-        'ton_payment_instruction': (
-                "Payment via TON\n\n"
-                "Send {ton_amount} to the wallet:\n"
-                "{wallet}\n\n"
-                "Comment: {comment}\n\n"
-                "Payment without the comment will not be credited."
-        ),
-        'stars_add_title': 'Add funds to balance',
-        'stars_add_description': 'Add {amount} RUB to your balance',
-        'how_to_install': 'How to install',
-        'stars_invoice_sent': 'Invoice sent. Check your messages',
-        'stars_price_label': 'Top-up',
-        'config_not_found': 'Configuration not found',
-        'error_deleting_config': 'Error deleting configuration',
-        'no_servers_or_cache_error': 'No available servers. Try again later',
-        'payment_already_processed': 'Payment already processed',
-        'ton_payment_intro': 'Payment via TON',
-        'ton_send_amount': 'Amount to pay: {expected_ton} TON (~{amount} RUB)',
-        'ton_wallet': 'Wallet: {wallet}',
-        'ton_comment': 'Comment: {comment}',
-        'ton_comment_warning': '⚠️ Important: Payment without comment will not be credited!',
-        'cryptobot_payment_intro': 'Payment via CryptoBot',
-        'cryptobot_amount': 'Amount to pay: {amount} RUB',
-        'cryptobot_click_button': 'Click the button below to pay',
-        'yookassa_payment_intro': 'Payment via YooKassa',
-        'yookassa_amount': 'Amount to pay: {amount} RUB',
-        'yookassa_click_button': 'Click the button below to pay',
-        'cancel_payment': 'Cancel payment',
-        'payment_cancelled': 'Payment cancelled',
-        'payment_expired': 'Payment expired',
-        'payment_not_found': 'Payment not found or already processed',
-        'service_temporarily_unavailable': 'Service temporarily unavailable. Please try again later.',
-        'payment_sent': 'Payment sent',
-        'payment_checking': 'Checking payment...\n\nBalance will be credited automatically after blockchain confirmation.\n\nUsually takes 1-2 minutes.',
-        'access_denied': 'Access denied',
-        'sub_expiry_3days': 'Your subscription expires in 3 days!\n\nWe recommend renewing it in advance to avoid VPN service interruptions.',
-        'sub_expiry_1day': '1 day left until your subscription expires.\n\nRenew now — it takes less than a minute!',
-        'quick_renewal_info': '💰 Month: {price}₽ | Need: {needed}₽',
-        'quick_renewal_ready': '✓ Balance sufficient! Month: {price}₽',
-        'sub_expired': 'Your subscription has expired.\n\nRenew now to enjoy safe and fast VPN without limitations again!',
-        'auto_renewal_success': '✓ Subscription auto-renewed!\n\n📅 +{days} days for {price:.0f}₽\n💰 Balance: {balance:.2f}₽\n⏰ Active until: {expire_date}',
-        'confirm_yes': 'Yes, delete',
-        'confirm_no': 'Cancel',
-    }
-}
-
-def get_translator(lang: str):
-    lang_dict = LOCALES.get(lang, LOCALES["en"])
-
-    def translate(key: str, **kwargs):
-        text = lang_dict.get(key, key)
-        try:
-            return text.format(**kwargs)
-        except Exception:
+import importlib
+import keyword
+from string import Formatter
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+DEFAULT_LANG = "en"
+LANGUAGES = ("ru", "en")
+
+_formatter = Formatter()
+
+
+def _placeholders(template: str) -> FrozenSet[str]:
+    names = set()
+    for _, field, _, _ in _formatter.parse(template):
+        if field is not None:
+            names.add(field.split(".", 1)[0].split("[", 1)[0])
+    return frozenset(names)
+
+
+def _compile(template: str) -> Optional[Callable[..., str]]:
+    # turns 'Paid {amount:.2f} for {days} days' into
+    # def render(amount, days, **_): return 'Paid ' + format(amount, '.2f') + ' for ' + format(days, '') + ' days'
+    # so a call skips parsing and a missing argument fails loudly; None means plain str.format is needed
+    parts, params = [], []
+    for literal, field, spec, conversion in _formatter.parse(template):
+        if literal:
+            parts.append(repr(literal))
+        if field is None:
+            continue
+        if not field.isidentifier() or keyword.iskeyword(field) or "{" in (spec or ""):
+            return None
+        value = {"r": f"repr({field})", "s": f"str({field})", "a": f"ascii({field})"}.get(conversion, field)
+        parts.append(f"format({value}, {spec or ''!r})")
+        if field not in params:
+            params.append(field)
+
+    namespace: Dict[str, Callable[..., str]] = {}
+    exec(f"def render({', '.join(params)}, **_):\n    return {' + '.join(parts) or repr('')}", {}, namespace)
+    return namespace["render"]
+
+
+class Catalog:
+    def __init__(self, lang: str, messages: Dict[str, str], fallback: Optional["Catalog"] = None):
+        self.lang = lang
+        self.constants: Dict[str, str] = {}
+        self.templates: Dict[str, Tuple[str, FrozenSet[str], Optional[Callable[..., str]]]] = {}
+
+        for key, text in messages.items():
+            fields = _placeholders(text)
+            if fallback is not None:
+                expected = fallback.placeholders(key)
+                if expected is not None and expected != fields:
+                    raise ValueError(
+                        f"Locale {lang}: {key} uses placeholders {sorted(fields)}, "
+                        f"{fallback.lang} uses {sorted(expected)}"
+                    )
+
+            if fields:
+                self.templates[key] = (text, fields, _compile(text))
+            else:
+                self.constants[key] = text.format()
+
+        if fallback is not None:
+            for key, text in fallback.constants.items():
+                self.constants.setdefault(key, text)
+            for key, entry in fallback.templates.items():
+                if key not in self.constants:
+                    self.templates.setdefault(key, entry)
+
+    def placeholders(self, key: str) -> Optional[FrozenSet[str]]:
+        if key in self.constants:
+            return frozenset()
+        entry = self.templates.get(key)
+        return entry[1] if entry else None
+
+
+class Translator:
+    __slots__ = ("lang", "_constants", "_templates")
+
+    def __init__(self, catalog: Catalog):
+        self.lang = catalog.lang
+        self._constants = catalog.constants
+        self._templates = catalog.templates
+
+    def __call__(self, key: str, **kwargs) -> str:
+        text = self._constants.get(key)
+        if text is not None:
             return text
 
-    return translate
\ No newline at end of file
+        entry = self._templates.get(key)
+        if entry is None:
+            return key
+
+        template, fields, render = entry
+        try:
+            return render(**kwargs) if render is not None else template.format(**kwargs)
+        except (TypeError, KeyError, IndexError, ValueError) as e:
+            LOG.error(f"Cannot format {self.lang}:{key}, expected {sorted(fields)}, got {sorted(kwargs)}: {e}")
+            return template
+
+
+_catalogs: Dict[str, Catalog] = {}
+_translators: Dict[str, Translator] = {}
+
+
+def _load_catalog(lang: str) -> Catalog:
+    catalog = _catalogs.get(lang)
+    if catalog is None:
+        fallback = None if lang == DEFAULT_LANG else _load_catalog(DEFAULT_LANG)
+        module = importlib.import_module(f"{__package__}.{lang}")
+        catalog = _catalogs[lang] = Catalog(lang, module.MESSAGES, fallback)
+        LOG.debug(f"Loaded {lang} locale: {len(catalog.constants)} strings, {len(catalog.templates)} templates")
+    return catalog
+
+
+def get_translator(lang: str) -> Translator:
+    translator = _translators.get(lang)
+    if translator is None:
+        if lang not in LANGUAGES:
+            return get_translator(DEFAULT_LANG)
+        translator = _translators[lang] = Translator(_load_catalog(lang))
+    return translator
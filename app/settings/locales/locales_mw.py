@@ -1,10 +1,7 @@
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
-from app.db.user import UserRepository
-from app.db.db import get_session
 from .locales import get_translator
-from app.db.cache import get_redis
 
 class LocaleMiddleware(BaseMiddleware):
     async def __call__(
@@ -16,17 +13,15 @@ class LocaleMiddleware(BaseMiddleware):
         tg_user = data.get("event_from_user")
         lang = "ru"
 
-        if tg_user:
-            redis_client = await get_redis()
+        container = data.get("container")
+        if tg_user and container:
             key = f"user:{tg_user.id}:lang"
-            cached_lang = await redis_client.get(key)
+            cached_lang = await container.redis.get(key)
 
             if cached_lang:
                 lang = cached_lang
             else:
-                async with get_session() as session:
-                    user_repo = UserRepository(session, redis_client)
-                    lang = await user_repo.get_lang(tg_user.id)
+                lang = await container.user_repo.get_lang(tg_user.id)
 
         data["lang"] = lang
         data["t"] = get_translator(lang)
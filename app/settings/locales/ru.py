@@ -1 +1,119 @@
-# TO-DO: move ru dict here
\ No newline at end of file
+MESSAGES = {
+    "welcome": "Добро пожаловать в OrbitVPN! Выберите опцию:",
+    "change_language": "Язык",
+    "no_configs": "У вас ещё нет VPN конфигураций.",
+    "your_configs": "Ваши VPN конфигурации:",
+    "config_created": "Конфигурация создана. Ваши VPN конфигурации:",
+    'your_config': 'Ваша подписка:',
+    "config_selected": "Нажмите чтобы скопировать:",
+    "config_deleted": "Конфигурация удалена",
+    "balance_text": "Ваш баланс: {balance} RUB",
+    "settings_text": "Ваши настройки:",
+    "choose_language": "Выберите язык:",
+    "language_updated": "Язык обновлён.",
+    "balance": "Баланс 💵",
+    "my_vpn": "Мой VPN 👤",
+    "help": "Помощь 💬",
+    "settings": "Настройки ⚙️",
+    "low_balance": "Недостаточно средств.",
+    "add_funds": "Пополнить баланс 💸",
+    "referral": "Реферал",
+    "error_creating_config": "Ошибка при создании конфигурации. Попробуйте позже или свяжитесь с поддержкой.",
+    "add_config": "Добавить конфигурацию",
+    "back_main": "В главное меню",
+    "back": "Назад",
+    "delete_config": "Удалить",
+    "qr_code": "QR-код",
+    "error_creating_payment": "Ошибка при создании платежа. Попробуйте позже.",
+    "creating_config": "Создаём конфигурацию...",
+    "max_configs_reached": "Достигнут максимум конфигураций (1). Удалите старую.",
+    "buy_sub_text": "Выберите подписку:",
+    "sub_1m": "1 мес - {price} RUB",
+    "sub_3m": "3 мес - {price} RUB",
+    "sub_6m": "6 мес - {price} RUB",
+    "sub_12m": "12 мес - {price} RUB",
+    "sub_success": "Подписка куплена! Конфигурация создана.",
+    "payment_method": "Выберите способ оплаты:",
+    "pm_stars": "Telegram Stars",
+    "select_amount": "Выберите сумму пополнения:",
+    "enter_amount": "Введите сумму пополнения (RUB, минимум 200):",
+    "invalid_amount": "Неверная сумма. Введите число >=200.",
+    "pay_button": "Оплатить",
+    "payment_created": "Оплатите {amount} Stars для пополнения {amount} RUB.",
+    'renew_config': 'Продлить',
+    'config_expired': 'Истёк',
+    'config_active': 'Активно',
+    "free_trial_activated": "Вам доступен бесплатный пробный период 3 дня",
+    "referral_text": "Пригласите друга — каждый получит 50 RUB.\n\nВаша реферальная ссылка:\n{ref_link}",
+    "sub_renewed_auto": "Подписка продлена автоматически.",
+    "sub_expired_low_balance": "Подписка истекла (недостаточно средств для авто-продления).",
+    "sub_renewed": "Подписка продлена.",
+    'buy_sub': 'Купить подписку',
+    "subscription_expired": "Ваша подписка истекла. Продлите подписку, чтобы продолжить использование VPN.",
+    "your_configs_with_sub": "Ваша подписка:\n\nАктивна до: {expire_date}",
+    "no_configs_has_sub": "У вас нет конфигураций\n\nПодписка активна до: {expire_date}",
+    "subscription_active_until": "Подписка активна до: {expire_date}",
+    "subscription_expired_on": "Подписка истекла: {expire_date}",
+    "renew_subscription_btn": "Продлить подписку",
+    "no_subscription": "Нет активной подписки",
+    "sub_purchased": "Подписка успешно приобретена!",
+    "sub_purchased_create_config": "Подписка куплена! Создайте конфигурацию.",
+    "create_first_config": "Подписка активирована!\n\nТеперь создайте свою первую конфигурацию VPN:",
+    "error_buying_sub": "Ошибка при покупке подписки",
+    "sub_success_with_expire": "Подписка активна до: {expire_date}",
+    "extend_subscription": "Выберите срок продления:",
+    "current_sub_until": "Подписка действует до: {expire_date}",
+    'share': 'Поделиться',
+    "too_fast": "Вы отправляете слишком много запросов",
+    'custom_amount': 'Другая сумма',
+    'subscription_from': 'Подписка от {price} RUB/мес',
+    'config': 'Конфигурация',
+    'payment_success': '✓ Баланс пополнен на {amount:.2f} RUB\n\nТеперь вы можете:',
+    'extend': 'Продлить',
+    'extend_by_1m': '+ 1 мес {price} RUB',
+    'extend_by_3m': '+ 3 мес {price} RUB',
+    'extend_by_6m': '+ 6 мес {price} RUB',
+    'extend_by_12m': '+ 12 мес {price} RUB',
+    'ton_payment_instruction': (
+            "Оплата через TON\n\n"
+            "Отправьте {ton_amount} на кошелек:\n"
+            "{wallet}\n\n"
+            "Комментарий: {comment}\n\n"
+            "Без комментария платёж не будет засчитан."    
+    ),
+    'stars_add_title': 'Пополнение баланса',
+    'stars_add_description': 'Пополните баланс на {amount} RUB',
+    'how_to_install': 'Инструкция по установке',
+    'stars_invoice_sent': 'Счёт отправлен. Проверьте сообщения',
+    'stars_price_label': 'Пополнение',
+    'config_not_found': 'Конфигурация не найдена',
+    'error_deleting_config': 'Ошибка при удалении конфигурации',
+    'no_servers_or_cache_error': 'Нет доступных серверов. Попробуйте позже',
+    'payment_already_processed': 'Платёж уже обработан',
+    'ton_payment_intro': 'Оплата через TON',
+    'ton_send_amount': 'Сумма к оплате: {expected_ton} TON (~{amount} RUB)',
+    'ton_wallet': 'Кошелёк: {wallet}',
+    'ton_comment': 'Комментарий: {comment}',
+    'ton_comment_warning': '⚠️ Важно: Без комментария платёж не будет засчитан!',
+    'cryptobot_payment_intro': 'Оплата через CryptoBot',
+    'cryptobot_amount': 'Сумма к оплате: {amount} RUB',
+    'cryptobot_click_button': 'Нажмите кнопку ниже для оплаты',
+    'yookassa_payment_intro': 'Оплата через YooKassa',
+    'yookassa_amount': 'Сумма к оплате: {amount} RUB',
+    'yookassa_click_button': 'Нажмите кнопку ниже для оплаты',
+    'cancel_payment': 'Отменить платёж',
+    'payment_cancelled': 'Платёж отменён',
+    'payment_expired': 'Платёж истёк',
+    'payment_not_found': 'Платёж не найден или уже обработан',
+    'service_temporarily_unavailable': 'Сервис временно недоступен. Пожалуйста, попробуйте позже.',
+    'payment_sent': 'Отправил оплату',
+    'payment_checking': 'Проверяем платёж...\n\nБаланс будет зачислен автоматически после подтверждения транзакции в блокчейне.\n\nОбычно это занимает 1-2 минуты.',
+    'sub_expiry_3days': 'Ваша подписка истекает через 3 дня!\n\nРекомендуем продлить её заранее, чтобы избежать перебоев в работе VPN.',
+    'sub_expiry_1day': 'До окончания подписки остался 1 день.\n\nПродлите сейчас — это займёт меньше минуты!',
+    'quick_renewal_info': '💰 Месяц: {price}₽ | Нужно: {needed}₽',
+    'quick_renewal_ready': '✓ Баланс достаточен! Месяц: {price}₽',
+    'sub_expired': 'Срок действия вашей подписки истёк.\n\nПродлите подписку, чтобы снова пользоваться безопасным и быстрым VPN без ограничений!',
+    'auto_renewal_success': '✓ Подписка автоматически продлена!\n\n📅 +{days} дней за {price:.0f}₽\n💰 Баланс: {balance:.2f}₽\n⏰ Активна до: {expire_date}',
+    'confirm_yes': 'Да, удалить',
+    'confirm_no': 'Отмена',
+}
@@ -1,12 +1,29 @@
 from .admin import AdminMiddleware
 from .blacklist import BlacklistMiddleware
-from .rate_limit import RateLimitMiddleware, cleanup_rate_limit
-from .repository import RepositoryMiddleware
+from .rate_limit import RateLimitMiddleware, LocalRateLimitBackend, RedisRateLimitBackend, cleanup_rate_limit
+from .user_lock import UserLockMiddleware
+from .lanes import LaneMiddleware, classify_update, get_update_lanes
+from .repository import RepositoryMiddleware, UpdateContainer
+from .views import NoopEditMiddleware, get_noop_edits
+from .flood_control import FloodControlMiddleware, SendPriority, get_flood_control, priority
 
 __all__ = [
     'AdminMiddleware',
     'BlacklistMiddleware',
     'RateLimitMiddleware',
+    'LocalRateLimitBackend',
+    'RedisRateLimitBackend',
     'cleanup_rate_limit',
+    'UserLockMiddleware',
+    'LaneMiddleware',
+    'classify_update',
+    'get_update_lanes',
     'RepositoryMiddleware',
+    'UpdateContainer',
+    'NoopEditMiddleware',
+    'get_noop_edits',
+    'FloodControlMiddleware',
+    'SendPriority',
+    'get_flood_control',
+    'priority',
 ]
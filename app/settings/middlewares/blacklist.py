@@ -1,47 +1,119 @@
-from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Tuple
 from aiogram import BaseMiddleware
 from aiogram.types import Update, Message, CallbackQuery
-from app.db.user import UserRepository
+
+from app.settings.utils.bans import is_banned, ban_user
+from app.settings.config import env
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
 
 class BlacklistMiddleware(BaseMiddleware):
-    
+    def __init__(
+        self,
+        flood_threshold: int = 30,
+        flood_window: float = 10.0,
+        flood_ban_minutes: int = 1,
+        max_flood_ban_minutes: int = 60,
+        strike_memory: float = 86400.0,
+        notify_interval: float = 3600.0,
+        max_cache_size: int = 10000
+    ):
+        super().__init__()
+        self.flood_threshold = flood_threshold
+        self.flood_window = flood_window
+        self.flood_ban_minutes = flood_ban_minutes
+        self.max_flood_ban_minutes = max_flood_ban_minutes
+        self.strike_memory = strike_memory
+        self.notify_interval = notify_interval
+        self.max_cache_size = max_cache_size
+
+        self._recent: Dict[int, Deque[float]] = {}
+        self._strikes: Dict[int, Tuple[int, float]] = {}
+        self._blocked_until: Dict[int, float] = {}
+        self._notified: Dict[int, float] = {}
+
+    def _is_flooding(self, user_id: int, now: float) -> bool:
+        # sliding window: the last flood_threshold updates all arrived within flood_window
+        recent = self._recent.get(user_id)
+        if recent is None:
+            if len(self._recent) >= self.max_cache_size:
+                self._recent = {k: v for k, v in self._recent.items() if now - v[-1] < self.flood_window}
+            recent = self._recent[user_id] = deque(maxlen=self.flood_threshold)
+
+        recent.append(now)
+        if len(recent) < self.flood_threshold or now - recent[0] >= self.flood_window:
+            return False
+        recent.clear()
+        return True
+
+    def _ban_minutes(self, user_id: int, now: float) -> int:
+        # first offence is a short cool-down; repeats within strike_memory double it
+        strikes, last = self._strikes.get(user_id, (0, now))
+        if now - last >= self.strike_memory:
+            strikes = 0
+        if len(self._strikes) >= self.max_cache_size:
+            self._strikes = {k: v for k, v in self._strikes.items() if now - v[1] < self.strike_memory}
+        self._strikes[user_id] = (strikes + 1, now)
+        return min(self.flood_ban_minutes * 2 ** strikes, self.max_flood_ban_minutes)
+
+    def _should_notify(self, user_id: int, now: float) -> bool:
+        last = self._notified.get(user_id)
+        if last is not None and now - last < self.notify_interval:
+            return False
+        if len(self._notified) >= self.max_cache_size:
+            self._notified = {k: v for k, v in self._notified.items() if now - v < self.notify_interval}
+        self._notified[user_id] = now
+        return True
+
     async def __call__(
         self,
         handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
         event: Update,
         data: Dict[str, Any],
     ) -> Any:
-        user = None
-        
-        if event.message:
-            user = event.message.from_user
-        elif event.callback_query:
-            user = event.callback_query.from_user
-        elif event.inline_query:
-            user = event.inline_query.from_user
-        elif event.chosen_inline_result:
-            user = event.chosen_inline_result.from_user
-        
-        if not user:
-            return None
-        
-        session = data.get("session")
-        user_repo = UserRepository(session)
-        
-        is_banned = await user_repo.is_user_banned(user.id)
-        
-        if is_banned:
-            if isinstance(event.message, Message):
-                await event.message.answer(
-                    "🚫 <b>Access Denied</b>\n\n"
-                    "Your account has been blocked.\n"
-                    "Contact support for more information."
-                )
-            elif isinstance(event.callback_query, CallbackQuery):
-                await event.callback_query.answer(
-                    "🚫 Your account is blocked",
-                    show_alert=True
-                )
+        user = data.get("event_from_user")
+        if not user or env.is_admin(user.id):
+            return await handler(event, data)
+
+        now = time.monotonic()
+        blocked_until = self._blocked_until.get(user.id)
+        if blocked_until is not None:
+            if now < blocked_until:
+                return None
+            del self._blocked_until[user.id]
+
+        if self._is_flooding(user.id, now):
+            minutes = self._ban_minutes(user.id, now)
+            LOG.warning(f"User {user.id} sent {self.flood_threshold} updates in {self.flood_window}s, "
+                        f"banning for {minutes} minutes")
+            if len(self._blocked_until) >= self.max_cache_size:
+                self._blocked_until = {k: v for k, v in self._blocked_until.items() if v > now}
+            self._blocked_until[user.id] = now + minutes * 60
+            asyncio.create_task(ban_user(user.id, reason="flood", minutes=minutes))
             return None
-        
-        return await handler(event, data)
\ No newline at end of file
+
+        if not await is_banned(user.id):
+            return await handler(event, data)
+
+        if self._should_notify(user.id, now):
+            try:
+                if isinstance(event.message, Message):
+                    await event.message.answer(
+                        "🚫 <b>Access Denied</b>\n\n"
+                        "Your account has been blocked.\n"
+                        "Contact support for more information.",
+                        parse_mode="HTML"
+                    )
+                elif isinstance(event.callback_query, CallbackQuery):
+                    await event.callback_query.answer(
+                        "🚫 Your account is blocked",
+                        show_alert=True
+                    )
+            except Exception as e:
+                LOG.debug(f"Could not notify banned user {user.id}: {e}")
+        return None
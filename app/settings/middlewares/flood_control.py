@@ -0,0 +1,179 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+from app.settings.config import env
+from app.settings.log import get_logger
+from app.settings.utils.throttling import TokenBucket
+
+LOG = get_logger(__name__)
+
+
+class SendPriority(IntEnum):
+    INTERACTIVE = 0
+    NOTIFICATION = 1
+    BULK = 2
+
+
+send_priority: ContextVar[SendPriority] = ContextVar("send_priority", default=SendPriority.INTERACTIVE)
+
+
+@contextmanager
+def priority(level: SendPriority):
+    token = send_priority.set(level)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+
+@dataclass
+class QueueMetrics:
+    granted: int = 0
+    retried: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self, depth: int) -> dict:
+        return {
+            "depth": depth,
+            "granted": self.granted,
+            "retried": self.retried,
+            "avg_wait_ms": round(self.total_wait / self.granted * 1000, 1) if self.granted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+class FloodControlMiddleware(BaseRequestMiddleware):
+    def __init__(
+        self,
+        global_rate: float = 30,
+        private_rate: float = 1,
+        private_burst: int = 3,
+        group_rate: float = 20 / 60,
+        max_retries: int = 3,
+        max_chats: int = 10000
+    ):
+        self.global_bucket = TokenBucket(global_rate, 1)
+        self.private_rate = private_rate
+        self.private_burst = private_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+
+        self._chats: Dict[int | str, TokenBucket] = {}
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._pump_task: Optional[asyncio.Task] = None
+        self._metrics = {level: QueueMetrics() for level in SendPriority}
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chats:
+                self._chats = {k: v for k, v in self._chats.items() if not v.idle}
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = TokenBucket(self.private_rate, self.private_burst)
+            else:
+                bucket = TokenBucket(self.group_rate, 1)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _ensure_pump(self):
+        if self._pump_task is None or self._pump_task.done():
+            self._wakeup = asyncio.Event()
+            self._pump_task = asyncio.create_task(self._pump())
+
+    async def _pump(self):
+        while True:
+            await self._wakeup.wait()
+            while self._queue:
+                delay = self.global_bucket.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                while self._queue:
+                    _, _, waiter = heapq.heappop(self._queue)
+                    if not waiter.done():
+                        waiter.set_result(None)
+                        break
+            self._wakeup.clear()
+
+    async def _acquire(self, chat_id: int | str, level: SendPriority):
+        started = time.monotonic()
+
+        delay = self._chat_bucket(chat_id).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        self._ensure_pump()
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (level, next(self._seq), waiter))
+        self._wakeup.set()
+        await waiter
+
+        waited = time.monotonic() - started
+        metrics = self._metrics[level]
+        metrics.granted += 1
+        metrics.total_wait += waited
+        metrics.max_wait = max(metrics.max_wait, waited)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        level = send_priority.get()
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(chat_id, level)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                LOG.warning(f"Flood control: {type(method).__name__} to {chat_id} "
+                            f"throttled by Telegram for {e.retry_after}s")
+                self._metrics[level].retried += 1
+                self._chat_bucket(chat_id).pause(e.retry_after)
+                self.global_bucket.pause(e.retry_after)
+
+    def get_metrics(self) -> dict:
+        depth = {level: 0 for level in SendPriority}
+        for level, _, waiter in self._queue:
+            if not waiter.done():
+                depth[SendPriority(level)] += 1
+
+        return {
+            level.name.lower(): self._metrics[level].as_dict(depth[level])
+            for level in SendPriority
+        }
+
+
+_flood_control: Optional[FloodControlMiddleware] = None
+
+
+def get_flood_control() -> FloodControlMiddleware:
+    global _flood_control
+    if _flood_control is None:
+        _flood_control = FloodControlMiddleware(
+            global_rate=env.TELEGRAM_GLOBAL_RATE,
+            private_rate=env.TELEGRAM_CHAT_RATE,
+        )
+    return _flood_control
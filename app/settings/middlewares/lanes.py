@@ -0,0 +1,152 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from app.settings.config import env
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+PAYMENTS = "payments"
+PROVISIONING = "provisioning"
+NAVIGATION = "navigation"
+
+# returned instead of a handler result when a saturated lane drops the update
+REJECTED = object()
+
+_PROVISIONING_ACTIONS = {"add_config", "renew_subscription", "sub_1m", "sub_3m", "sub_6m", "sub_12m"}
+_PROVISIONING_PREFIXES = (
+    "dcfg:", "qcfg:", "amt:", "paid:",
+    "delete_cfg_", "qr_cfg_", "amount_", "payment_sent_",
+)
+
+
+def classify_update(update: Update) -> str:
+    if update.pre_checkout_query is not None:
+        return PAYMENTS
+
+    if update.message is not None and update.message.successful_payment is not None:
+        return PAYMENTS
+
+    callback = update.callback_query
+    if callback is not None and callback.data:
+        if callback.data in _PROVISIONING_ACTIONS or callback.data.startswith(_PROVISIONING_PREFIXES):
+            return PROVISIONING
+
+    return NAVIGATION
+
+
+@dataclass
+class LaneMetrics:
+    processed: int = 0
+    rejected: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self, active: int, waiting: int) -> dict:
+        return {
+            "active": active,
+            "waiting": waiting,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.processed * 1000, 1) if self.processed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+class Lane:
+    def __init__(self, name: str, concurrency: int, max_queue: Optional[int] = None):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.metrics = LaneMetrics()
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @property
+    def full(self) -> bool:
+        return self.max_queue is not None and self.active >= self.concurrency and self.waiting >= self.max_queue
+
+    async def run(self, handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]], event: Update, data: Dict[str, Any]):
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.metrics.total_wait += waited
+        self.metrics.max_wait = max(self.metrics.max_wait, waited)
+        self.active += 1
+        try:
+            return await handler(event, data)
+        finally:
+            self.active -= 1
+            self.metrics.processed += 1
+            self._semaphore.release()
+
+
+class LaneMiddleware(BaseMiddleware):
+    def __init__(
+        self,
+        payments_concurrency: int = 20,
+        provisioning_concurrency: int = 10,
+        navigation_concurrency: int = 50,
+        max_queue: int = 500
+    ):
+        super().__init__()
+        self.lanes = {
+            PAYMENTS: Lane(PAYMENTS, payments_concurrency),
+            PROVISIONING: Lane(PROVISIONING, provisioning_concurrency, max_queue),
+            NAVIGATION: Lane(NAVIGATION, navigation_concurrency, max_queue),
+        }
+
+    async def _reject(self, lane: Lane, event: Update):
+        lane.metrics.rejected += 1
+        LOG.warning(f"Lane {lane.name} is saturated ({lane.waiting} waiting), rejecting update {event.update_id}")
+
+        if event.callback_query is not None:
+            try:
+                await event.callback_query.answer("⏳")
+            except Exception:
+                pass
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        lane = self.lanes[classify_update(event)]
+        if lane.full:
+            await self._reject(lane, event)
+            return REJECTED
+
+        data["lane"] = lane.name
+        return await lane.run(handler, event, data)
+
+    def get_metrics(self) -> dict:
+        return {
+            name: lane.metrics.as_dict(lane.active, lane.waiting)
+            for name, lane in self.lanes.items()
+        }
+
+
+_lanes: Optional[LaneMiddleware] = None
+
+
+def get_update_lanes() -> LaneMiddleware:
+    global _lanes
+    if _lanes is None:
+        _lanes = LaneMiddleware(
+            payments_concurrency=env.LANE_PAYMENTS_CONCURRENCY,
+            provisioning_concurrency=env.LANE_PROVISIONING_CONCURRENCY,
+            navigation_concurrency=env.LANE_NAVIGATION_CONCURRENCY,
+            max_queue=env.LANE_QUEUE_SIZE,
+        )
+    return _lanes
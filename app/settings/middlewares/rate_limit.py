@@ -1,18 +1,152 @@
 import asyncio
+import re
 import time
-from typing import Any, Callable, Dict, Tuple
-from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
 from aiogram import BaseMiddleware
 
+from app.db.cache import get_redis
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+_ID_SUFFIX = re.compile(r"([_:](-?\d+|custom))+$")
+
+GCRA_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+if tat - tolerance > now then
+    return tat - tolerance - now
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return 0
+"""
+
+
+class LocalRateLimitBackend:
+    def __init__(self, max_cache_size: int = 10000, shards: int = 16, wheel_slots: int = 64, tick: float = 0.5):
+        self.max_cache_size = max_cache_size
+        self._shards: List[Dict[Tuple[int, str], float]] = [{} for _ in range(shards)]
+        self._wheel: List[List[Tuple[int, str]]] = [[] for _ in range(wheel_slots)]
+        self._tick = tick
+        self._cursor = int(time.monotonic() / tick)
+        self._size = 0
+
+    def _shard(self, user_id: int) -> Dict[Tuple[int, str], float]:
+        return self._shards[user_id % len(self._shards)]
+
+    def _schedule(self, lk: Tuple[int, str], expires_at: float):
+        ticks = min(int(expires_at / self._tick) + 1, self._cursor + len(self._wheel) - 1)
+        self._wheel[ticks % len(self._wheel)].append(lk)
+
+    def _advance(self, now: float):
+        current = int(now / self._tick)
+        steps = min(current - self._cursor, len(self._wheel))
+        self._cursor = current
+
+        for offset in range(steps - 1, -1, -1):
+            index = (current - offset) % len(self._wheel)
+            slot = self._wheel[index]
+            if not slot:
+                continue
+            self._wheel[index] = []
+            for lk in slot:
+                shard = self._shard(lk[0])
+                expires_at = shard.get(lk)
+                if expires_at is None:
+                    continue
+                if expires_at <= now:
+                    del shard[lk]
+                    self._size -= 1
+                else:
+                    self._schedule(lk, expires_at)
+
+    async def hit(self, user_id: int, action: str, limit: float) -> bool:
+        now = time.monotonic()
+        self._advance(now)
+
+        lk = (user_id, action)
+        shard = self._shard(user_id)
+        expires_at = shard.get(lk)
+        if expires_at is not None and now < expires_at:
+            return False
+
+        if expires_at is None:
+            if self._size >= self.max_cache_size:
+                return True
+            self._size += 1
+
+        shard[lk] = now + limit
+        self._schedule(lk, now + limit)
+        return True
+
+    async def cleanup(self, max_age: float):
+        self._advance(time.monotonic())
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class RedisRateLimitBackend:
+    def __init__(self, burst: int = 1, max_cache_size: int = 10000):
+        self.burst = burst
+        self.max_cache_size = max_cache_size
+        self.blocked_until: Dict[Tuple[int, str], float] = {}
+        self._script = None
+
+    async def hit(self, user_id: int, action: str, limit: float) -> bool:
+        now = time.monotonic()
+        lk = (user_id, action)
+
+        blocked_until = self.blocked_until.get(lk)
+        if blocked_until is not None:
+            if now < blocked_until:
+                return False
+            del self.blocked_until[lk]
+
+        interval = int(limit * 1000)
+        try:
+            if self._script is None:
+                self._script = (await get_redis()).register_script(GCRA_SCRIPT)
+            retry_after = await self._script(
+                keys=[f"rl:{user_id}:{action}"],
+                args=[interval, (self.burst - 1) * interval]
+            )
+        except Exception as e:
+            LOG.warning(f"Redis rate limit check failed, allowing update: {type(e).__name__}: {e}")
+            return True
+
+        if not retry_after:
+            return True
+
+        if len(self.blocked_until) >= self.max_cache_size:
+            self.blocked_until = {k: v for k, v in self.blocked_until.items() if v > now}
+        self.blocked_until[lk] = now + int(retry_after) / 1000
+        return False
+
+    async def cleanup(self, max_age: float):
+        now = time.monotonic()
+        self.blocked_until = {k: v for k, v in self.blocked_until.items() if v > now}
+
 
 class RateLimitMiddleware(BaseMiddleware):
-    def __init__(self, default_limit: float = 1.5, custom_limits: Dict[str, float] | None = None, max_cache_size: int = 10000):
+    def __init__(
+        self,
+        default_limit: float = 1.5,
+        custom_limits: Dict[str, float] | None = None,
+        max_cache_size: int = 10000,
+        backend: LocalRateLimitBackend | RedisRateLimitBackend | None = None
+    ):
         super().__init__()
         self.default_limit = default_limit
         self.custom_limits = custom_limits or {}
-        self.last_time: OrderedDict[Tuple[int, str], float] = OrderedDict()
-        self.max_cache_size = max_cache_size
-        self._lock = asyncio.Lock()
+        self.backend = backend or LocalRateLimitBackend(max_cache_size)
 
     def _get_key(self, event: Any) -> str:
         text = getattr(event, "text", None)
@@ -21,7 +155,9 @@ class RateLimitMiddleware(BaseMiddleware):
 
         callback_data = getattr(event, "data", None)
         if callback_data:
-            return callback_data
+            if callback_data in self.custom_limits:
+                return callback_data
+            return _ID_SUFFIX.sub("", callback_data)
 
         return event.__class__.__name__
 
@@ -33,38 +169,27 @@ class RateLimitMiddleware(BaseMiddleware):
 
         key = self._get_key(event)
         limit = self.custom_limits.get(key, self.default_limit)
-        now = time.monotonic()
-        lk = (user_id, key)
 
-        async with self._lock:
-            last = self.last_time.get(lk)
-            if last is not None and (now - last) < limit:
-                msg = None
+        if not await self.backend.hit(user_id, key, limit):
+            msg = None
+            try:
+                t = data.get("t")
+                msg = t("too_fast") if t else "⏳ Too fast"
+            except Exception:
+                msg = "⏳ Too fast"
+
+            if hasattr(event, "answer") and "callback" in event.__class__.__name__.lower():
                 try:
-                    t = data.get("t")
-                    msg = t("too_fast") if t else "⏳ Too fast"
+                    await event.answer(msg, show_alert=False)
                 except Exception:
-                    msg = "⏳ Too fast"
-
-                if hasattr(event, "answer") and "callback" in event.__class__.__name__.lower():
-                    try:
-                        await event.answer(msg, show_alert=False)
-                    except Exception:
-                        pass
-                else:
-                    try:
-                        m = await event.answer(msg)
-                        asyncio.create_task(self._safe_delete(m, delay=2))
-                    except Exception:
-                        pass
-                return
-
-            self.last_time[lk] = now
-
-            if len(self.last_time) > self.max_cache_size:
-                remove_count = self.max_cache_size // 10
-                for _ in range(remove_count):
-                    self.last_time.popitem(last=False)
+                    pass
+            else:
+                try:
+                    m = await event.answer(msg)
+                    asyncio.create_task(self._safe_delete(m, delay=2))
+                except Exception:
+                    pass
+            return
 
         return await handler(event, data)
 
@@ -81,10 +206,6 @@ async def cleanup_rate_limit(middleware: RateLimitMiddleware, interval: int = 60
     try:
         while True:
             await asyncio.sleep(interval)
-            cutoff = time.monotonic() - max_age
-            async with middleware._lock:
-                old_keys = [k for k, t in middleware.last_time.items() if t < cutoff]
-                for k in old_keys:
-                    middleware.last_time.pop(k, None)
+            await middleware.backend.cleanup(max_age)
     except asyncio.CancelledError:
-        pass
\ No newline at end of file
+        pass
@@ -1,16 +1,58 @@
-from typing import Callable, Dict, Any, Awaitable
-from aiogram import BaseMiddleware
+from typing import Callable, Dict, Any, Awaitable, Optional
+from aiogram import BaseMiddleware, Bot
 from aiogram.types import TelegramObject
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.db import get_session
+from app.db.db import SessionLocal
 from app.db.cache import get_redis
 from app.db.user import UserRepository
 from app.db.payments import PaymentRepository
+from app.payments.manager import PaymentManager
 from app.settings.log import get_logger
 
 LOG = get_logger(__name__)
 
 
+class UpdateContainer:
+    def __init__(self, redis_client: Redis, bot: Optional[Bot] = None):
+        self.redis = redis_client
+        self.bot = bot
+        self._session: Optional[AsyncSession] = None
+        self._user_repo: Optional[UserRepository] = None
+        self._payment_repo: Optional[PaymentRepository] = None
+        self._payment_manager: Optional[PaymentManager] = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = SessionLocal()
+        return self._session
+
+    @property
+    def user_repo(self) -> UserRepository:
+        if self._user_repo is None:
+            self._user_repo = UserRepository(self.session, self.redis)
+        return self._user_repo
+
+    @property
+    def payment_repo(self) -> PaymentRepository:
+        if self._payment_repo is None:
+            self._payment_repo = PaymentRepository(self.session, self.redis)
+        return self._payment_repo
+
+    @property
+    def payment_manager(self) -> PaymentManager:
+        if self._payment_manager is None:
+            self._payment_manager = PaymentManager(self.session, self.redis)
+        return self._payment_manager
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
 class RepositoryMiddleware(BaseMiddleware):
     async def __call__(
         self,
@@ -18,16 +60,17 @@ class RepositoryMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        async with get_session() as session:
-            try:
-                redis_client = await get_redis()
-                
-                data['user_repo'] = UserRepository(session, redis_client)
-                data['payment_repo'] = PaymentRepository(session, redis_client)
-                data['session'] = session
-                
-                return await handler(event, data)
-                
-            except Exception as e:
-                LOG.error(f"Repository middleware error: {e}")
-                raise
\ No newline at end of file
+        container = UpdateContainer(await get_redis(), bot=data.get('bot'))
+        try:
+            data['container'] = container
+            data['user_repo'] = container.user_repo
+            data['payment_repo'] = container.payment_repo
+            data['session'] = container.session
+
+            return await handler(event, data)
+
+        except Exception as e:
+            LOG.error(f"Repository middleware error: {e}")
+            raise
+        finally:
+            await container.close()
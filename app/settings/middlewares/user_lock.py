@@ -0,0 +1,160 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+from app.db.cache import get_redis
+from app.db.locks import RELEASE_SCRIPT, RENEW_SCRIPT
+from .lanes import PAYMENTS
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+
+class UserLockMiddleware(BaseMiddleware):
+    def __init__(self, distributed: bool = False, lease_ms: int = 30000, wait_timeout: float = 10.0):
+        super().__init__()
+        self.distributed = distributed
+        self.lease_ms = lease_ms
+        self.wait_timeout = wait_timeout
+
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._holders: Dict[int, int] = {}
+        self._inflight: Set[Tuple[int, str]] = set()
+        self._release_script = None
+        self._renew_script = None
+        self.dropped = 0
+
+    @asynccontextmanager
+    async def _local(self, user_id: int):
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        self._holders[user_id] = self._holders.get(user_id, 0) + 1
+
+        acquired = False
+        try:
+            try:
+                await asyncio.wait_for(lock.acquire(), self.wait_timeout)
+                acquired = True
+            except asyncio.TimeoutError:
+                LOG.warning(f"Timed out waiting for the local lock of {user_id}, processing update without it")
+            yield
+        finally:
+            if acquired:
+                lock.release()
+            holders = self._holders[user_id] - 1
+            if holders:
+                self._holders[user_id] = holders
+            else:
+                del self._holders[user_id]
+                del self._locks[user_id]
+
+    async def _acquire_lease(self, key: str, token: str) -> bool:
+        redis = await get_redis()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        delay = 0.05
+
+        while not await redis.set(key, token, nx=True, px=self.lease_ms):
+            if loop.time() >= deadline:
+                LOG.warning(f"Timed out waiting for {key}, processing update without the lease")
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        return True
+
+    async def _renew_lease(self, key: str, token: str):
+        while True:
+            await asyncio.sleep(self.lease_ms / 3000)
+            try:
+                if not await self._renew_script(keys=[key], args=[token, self.lease_ms]):
+                    LOG.warning(f"Lost lease {key} while the update was still running")
+                    return
+            except Exception as e:
+                LOG.warning(f"Failed to renew lease {key}: {type(e).__name__}: {e}")
+
+    @asynccontextmanager
+    async def _lease(self, user_id: int):
+        if not self.distributed:
+            yield
+            return
+
+        key = f"lock:user:{user_id}"
+        token = uuid.uuid4().hex
+        acquired = False
+        try:
+            if self._release_script is None:
+                redis = await get_redis()
+                self._release_script = redis.register_script(RELEASE_SCRIPT)
+                self._renew_script = redis.register_script(RENEW_SCRIPT)
+            acquired = await self._acquire_lease(key, token)
+        except Exception as e:
+            LOG.warning(f"Redis user lock failed, processing update without the lease: {type(e).__name__}: {e}")
+
+        renew_task = asyncio.create_task(self._renew_lease(key, token)) if acquired else None
+        try:
+            yield
+        finally:
+            if renew_task is not None:
+                renew_task.cancel()
+            if acquired:
+                try:
+                    await self._release_script(keys=[key], args=[token])
+                except Exception as e:
+                    LOG.warning(f"Failed to release lease {key}: {type(e).__name__}: {e}")
+
+    async def _claim(self, user_id: int, action: str) -> bool:
+        lk = (user_id, action)
+        if lk in self._inflight:
+            return False
+
+        if self.distributed:
+            try:
+                redis = await get_redis()
+                if not await redis.set(f"inflight:{user_id}:{action}", 1, nx=True, px=self.lease_ms):
+                    return False
+            except Exception as e:
+                LOG.warning(f"Redis in-flight check failed for {user_id}: {type(e).__name__}: {e}")
+
+        self._inflight.add(lk)
+        return True
+
+    async def _release_claim(self, user_id: int, action: str):
+        self._inflight.discard((user_id, action))
+        if self.distributed:
+            try:
+                redis = await get_redis()
+                await redis.delete(f"inflight:{user_id}:{action}")
+            except Exception as e:
+                LOG.warning(f"Failed to clear in-flight marker for {user_id}: {type(e).__name__}: {e}")
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None or data.get("lane") == PAYMENTS:
+            return await handler(event, data)
+
+        action = event.data if isinstance(event, CallbackQuery) else None
+        if action is not None and not await self._claim(user.id, action):
+            self.dropped += 1
+            LOG.debug(f"Dropped duplicate callback {action} from {user.id} while the first one is in flight")
+            try:
+                await event.answer()
+            except Exception:
+                pass
+            return
+
+        try:
+            async with self._local(user.id):
+                async with self._lease(user.id):
+                    return await handler(event, data)
+        finally:
+            if action is not None:
+                await self._release_claim(user.id, action)
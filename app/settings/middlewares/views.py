@@ -0,0 +1,50 @@
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import (
+    TelegramMethod, EditMessageText, EditMessageReplyMarkup, EditMessageCaption, EditMessageMedia
+)
+from aiogram.methods.base import TelegramType
+
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+_EDITS = (EditMessageText, EditMessageReplyMarkup, EditMessageCaption, EditMessageMedia)
+
+
+# every edit still reaches Telegram: with several replicas editing the same message,
+# no local record of the last rendered view can be trusted
+class NoopEditMiddleware(BaseRequestMiddleware):
+    def __init__(self):
+        self.not_modified = 0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> TelegramType:
+        if not isinstance(method, _EDITS):
+            return await make_request(bot, method)
+
+        try:
+            return await make_request(bot, method)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e).lower():
+                raise
+            self.not_modified += 1
+            LOG.debug(f"{type(method).__name__} for message {method.message_id} was a no-op")
+            return True
+
+
+_noop_edits: Optional[NoopEditMiddleware] = None
+
+
+def get_noop_edits() -> NoopEditMiddleware:
+    global _noop_edits
+    if _noop_edits is None:
+        _noop_edits = NoopEditMiddleware()
+    return _noop_edits
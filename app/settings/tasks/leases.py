@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import logging
+import os
+import socket
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.db.cache import get_redis
+from app.db.locks import RELEASE_SCRIPT, RENEW_SCRIPT
+from app.settings.config import env
+
+LOG = logging.getLogger(__name__)
+
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+ACQUIRE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    local token = redis.call('INCR', KEYS[2])
+    local value = ARGV[1] .. ':' .. token
+    redis.call('SET', KEYS[1], value, 'PX', ARGV[2])
+    return value
+end
+return false
+"""
+
+# status writes carry the writer's fencing token; a run that lost its lease
+# cannot overwrite the status of a newer run
+STATUS_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'token') or '0')
+if tonumber(ARGV[1]) < current then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'token', ARGV[1], unpack(ARGV, 2))
+return 1
+"""
+
+
+@dataclass
+class JobLease:
+    job_id: str
+    value: str
+
+    @property
+    def token(self) -> int:
+        return int(self.value.rsplit(":", 1)[1])
+
+
+_current: ContextVar[Optional[JobLease]] = ContextVar("job_lease", default=None)
+_jobs: Dict[str, float] = {}
+_scripts: Dict[str, Any] = {}
+
+
+def _lease_key(job_id: str) -> str:
+    return f"jobs:lease:{job_id}"
+
+
+def _fence_key(job_id: str) -> str:
+    return f"jobs:fence:{job_id}"
+
+
+def _status_key(job_id: str) -> str:
+    return f"jobs:status:{job_id}"
+
+
+async def _script(name: str, source: str):
+    script = _scripts.get(name)
+    if script is None:
+        redis = await get_redis()
+        script = _scripts[name] = redis.register_script(source)
+    return script
+
+
+# (lease key, lease value) of the running job, for writes that must only land while it holds the lease
+def current_fence() -> Optional[Tuple[str, str]]:
+    lease = _current.get()
+    if lease is None:
+        return None
+    return _lease_key(lease.job_id), lease.value
+
+
+async def _write_status(lease: JobLease, **fields) -> bool:
+    write = await _script("status", STATUS_SCRIPT)
+    args = [lease.token]
+    for name, value in fields.items():
+        args += [name, value]
+    return bool(await write(keys=[_status_key(lease.job_id)], args=args))
+
+
+async def _renew(lease: JobLease, lease_ms: int):
+    renew = await _script("renew", RENEW_SCRIPT)
+    while True:
+        await asyncio.sleep(lease_ms / 3000)
+        try:
+            if not await renew(keys=[_lease_key(lease.job_id)], args=[lease.value, lease_ms]):
+                LOG.warning(f"Lost lease for job {lease.job_id} (token {lease.token}) while it was running")
+                return
+        except Exception as e:
+            LOG.warning(f"Failed to renew lease for job {lease.job_id}: {type(e).__name__}: {e}")
+
+
+async def _due(redis, job_id: str, min_interval: float) -> bool:
+    if min_interval <= 0:
+        return True
+    finished = await redis.hget(_status_key(job_id), "finished_at")
+    return finished is None or time.time() - float(finished) >= min_interval * 0.9
+
+
+def leased(
+    job_id: str,
+    func: Callable[..., Awaitable[Any]],
+    min_interval: float = 0,
+    lease_seconds: Optional[int] = None,
+) -> Callable[..., Awaitable[Any]]:
+    lease_ms = (lease_seconds or env.JOB_LEASE_SECONDS) * 1000
+    _jobs[job_id] = min_interval
+
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        try:
+            redis = await get_redis()
+            acquire = await _script("acquire", ACQUIRE_SCRIPT)
+            value = await acquire(keys=[_lease_key(job_id), _fence_key(job_id)], args=[OWNER, lease_ms])
+        except Exception as e:
+            LOG.error(f"Cannot acquire lease for job {job_id}, skipping run: {type(e).__name__}: {e}")
+            return
+
+        if not value:
+            LOG.debug(f"Job {job_id} is running on another instance, skipping")
+            return
+
+        lease = JobLease(job_id, value)
+        release = await _script("release", RELEASE_SCRIPT)
+
+        if not await _due(redis, job_id, min_interval):
+            LOG.debug(f"Job {job_id} already ran recently on another instance, skipping")
+            await release(keys=[_lease_key(job_id)], args=[lease.value])
+            return
+
+        renew_task = asyncio.create_task(_renew(lease, lease_ms))
+        reset = _current.set(lease)
+        started = time.time()
+        result = "ok"
+        try:
+            await _write_status(lease, owner=OWNER, started_at=started)
+            await func(*args, **kwargs)
+        except Exception as e:
+            result = "error"
+            LOG.error(f"Job {job_id} failed: {type(e).__name__}: {e}")
+        finally:
+            _current.reset(reset)
+            renew_task.cancel()
+            finished = time.time()
+            try:
+                if not await _write_status(
+                    lease,
+                    finished_at=finished,
+                    duration_ms=int((finished - started) * 1000),
+                    result=result,
+                ):
+                    LOG.warning(f"Job {job_id} (token {lease.token}) finished after a newer run took over")
+                await release(keys=[_lease_key(job_id)], args=[lease.value])
+            except Exception as e:
+                LOG.warning(f"Failed to release lease for job {job_id}: {type(e).__name__}: {e}")
+
+    return run
+
+
+async def get_job_status() -> List[dict]:
+    redis = await get_redis()
+    now = time.time()
+    statuses = []
+    for job_id in sorted(_jobs):
+        holder = await redis.get(_lease_key(job_id))
+        ttl_ms = await redis.pttl(_lease_key(job_id)) if holder else None
+        status = await redis.hgetall(_status_key(job_id))
+        finished = float(status["finished_at"]) if status.get("finished_at") else None
+        statuses.append({
+            "job": job_id,
+            "holder": holder,
+            "lease_ttl_ms": ttl_ms,
+            "last_owner": status.get("owner"),
+            "last_token": int(status["token"]) if status.get("token") else None,
+            "last_result": status.get("result"),
+            "last_duration_ms": int(status["duration_ms"]) if status.get("duration_ms") else None,
+            "seconds_since_run": int(now - finished) if finished else None,
+        })
+    return statuses
@@ -1,13 +1,19 @@
 import logging
+from datetime import datetime
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from aiogram import Bot
 
+from app.settings.config import env
+
 from .types.ton_monitoring import check_ton_transactions
 from .types.config_cleanup import cleanup_expired_configs
-from .types.sub_notifications import check_expiring_subscriptions
-from .types.auto_renewal import check_auto_renewals
+from .types.expiry_timeline import process_expiry_timeline, rebuild_expiry_timeline
+from .types.payment_reservations import sweep_payment_reservations
+from .types.notification_outbox import dispatch_notifications
+from .types.ban_expiry import release_expired_bans
+from .leases import leased
 
 LOG = logging.getLogger(__name__)
 
@@ -18,14 +24,14 @@ async def start(bot: Bot) -> None:
     LOG.info("Starting background task scheduler")
     
     scheduler.add_job(
-        check_ton_transactions,
+        leased("ton_transactions", check_ton_transactions, min_interval=60),
         id="ton_transactions",
         replace_existing=True,
         max_instances=1,
     )
     
     scheduler.add_job(
-        cleanup_expired_configs,
+        leased("config_cleanup", cleanup_expired_configs, min_interval=6 * 86400),
         trigger=CronTrigger(day_of_week='sun', hour=3, minute=0),
         id="config_cleanup",
         replace_existing=True,
@@ -33,23 +39,48 @@ async def start(bot: Bot) -> None:
     )
     
     scheduler.add_job(
-        check_expiring_subscriptions,
-        trigger=IntervalTrigger(hours=3),
-        id="sub_notifications",
+        leased("expiry_timeline", process_expiry_timeline),
+        trigger=IntervalTrigger(seconds=env.EXPIRY_TIMELINE_SECONDS),
+        id="expiry_timeline",
         replace_existing=True,
         max_instances=1,
         kwargs={"bot": bot}
     )
     
     scheduler.add_job(
-        check_auto_renewals,
+        leased("expiry_timeline_rebuild", rebuild_expiry_timeline, min_interval=6 * 3600),
         trigger=IntervalTrigger(hours=6),
-        id="auto_renewal",
+        next_run_time=datetime.now(),
+        id="expiry_timeline_rebuild",
+        replace_existing=True,
+        max_instances=1,
+    )
+    
+    scheduler.add_job(
+        leased("payment_reservations", sweep_payment_reservations, min_interval=5 * 60),
+        trigger=IntervalTrigger(minutes=5),
+        id="payment_reservations",
+        replace_existing=True,
+        max_instances=1,
+    )
+    
+    scheduler.add_job(
+        leased("notification_outbox", dispatch_notifications),
+        trigger=IntervalTrigger(seconds=env.NOTIFICATION_DISPATCH_SECONDS),
+        id="notification_outbox",
         replace_existing=True,
         max_instances=1,
         kwargs={"bot": bot}
     )
     
+    scheduler.add_job(
+        leased("ban_expiry", release_expired_bans, min_interval=5 * 60),
+        trigger=IntervalTrigger(minutes=5),
+        id="ban_expiry",
+        replace_existing=True,
+        max_instances=1,
+    )
+    
     scheduler.start()
     LOG.info("Background task scheduler started successfully")
 
@@ -0,0 +1,22 @@
+import logging
+
+from app.db.db import get_session
+from app.db.bans import BanRepository
+from app.settings.utils.bans import unban_user
+
+LOG = logging.getLogger(__name__)
+
+
+async def release_expired_bans():
+    try:
+        async with get_session() as session:
+            expired = await BanRepository(session).get_expired_ids()
+
+        for tg_id in expired:
+            await unban_user(tg_id)
+
+        if expired:
+            LOG.info(f"Released {len(expired)} expired bans")
+
+    except Exception as e:
+        LOG.error(f"Ban expiry error: {type(e).__name__}: {e}")
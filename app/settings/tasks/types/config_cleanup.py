@@ -1,5 +1,6 @@
 import logging
 from datetime import datetime, timedelta
+from typing import Optional
 from sqlalchemy import select, update, func
 from app.db.db import get_session
 from app.models.db import User, Config
@@ -9,7 +10,7 @@ from app.db.cache import get_redis
 LOG = logging.getLogger(__name__)
 
 
-async def cleanup_expired_configs(days_threshold: int = 14):
+async def cleanup_expired_configs(days_threshold: int = 14, tg_id: Optional[int] = None):
     stats = {
         'total_checked': 0,
         'deleted': 0,
@@ -27,7 +28,7 @@ async def cleanup_expired_configs(days_threshold: int = 14):
 
             LOG.info(f"Starting expired config cleanup (threshold: {days_threshold} days, cutoff: {threshold_date})")
 
-            result = await session.execute(
+            query = (
                 select(Config, User.subscription_end)
                 .join(User, Config.tg_id == User.tg_id)
                 .where(
@@ -36,6 +37,10 @@ async def cleanup_expired_configs(days_threshold: int = 14):
                     User.subscription_end < threshold_date
                 )
             )
+            if tg_id is not None:
+                query = query.where(Config.tg_id == tg_id)
+
+            result = await session.execute(query)
             configs_to_delete = result.all()
 
             stats['total_checked'] = len(configs_to_delete)
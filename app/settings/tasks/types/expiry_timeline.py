@@ -0,0 +1,240 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from aiogram import Bot
+from sqlalchemy import select
+
+from app.db.db import get_session
+from app.db.cache import get_redis
+from app.db.timeline import (
+    NOTIFY_3D, NOTIFY_1D, RENEWAL, EXPIRED, CLEANUP, CLEANUP_AFTER_DAYS,
+    due_at, is_stale, pop_due, reschedule, schedule_expiry,
+)
+from app.models.db import User
+from app.keys import renewal_notification_kb
+from app.settings.locales import get_translator
+from app.settings.utils.campaigns import Recipient, run_campaign
+from app.settings.utils.notifications import render_expiry_message
+from app.settings.utils.throttling import TokenBucket
+from app.settings.tasks.leases import current_fence
+from app.settings.config import env
+from .auto_renewal import attempt_auto_renewal
+from .config_cleanup import cleanup_expired_configs
+
+LOG = logging.getLogger(__name__)
+
+RETRY_SECONDS = 300
+RENEWAL_RETRY_SECONDS = 3600
+DONE_TTL = 30 * 86400
+
+# milestone -> (reminder variant, campaign lookback days)
+REMINDERS = {
+    NOTIFY_3D: (3, 3),
+    NOTIFY_1D: (1, 2),
+    EXPIRED: ('expired', 2),
+}
+
+
+async def _renew(user) -> bool:
+    if await attempt_auto_renewal(user.tg_id):
+        return True
+
+    end_ts = user.subscription_end.timestamp()
+    retry_at = time.time() + RENEWAL_RETRY_SECONDS
+    if retry_at < end_ts:
+        await reschedule(RENEWAL, user.tg_id, retry_at)
+    return False
+
+
+async def _cleanup(user) -> bool:
+    await cleanup_expired_configs(CLEANUP_AFTER_DAYS, tg_id=user.tg_id)
+    return True
+
+
+HANDLERS = {
+    RENEWAL: _renew,
+    CLEANUP: _cleanup,
+}
+
+
+def _renderer(days):
+    def render(lang: str, balance):
+        t = get_translator(lang)
+        return render_expiry_message(t, days, balance or 0), renewal_notification_kb(t)
+
+    return render
+
+
+async def _claim(redis, kind: str, tg_id: int, user, now: float) -> Optional[str]:
+    if user is None or user.subscription_end is None:
+        return None
+
+    end_ts = user.subscription_end.timestamp()
+    due = due_at(kind, end_ts)
+    if due > now + 1:
+        await reschedule(kind, tg_id, due)
+        return None
+
+    if is_stale(kind, end_ts, now):
+        LOG.debug(f"Skipping stale {kind} milestone for {tg_id}")
+        return None
+
+    done_key = f"timeline:done:{kind}:{tg_id}:{int(end_ts)}"
+    if not await redis.set(done_key, "1", nx=True, ex=DONE_TTL):
+        return None
+    return done_key
+
+
+async def _run_action(redis, kind: str, user, done_key: str) -> bool:
+    try:
+        handled = await HANDLERS[kind](user)
+    except Exception:
+        await redis.delete(done_key)
+        raise
+
+    if not handled:
+        await redis.delete(done_key)
+    return handled
+
+
+async def _send_reminders(
+    redis,
+    bot: Bot,
+    bucket: TokenBucket,
+    kind: str,
+    claimed: List[Tuple[object, str]],
+    now: float
+) -> int:
+    days, lookback_days = REMINDERS[kind]
+    recipients = sorted(
+        (
+            Recipient(
+                tg_id=user.tg_id,
+                lang=user.lang or 'ru',
+                variant=float(user.balance or 0) if days == 1 else None
+            )
+            for user, _ in claimed
+        ),
+        key=lambda r: r.tg_id
+    )
+
+    async def fetch_page(after_tg_id: int, limit: int) -> List[Recipient]:
+        return [r for r in recipients if r.tg_id > after_tg_id][:limit]
+
+    try:
+        stats = await run_campaign(
+            bot,
+            f"sub_expiry:{kind}",
+            fetch_page=fetch_page,
+            render=_renderer(days),
+            bucket=bucket,
+            lookback_days=lookback_days,
+            checkpoint=False,
+        )
+        undelivered = set(stats.undelivered)
+    except Exception as e:
+        LOG.error(f"Expiry reminders {kind} failed, retrying later: {type(e).__name__}: {e}")
+        stats = None
+        undelivered = {user.tg_id for user, _ in claimed}
+
+    retry = [(user, done_key) for user, done_key in claimed if user.tg_id in undelivered]
+    if retry:
+        await redis.delete(*(done_key for _, done_key in retry))
+        for user, _ in retry:
+            await reschedule(kind, user.tg_id, now + RETRY_SECONDS)
+
+    return stats.sent if stats else 0
+
+
+async def process_expiry_timeline(bot: Bot, batch_size: int = 100) -> int:
+    handled = 0
+    bucket = TokenBucket(env.CAMPAIGN_RATE_PER_SECOND)
+
+    try:
+        redis = await get_redis()
+        while True:
+            items = await pop_due(batch_size, fence=current_fence())
+            if items is None:
+                LOG.warning("Expiry timeline lease was taken over, leaving the rest to the new holder")
+                break
+            if not items:
+                break
+
+            async with get_session() as session:
+                result = await session.execute(
+                    select(User.tg_id, User.lang, User.balance, User.subscription_end)
+                    .where(User.tg_id.in_({tg_id for _, tg_id in items}))
+                )
+                users = {row.tg_id: row for row in result.all()}
+
+            now = time.time()
+            reminders = {kind: [] for kind in REMINDERS}
+            for kind, tg_id in items:
+                try:
+                    done_key = await _claim(redis, kind, tg_id, users.get(tg_id), now)
+                    if done_key is None:
+                        continue
+
+                    if kind in REMINDERS:
+                        reminders[kind].append((users[tg_id], done_key))
+                    elif await _run_action(redis, kind, users[tg_id], done_key):
+                        handled += 1
+                except Exception as e:
+                    LOG.error(f"Expiry milestone {kind} for {tg_id} failed, retrying later: {type(e).__name__}: {e}")
+                    await reschedule(kind, tg_id, now + RETRY_SECONDS)
+
+            for kind, claimed in reminders.items():
+                if claimed:
+                    handled += await _send_reminders(redis, bot, bucket, kind, claimed, now)
+
+            if len(items) < batch_size:
+                break
+
+        if handled:
+            LOG.info(f"Expiry timeline: {handled} milestones handled")
+
+    except Exception as e:
+        LOG.error(f"Expiry timeline error: {type(e).__name__}: {e}")
+
+    return handled
+
+
+async def rebuild_expiry_timeline(page_size: int = 1000) -> int:
+    scheduled = 0
+
+    try:
+        redis = await get_redis()
+        since = datetime.utcnow() - timedelta(days=CLEANUP_AFTER_DAYS + 1)
+        after_tg_id = 0
+
+        while True:
+            async with get_session() as session:
+                result = await session.execute(
+                    select(User.tg_id, User.subscription_end).where(
+                        User.subscription_end >= since,
+                        User.tg_id > after_tg_id
+                    ).order_by(User.tg_id).limit(page_size)
+                )
+                rows = result.all()
+
+            if not rows:
+                break
+
+            pipe = redis.pipeline(transaction=False)
+            for row in rows:
+                await schedule_expiry(row.tg_id, row.subscription_end.timestamp(), pipe=pipe)
+            await pipe.execute()
+
+            scheduled += len(rows)
+            after_tg_id = rows[-1].tg_id
+            if len(rows) < page_size:
+                break
+
+        LOG.info(f"Expiry timeline rebuilt for {scheduled} subscriptions")
+
+    except Exception as e:
+        LOG.error(f"Expiry timeline rebuild error: {type(e).__name__}: {e}")
+
+    return scheduled
@@ -0,0 +1,78 @@
+import logging
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramBadRequest, TelegramRetryAfter
+
+from app.db.db import get_session
+from app.db.outbox import OutboxRepository
+from app.settings.utils.notifications import render_notification
+from app.settings.middlewares.flood_control import SendPriority, priority
+from app.settings.config import env
+
+LOG = logging.getLogger(__name__)
+
+
+def _backoff(attempts: int) -> int:
+    return min(10 * 2 ** attempts, 3600)
+
+
+async def dispatch_notifications(bot: Bot, batch_size: int = None) -> int:
+    batch_size = batch_size or env.NOTIFICATION_BATCH_SIZE
+    total_sent = 0
+
+    try:
+        while True:
+            async with get_session() as session:
+                repo = OutboxRepository(session)
+                items = await repo.claim_due(batch_size, env.NOTIFICATION_INFLIGHT_SECONDS)
+                if not items:
+                    break
+                # release the row locks and the connection before talking to Telegram;
+                # the results are written back in a second, short transaction
+                await session.commit()
+
+                sent = 0
+                retry_after = None
+                for item in items:
+                    if retry_after is not None:
+                        repo.postpone(item, retry_after)
+                        continue
+
+                    try:
+                        text, markup = render_notification(item.kind, item.lang, item.payload or {})
+                    except Exception as e:
+                        LOG.error(f"Cannot render notification {item.id} ({item.kind}): {type(e).__name__}: {e}")
+                        repo.mark_dropped(item, f"render: {e}")
+                        continue
+
+                    try:
+                        with priority(SendPriority.NOTIFICATION):
+                            await bot.send_message(chat_id=item.tg_id, text=text, reply_markup=markup)
+                        repo.mark_sent(item)
+                        sent += 1
+                    except TelegramRetryAfter as e:
+                        LOG.warning(f"Flood control while sending notifications, retry after {e.retry_after}s")
+                        retry_after = e.retry_after
+                        repo.postpone(item, retry_after)
+                    except TelegramForbiddenError:
+                        LOG.warning(f"User {item.tg_id} blocked the bot, dropping {item.kind} notification")
+                        repo.mark_dropped(item, "forbidden")
+                    except TelegramBadRequest as e:
+                        LOG.warning(f"Bad request sending {item.kind} notification to {item.tg_id}: {e}")
+                        repo.mark_dropped(item, str(e))
+                    except Exception as e:
+                        LOG.warning(f"Error sending {item.kind} notification to {item.tg_id}: {type(e).__name__}: {e}")
+                        repo.mark_retry(item, f"{type(e).__name__}: {e}", _backoff(item.attempts), env.NOTIFICATION_MAX_ATTEMPTS)
+
+                await session.commit()
+                total_sent += sent
+
+                if retry_after is not None or len(items) < batch_size:
+                    break
+
+        if total_sent:
+            LOG.info(f"Notification outbox: {total_sent} messages delivered")
+
+    except Exception as e:
+        LOG.error(f"Notification outbox dispatch error: {type(e).__name__}: {e}")
+
+    return total_sent
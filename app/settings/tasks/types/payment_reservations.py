@@ -0,0 +1,19 @@
+import logging
+
+from app.db.db import get_session
+from app.db.payments import PaymentRepository
+
+LOG = logging.getLogger(__name__)
+
+
+async def sweep_payment_reservations(max_age_minutes: int = 5):
+    try:
+        async with get_session() as session:
+            payment_repo = PaymentRepository(session)
+            swept = await payment_repo.sweep_stale_reservations(max_age_minutes)
+
+            if swept:
+                LOG.warning(f"Swept {swept} abandoned payment reservation(s)")
+
+    except Exception as e:
+        LOG.error(f"Payment reservation sweep error: {type(e).__name__}: {e}")
@@ -1,13 +1,14 @@
 import logging
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, timedelta
-from pytonapi import AsyncTonapi
 from pytonapi.utils import to_amount, raw_to_userfriendly
 from sqlalchemy.exc import IntegrityError
 
+from app.api import http_client
 from app.db.db import get_session
-from app.payments.manager import PaymentManager
+from app.db.payments import PaymentRepository
 from app.payments.models import PaymentMethod
+from app.payments.registry import get_gateway
 from app.models.db import TonTransaction
 from app.db.cache import get_redis
 from app.settings.config import env
@@ -17,27 +18,34 @@ LOG = logging.getLogger(__name__)
 _last_lt = 0
 
 
+async def _get_account_transactions(account_id: str, limit: int = 50) -> list[dict]:
+    async with http_client.request(
+        "GET",
+        f"{env.TONAPI_URL.rstrip('/')}/v2/blockchain/accounts/{account_id}/transactions",
+        params={"limit": limit},
+        headers={"Authorization": f"Bearer {env.TONAPI_KEY}"},
+    ) as resp:
+        resp.raise_for_status()
+        data = await resp.json()
+    return data.get("transactions", [])
+
+
 async def check_ton_transactions():
     global _last_lt
     
     try:
-        tonapi = AsyncTonapi(api_key=env.TONAPI_KEY)
-        
-        result = await tonapi.blockchain.get_account_transactions(
-            account_id=env.TON_ADDRESS,
-            limit=50
-        )
-        
+        transactions = await _get_account_transactions(env.TON_ADDRESS, limit=50)
+
         txs = []
         now = datetime.utcnow()
         min_time = now - timedelta(minutes=env.PAYMENT_TIMEOUT_MINUTES * 2)
 
-        for tx in result.transactions:
-            lt = int(tx.lt)
+        for tx in transactions:
+            lt = int(tx.get("lt", 0))
             try:
-                created_at = datetime.utcfromtimestamp(int(tx.utime))
+                created_at = datetime.utcfromtimestamp(int(tx["utime"]))
             except Exception:
-                LOG.debug("Skipping tx with invalid utime: %s", getattr(tx, "hash", "<no-hash>"))
+                LOG.debug("Skipping tx with invalid utime: %s", tx.get("hash", "<no-hash>"))
                 continue
 
             if lt <= _last_lt or created_at < min_time:
@@ -52,9 +60,9 @@ async def check_ton_transactions():
         
         async with get_session() as session:
             redis_client = await get_redis()
-            manager = PaymentManager(session, redis_client)
+            payment_repo = PaymentRepository(session, redis_client)
             try:
-                await manager.payment_repo.mark_failed_old_payments()
+                await payment_repo.mark_failed_old_payments()
             except Exception as e:
                 LOG.error(f"mark_failed_old_payments error: {e}")
                 
@@ -66,22 +74,23 @@ async def _insert_transactions(txs):
     async with get_session() as session:
         for tx in txs:
             try:
-                tx_hash = tx.hash
-                amount = Decimal(to_amount(getattr(tx.in_msg, "value", 0))).quantize(
+                tx_hash = tx["hash"]
+                in_msg = tx.get("in_msg") or {}
+                amount = Decimal(to_amount(in_msg.get("value", 0))).quantize(
                     Decimal("0.01"), rounding=ROUND_HALF_UP
                 )
                 comment = (
-                    tx.in_msg.decoded_body.get("text", "")
-                    if getattr(tx.in_msg, "decoded_op_name", "") == "text_comment"
+                    (in_msg.get("decoded_body") or {}).get("text", "")
+                    if in_msg.get("decoded_op_name", "") == "text_comment"
                     else ""
                 )
-                source = getattr(tx.in_msg, "source", None)
+                source = in_msg.get("source") or {}
                 sender = (
-                    raw_to_userfriendly(source.address.root)
-                    if source and hasattr(source, "address") and hasattr(source.address, "root")
+                    raw_to_userfriendly(source["address"])
+                    if source.get("address")
                     else None
                 )
-                created_at = datetime.utcfromtimestamp(int(tx.utime))
+                created_at = datetime.utcfromtimestamp(int(tx["utime"]))
 
                 txn = TonTransaction(
                     tx_hash=tx_hash,
@@ -105,11 +114,9 @@ async def _insert_transactions(txs):
 
 async def _process_pending_payments():
     async with get_session() as session:
-        redis_client = await get_redis()
-        manager = PaymentManager(session, redis_client)
-        pendings = await manager.get_pending_payments(PaymentMethod.TON)
-        for payment in pendings:
-            try:
-                await manager.check_payment(payment['id'])
-            except Exception as e:
-                LOG.error(f"check_payment error for payment {payment['id']}: {e}")
\ No newline at end of file
+        try:
+            confirmed = await get_gateway(PaymentMethod.TON).process_new_transactions(session)
+            if confirmed:
+                LOG.info(f"Matched {confirmed} TON payment(s) to incoming transactions")
+        except Exception as e:
+            LOG.error(f"TON payment matching error: {type(e).__name__}: {e}")
@@ -1,3 +1,3 @@
 from .rates import get_ton_price, get_usdt_rub_rate
-from .qrcode import generate_qr_code
-from .payment_notifications import send_payment_notification
\ No newline at end of file
+from .qrcode import generate_qr_code, render_qr, answer_qr
+from .notifications import NotificationKind, render_notification
\ No newline at end of file
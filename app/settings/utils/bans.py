@@ -0,0 +1,170 @@
+import asyncio
+import math
+from typing import Dict, Iterable, Optional
+
+from app.db.bans import BanRepository, BANS_KEY, BANS_READY_KEY, BANS_CHANNEL
+from app.db.cache import get_redis
+from app.db.db import get_session
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+_RELOAD_SECONDS = 600
+_CONFIRMED_MAX = 10000
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1024)
+        self.size = int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: int):
+        h1 = (value * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        h2 = ((value ^ (value >> 31)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, value: int):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value: int) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+_filter = BloomFilter(0)
+_count = 0
+_confirmed: Dict[int, bool] = {}
+_listener_task: Optional[asyncio.Task] = None
+
+
+def _rebuild(ids: Iterable[int]):
+    global _filter, _count
+    ids = list(ids)
+    bloom = BloomFilter(len(ids) * 2)
+    for tg_id in ids:
+        bloom.add(tg_id)
+    _filter = bloom
+    _count = len(ids)
+    _confirmed.clear()
+
+
+async def _load_local(redis):
+    members = await redis.smembers(BANS_KEY)
+    _rebuild(int(m) for m in members)
+    LOG.info(f"Ban filter loaded: {_count} users")
+
+
+async def reload_bans():
+    redis = await get_redis()
+    if not await redis.exists(BANS_READY_KEY):
+        async with get_session() as session:
+            await BanRepository(session, redis).sync_redis()
+
+    await _load_local(redis)
+
+
+def might_be_banned(tg_id: int) -> bool:
+    return _count > 0 and tg_id in _filter
+
+
+async def is_banned(tg_id: int) -> bool:
+    if not might_be_banned(tg_id):
+        return False
+
+    cached = _confirmed.get(tg_id)
+    if cached is not None:
+        return cached
+
+    try:
+        redis = await get_redis()
+        banned = bool(await redis.sismember(BANS_KEY, tg_id))
+    except Exception as e:
+        LOG.warning(f"Redis error checking ban for {tg_id}: {e}")
+        return True
+
+    if len(_confirmed) >= _CONFIRMED_MAX:
+        _confirmed.clear()
+    _confirmed[tg_id] = banned
+    return banned
+
+
+async def ban_user(tg_id: int, reason: Optional[str] = None, minutes: Optional[int] = None, banned_by: Optional[int] = None):
+    global _count
+    _filter.add(tg_id)
+    _count += 1
+    _confirmed[tg_id] = True
+    async with get_session() as session:
+        await BanRepository(session, await get_redis()).ban(tg_id, reason, minutes, banned_by)
+
+
+async def unban_user(tg_id: int) -> bool:
+    _confirmed[tg_id] = False
+    async with get_session() as session:
+        return await BanRepository(session, await get_redis()).unban(tg_id)
+
+
+async def _handle_event(message: str):
+    global _count
+    action, _, value = message.partition(":")
+    if action == "ban":
+        tg_id = int(value)
+        _filter.add(tg_id)
+        _confirmed[tg_id] = True
+        _count += 1
+    elif action == "unban":
+        _confirmed[int(value)] = False
+    elif action == "reload":
+        await _load_local(await get_redis())
+
+
+async def _listen():
+    while True:
+        pubsub = None
+        try:
+            redis = await get_redis()
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(BANS_CHANNEL)
+            await reload_bans()
+
+            loop = asyncio.get_running_loop()
+            next_reload = loop.time() + _RELOAD_SECONDS
+            while True:
+                message = await pubsub.get_message(timeout=min(30, _RELOAD_SECONDS))
+                if message and message.get("type") == "message":
+                    await _handle_event(message["data"])
+                if loop.time() >= next_reload:
+                    await reload_bans()
+                    next_reload = loop.time() + _RELOAD_SECONDS
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOG.error(f"Ban listener error: {type(e).__name__}: {e}")
+            await asyncio.sleep(5)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+async def init_bans():
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        await reload_bans()
+        _listener_task = asyncio.create_task(_listen())
+
+
+async def close_bans():
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
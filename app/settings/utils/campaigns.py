@@ -0,0 +1,188 @@
+import asyncio
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup
+
+from app.db.cache import get_redis
+from app.settings.config import env
+from app.settings.log import get_logger
+from app.settings.middlewares.flood_control import SendPriority, priority
+from .throttling import TokenBucket
+
+LOG = get_logger(__name__)
+
+_BITMAP_PRIMES = (8388593, 8388587)
+_BITMAP_TTL = 86400 * 7
+_CURSOR_TTL = 86400 * 2
+
+
+@dataclass
+class Recipient:
+    tg_id: int
+    lang: str
+    variant: Hashable
+
+
+@dataclass
+class CampaignStats:
+    sent: int = 0
+    skipped: int = 0
+    failed: int = 0
+    blocked: int = 0
+    rendered: Dict[Tuple[str, Hashable], int] = field(default_factory=dict)
+    undelivered: List[int] = field(default_factory=list)
+
+
+def _day(offset: int = 0) -> str:
+    return (datetime.utcnow() - timedelta(days=offset)).strftime('%Y%m%d')
+
+
+def _bitmap_key(campaign: str, day: str) -> str:
+    return f"notif:{campaign}:{day}"
+
+
+def _bit_offsets(tg_id: int) -> Tuple[int, int]:
+    return tg_id % _BITMAP_PRIMES[0], _BITMAP_PRIMES[0] + tg_id % _BITMAP_PRIMES[1]
+
+
+async def _already_delivered(campaign: str, tg_ids: List[int], lookback_days: int) -> List[bool]:
+    redis = await get_redis()
+    days = [_day(offset) for offset in range(lookback_days)]
+
+    pipe = redis.pipeline(transaction=False)
+    for tg_id in tg_ids:
+        first, second = _bit_offsets(tg_id)
+        for day in days:
+            pipe.bitfield(_bitmap_key(campaign, day)).get('u1', first).get('u1', second).execute()
+    results = await pipe.execute()
+
+    delivered = []
+    for i in range(len(tg_ids)):
+        checks = results[i * len(days):(i + 1) * len(days)]
+        delivered.append(any(bits == [1, 1] for bits in checks))
+    return delivered
+
+
+async def _mark_delivered(campaign: str, tg_ids: Iterable[int]):
+    tg_ids = list(tg_ids)
+    if not tg_ids:
+        return
+
+    redis = await get_redis()
+    key = _bitmap_key(campaign, _day())
+    pipe = redis.pipeline(transaction=False)
+    for tg_id in tg_ids:
+        first, second = _bit_offsets(tg_id)
+        pipe.bitfield(key).set('u1', first, 1).set('u1', second, 1).execute()
+    pipe.expire(key, _BITMAP_TTL)
+    await pipe.execute()
+
+
+async def _load_cursor(campaign: str) -> int:
+    redis = await get_redis()
+    value = await redis.get(f"campaign:{campaign}:{_day()}:cursor")
+    return int(value) if value else 0
+
+
+async def _save_cursor(campaign: str, tg_id: Optional[int]):
+    redis = await get_redis()
+    key = f"campaign:{campaign}:{_day()}:cursor"
+    if tg_id is None:
+        await redis.delete(key)
+    else:
+        await redis.setex(key, _CURSOR_TTL, str(tg_id))
+
+
+async def run_campaign(
+    bot: Bot,
+    campaign: str,
+    fetch_page: Callable[[int, int], Awaitable[List[Recipient]]],
+    render: Callable[[str, Hashable], Tuple[str, Optional[InlineKeyboardMarkup]]],
+    bucket: Optional[TokenBucket] = None,
+    lookback_days: int = 3,
+    page_size: int = 500,
+    checkpoint: bool = True,
+) -> CampaignStats:
+    bucket = bucket or TokenBucket(env.CAMPAIGN_RATE_PER_SECOND)
+    semaphore = asyncio.Semaphore(env.CAMPAIGN_CONCURRENCY)
+    jitter = env.CAMPAIGN_JITTER_MS / 1000
+    stats = CampaignStats()
+    rendered: Dict[Tuple[str, Hashable], Tuple[str, Optional[InlineKeyboardMarkup]]] = {}
+
+    def _rendered(recipient: Recipient):
+        key = (recipient.lang, recipient.variant)
+        if key not in rendered:
+            rendered[key] = render(recipient.lang, recipient.variant)
+            stats.rendered[key] = 0
+        stats.rendered[key] += 1
+        return rendered[key]
+
+    async def _send(recipient: Recipient) -> bool:
+        text, markup = _rendered(recipient)
+        if not text:
+            stats.skipped += 1
+            return False
+
+        async with semaphore:
+            with priority(SendPriority.BULK):
+                for _ in range(3):
+                    if jitter:
+                        await asyncio.sleep(random.uniform(0, jitter))
+                    await bucket.acquire()
+                    try:
+                        await bot.send_message(chat_id=recipient.tg_id, text=text, reply_markup=markup)
+                        stats.sent += 1
+                        return True
+                    except TelegramRetryAfter as e:
+                        LOG.warning(f"Campaign {campaign}: flood control, pausing {e.retry_after}s")
+                        bucket.pause(e.retry_after)
+                    except TelegramForbiddenError:
+                        stats.blocked += 1
+                        return True
+                    except TelegramBadRequest as e:
+                        LOG.warning(f"Campaign {campaign}: bad request for {recipient.tg_id}: {e}")
+                        stats.failed += 1
+                        return True
+                    except Exception as e:
+                        LOG.warning(f"Campaign {campaign}: error sending to {recipient.tg_id}: {type(e).__name__}: {e}")
+                        stats.failed += 1
+                        return False
+
+        stats.failed += 1
+        return False
+
+    cursor = await _load_cursor(campaign) if checkpoint else 0
+    if cursor:
+        LOG.info(f"Campaign {campaign}: resuming after tg_id {cursor}")
+
+    while True:
+        page = await fetch_page(cursor, page_size)
+        if not page:
+            break
+
+        delivered = await _already_delivered(campaign, [r.tg_id for r in page], lookback_days)
+        pending = [r for r, done in zip(page, delivered) if not done]
+        stats.skipped += len(page) - len(pending)
+
+        results = await asyncio.gather(*[_send(r) for r in pending])
+        await _mark_delivered(campaign, [r.tg_id for r, done in zip(pending, results) if done])
+        stats.undelivered += [r.tg_id for r, done in zip(pending, results) if not done]
+
+        cursor = page[-1].tg_id
+        if checkpoint:
+            await _save_cursor(campaign, cursor)
+
+        if len(page) < page_size:
+            break
+
+    if checkpoint:
+        await _save_cursor(campaign, None)
+
+    LOG.info(f"Campaign {campaign} finished: sent={stats.sent}, skipped={stats.skipped}, "
+             f"blocked={stats.blocked}, failed={stats.failed}, variants={len(stats.rendered)}")
+    return stats
@@ -0,0 +1,24 @@
+from typing import Optional, Dict
+from aiogram import Bot
+from aiocryptopay import AioCryptoPay
+
+_identities: Dict[str, str] = {}
+
+
+async def get_bot_username(bot: Optional[Bot] = None) -> str:
+    username = _identities.get('bot')
+    if username is None:
+        if bot is None:
+            raise RuntimeError("Bot identity not resolved. Call get_bot_username(bot) during warm-up.")
+        username = (await bot.me()).username
+        _identities['bot'] = username
+    return username
+
+
+async def get_cryptopay_bot_username(cryptopay: AioCryptoPay) -> str:
+    username = _identities.get('cryptopay')
+    if username is None:
+        profile = await cryptopay.get_me()
+        username = profile.payment_processing_bot_username
+        _identities['cryptopay'] = username
+    return username
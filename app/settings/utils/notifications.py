@@ -0,0 +1,75 @@
+import logging
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+from app.settings.locales import get_translator
+from app.keys import payment_success_actions, renewal_notification_kb
+from app.settings.config import env
+
+LOG = logging.getLogger(__name__)
+
+
+class NotificationKind:
+    PAYMENT_SUCCESS = "payment_success"
+    AUTO_RENEWAL = "auto_renewal"
+    SUB_EXPIRY = "sub_expiry"
+
+
+def _render_payment_success(t, payload: dict) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    text = t('payment_success', amount=float(Decimal(payload['amount'])))
+    return text, payment_success_actions(t, payload.get('has_active_subscription', False))
+
+
+def _render_auto_renewal(t, payload: dict) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    text = t(
+        'auto_renewal_success',
+        days=payload['days'],
+        price=float(payload['price']),
+        balance=float(payload['balance']),
+        expire_date=payload['expire_date']
+    )
+    return text, None
+
+
+def render_expiry_message(t, days: int | str, user_balance: float = 0) -> str:
+    if days == 3:
+        return t('sub_expiry_3days')
+
+    if days == 1:
+        monthly_price = env.plans['sub_1m']['price']
+        needed = max(0, monthly_price - user_balance)
+
+        message = t('sub_expiry_1day')
+
+        if needed > 0:
+            message += f"\n\n{t('quick_renewal_info', price=monthly_price, needed=int(needed))}"
+        else:
+            message += f"\n\n{t('quick_renewal_ready', price=monthly_price)}"
+
+        return message
+
+    if days == 'expired':
+        return t('sub_expired')
+
+    return ""
+
+
+def _render_sub_expiry(t, payload: dict) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    text = render_expiry_message(t, payload['days'], float(payload.get('balance', 0)))
+    return text, renewal_notification_kb(t)
+
+
+RENDERERS = {
+    NotificationKind.PAYMENT_SUCCESS: _render_payment_success,
+    NotificationKind.AUTO_RENEWAL: _render_auto_renewal,
+    NotificationKind.SUB_EXPIRY: _render_sub_expiry,
+}
+
+
+def render_notification(kind: str, lang: str, payload: dict) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    renderer = RENDERERS.get(kind)
+    if renderer is None:
+        raise ValueError(f"Unknown notification kind: {kind}")
+    return renderer(get_translator(lang), payload)
@@ -1,41 +0,0 @@
-import logging
-from decimal import Decimal
-from aiogram import Bot
-from aiogram.exceptions import TelegramForbiddenError, TelegramBadRequest
-
-from app.settings.locales import get_translator
-from app.keys import payment_success_actions
-
-LOG = logging.getLogger(__name__)
-
-
-async def send_payment_notification(
-    bot: Bot,
-    tg_id: int,
-    amount: Decimal,
-    lang: str = "ru",
-    has_active_subscription: bool = False
-):
-    try:
-        t = get_translator(lang)
-
-        success_text = t('payment_success', amount=float(amount))
-
-        await bot.send_message(
-            chat_id=tg_id,
-            text=success_text,
-            reply_markup=payment_success_actions(t, has_active_subscription)
-        )
-
-        LOG.info(f"Payment notification sent to user {tg_id}: {amount} RUB")
-        return True
-
-    except TelegramForbiddenError:
-        LOG.warning(f"User {tg_id} blocked the bot, cannot send payment notification")
-        return False
-    except TelegramBadRequest as e:
-        LOG.warning(f"Bad request sending payment notification to {tg_id}: {e}")
-        return False
-    except Exception as e:
-        LOG.error(f"Error sending payment notification to {tg_id}: {type(e).__name__}: {e}")
-        return False
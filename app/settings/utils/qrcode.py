@@ -1,9 +1,24 @@
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
+from typing import Optional
+
 import qrcode
-from aiogram.types import BufferedInputFile
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message
 
+from app.db.cache import get_redis, CacheTTL
+from app.settings.config import env
+from app.settings.log import get_logger
 
-def generate_qr_code(data: str, filename: str = "qr_code.png") -> BufferedInputFile:
+LOG = get_logger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def render_qr_png(data: str) -> bytes:
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -17,6 +32,79 @@ def generate_qr_code(data: str, filename: str = "qr_code.png") -> BufferedInputF
 
     bio = BytesIO()
     img.save(bio, format='PNG')
-    bio.seek(0)
+    return bio.getvalue()
+
+
+def generate_qr_code(data: str, filename: str = "qr_code.png") -> BufferedInputFile:
+    return BufferedInputFile(render_qr_png(data), filename=filename)
+
+
+def init_qr_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=env.QR_WORKERS)
+
+
+def close_qr_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _digest(data: str) -> str:
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _read_cached(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_cached(path: str, png: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(png)
+    os.replace(tmp, path)
+
+
+async def render_qr(data: str) -> bytes:
+    path = os.path.join(env.QR_CACHE_DIR, f"{_digest(data)}.png")
+    png = await asyncio.to_thread(_read_cached, path)
+    if png is not None:
+        return png
+
+    loop = asyncio.get_running_loop()
+    if _pool is not None:
+        png = await loop.run_in_executor(_pool, render_qr_png, data)
+    else:
+        png = await asyncio.to_thread(render_qr_png, data)
+
+    try:
+        await asyncio.to_thread(_write_cached, path, png)
+    except OSError as e:
+        LOG.warning(f"Cannot cache QR code at {path}: {e}")
+    return png
+
+
+async def answer_qr(message: Message, data: str, filename: str = "qr_code.png", **kwargs) -> Message:
+    key = f"qr:file_id:{_digest(data)}"
+    redis = await get_redis()
+
+    file_id = await redis.get(key)
+    if file_id:
+        try:
+            return await message.answer_photo(photo=file_id, **kwargs)
+        except TelegramBadRequest as e:
+            LOG.warning(f"Cached QR file_id rejected, uploading again: {e}")
+            await redis.delete(key)
 
-    return BufferedInputFile(bio.read(), filename=filename)
\ No newline at end of file
+    png = await render_qr(data)
+    sent = await message.answer_photo(photo=BufferedInputFile(png, filename=filename), **kwargs)
+    if sent.photo:
+        await redis.setex(key, CacheTTL.QR_FILE_ID, sent.photo[-1].file_id)
+    return sent
@@ -1,52 +1,216 @@
+import asyncio
+import json
+import time
 from decimal import Decimal
-from datetime import datetime, timedelta
+from statistics import median
+from typing import Optional, Dict, Callable, Awaitable, List
+
 import aiohttp
 
-_ton_price_cache = {"price": None, "timestamp": None}
-_usdt_price_cache = {"price": None, "timestamp": None}
-_PRICE_CACHE_TTL_SECONDS = 60
+from app.api import http_client
+from app.db.cache import get_redis
+from app.settings.config import env
+from app.settings.log import get_logger
 
-async def get_ton_price() -> Decimal:
-    now = datetime.utcnow()
+LOG = get_logger(__name__)
+
+ASSETS = ("ton", "usdt")
+
+_REDIS_KEY = "rates:{asset}"
+_REFRESH_LOCK_KEY = "rates:refresh_lock"
+
+_quotes: Dict[str, Dict] = {}
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_lock = asyncio.Lock()
+
+_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+
+async def _fetch_coingecko() -> Dict[str, Decimal]:
+    async with http_client.request(
+        "GET",
+        "https://api.coingecko.com/api/v3/simple/price",
+        params={"ids": "the-open-network,tether", "vs_currencies": "rub"},
+        timeout=_TIMEOUT,
+    ) as resp:
+        resp.raise_for_status()
+        data = await resp.json()
+
+    return {
+        "ton": Decimal(str(data["the-open-network"]["rub"])),
+        "usdt": Decimal(str(data["tether"]["rub"])),
+    }
+
+
+async def _fetch_cryptobot() -> Dict[str, Decimal]:
+    if not env.CRYPTOBOT_TOKEN:
+        return {}
+
+    host = "https://testnet-pay.crypt.bot" if env.CRYPTOBOT_TESTNET else "https://pay.crypt.bot"
+    async with http_client.request(
+        "GET",
+        f"{host}/api/getExchangeRates",
+        headers={"Crypto-Pay-API-Token": env.CRYPTOBOT_TOKEN},
+        timeout=_TIMEOUT,
+    ) as resp:
+        resp.raise_for_status()
+        data = await resp.json()
+
+    rates = {}
+    for item in data.get("result", []):
+        if item.get("target") != "RUB" or not item.get("is_valid"):
+            continue
+        source = item.get("source", "").lower()
+        if source in ASSETS:
+            rates[source] = Decimal(str(item["rate"]))
+    return rates
+
+
+SOURCES: List[Callable[[], Awaitable[Dict[str, Decimal]]]] = [
+    _fetch_coingecko,
+    _fetch_cryptobot,
+]
+
+
+async def _fetch_all() -> Dict[str, Decimal]:
+    results = await asyncio.gather(*[source() for source in SOURCES], return_exceptions=True)
+
+    samples: Dict[str, List[Decimal]] = {asset: [] for asset in ASSETS}
+    for source, result in zip(SOURCES, results):
+        if isinstance(result, Exception):
+            LOG.warning(f"Rate source {source.__name__} failed: {type(result).__name__}: {result}")
+            continue
+        for asset, price in result.items():
+            if price > 0:
+                samples[asset].append(price)
+
+    return {asset: median(prices) for asset, prices in samples.items() if prices}
+
+
+async def _store(prices: Dict[str, Decimal]):
+    now = time.time()
+    for asset, price in prices.items():
+        _quotes[asset] = {"price": price, "ts": now}
 
-    if (_ton_price_cache["price"] and
-        _ton_price_cache["timestamp"] and
-        (now - _ton_price_cache["timestamp"]).total_seconds() < _PRICE_CACHE_TTL_SECONDS):
-        return _ton_price_cache["price"]
+    try:
+        redis = await get_redis()
+        pipe = redis.pipeline()
+        for asset, price in prices.items():
+            pipe.setex(
+                _REDIS_KEY.format(asset=asset),
+                env.RATES_MAX_STALE_SECONDS,
+                json.dumps({"price": str(price), "ts": now})
+            )
+        await pipe.execute()
+    except Exception as e:
+        LOG.warning(f"Redis error storing rates: {e}")
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            "https://api.coingecko.com/api/v3/simple/price",
-            params={"ids": "the-open-network", "vs_currencies": "rub"},
-            timeout=aiohttp.ClientTimeout(total=5)
-        ) as resp:
-            data = await resp.json()
-            price = Decimal(str(data["the-open-network"]["rub"]))
 
-            _ton_price_cache["price"] = price
-            _ton_price_cache["timestamp"] = now
+async def _load_shared(asset: str) -> Optional[Dict]:
+    try:
+        redis = await get_redis()
+        cached = await redis.get(_REDIS_KEY.format(asset=asset))
+    except Exception as e:
+        LOG.warning(f"Redis error reading {asset} rate: {e}")
+        return None
 
-            return price
+    if not cached:
+        return None
+
+    data = json.loads(cached)
+    quote = {"price": Decimal(data["price"]), "ts": float(data["ts"])}
+    local = _quotes.get(asset)
+    if not local or local["ts"] < quote["ts"]:
+        _quotes[asset] = quote
+    return _quotes[asset]
+
+
+async def refresh_rates(force: bool = False) -> bool:
+    async with _refresh_lock:
+        if not force:
+            try:
+                redis = await get_redis()
+                acquired = await redis.set(
+                    _REFRESH_LOCK_KEY, "1", nx=True, ex=max(1, env.RATES_REFRESH_SECONDS - 1)
+                )
+                if not acquired:
+                    for asset in ASSETS:
+                        await _load_shared(asset)
+                    return False
+            except Exception as e:
+                LOG.warning(f"Redis error acquiring rates refresh lock: {e}")
+
+        prices = await _fetch_all()
+        if not prices:
+            LOG.error("All rate sources failed, serving last known quotes")
+            return False
+
+        await _store(prices)
+        LOG.debug(f"Rates refreshed: {prices}")
+        return True
+
+
+async def _refresh_loop():
+    while True:
+        try:
+            await refresh_rates()
+        except Exception as e:
+            LOG.error(f"Rates refresh error: {type(e).__name__}: {e}")
+        await asyncio.sleep(env.RATES_REFRESH_SECONDS)
+
+
+async def _get_rate(asset: str) -> Decimal:
+    now = time.time()
+
+    quote = _quotes.get(asset)
+    if quote and now - quote["ts"] < env.RATES_REFRESH_SECONDS * 2:
+        return quote["price"]
+
+    shared = await _load_shared(asset)
+    if shared and now - shared["ts"] < env.RATES_REFRESH_SECONDS * 2:
+        return shared["price"]
+
+    if not _refresh_lock.locked():
+        try:
+            await refresh_rates(force=True)
+        except Exception as e:
+            LOG.error(f"On-demand rates refresh error: {type(e).__name__}: {e}")
+    else:
+        async with _refresh_lock:
+            pass
+
+    quote = _quotes.get(asset)
+    if quote and time.time() - quote["ts"] < env.RATES_MAX_STALE_SECONDS:
+        age = time.time() - quote["ts"]
+        if age >= env.RATES_REFRESH_SECONDS * 2:
+            LOG.warning(f"Serving stale {asset} rate ({age:.0f}s old)")
+        return quote["price"]
+
+    raise ValueError(f"No {asset.upper()}/RUB rate available")
+
+
+async def get_ton_price() -> Decimal:
+    return await _get_rate("ton")
 
 
 async def get_usdt_rub_rate() -> Decimal:
-    now = datetime.utcnow()
-
-    if (_usdt_price_cache["price"] and
-        _usdt_price_cache["timestamp"] and
-        (now - _usdt_price_cache["timestamp"]).total_seconds() < _PRICE_CACHE_TTL_SECONDS):
-        return _usdt_price_cache["price"]
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            "https://api.coingecko.com/api/v3/simple/price",
-            params={"ids": "tether", "vs_currencies": "rub"},
-            timeout=aiohttp.ClientTimeout(total=5)
-        ) as resp:
-            data = await resp.json()
-            price = Decimal(str(data["tether"]["rub"]))
-
-            _usdt_price_cache["price"] = price
-            _usdt_price_cache["timestamp"] = now
-
-            return price
\ No newline at end of file
+    return await _get_rate("usdt")
+
+
+async def init_rates():
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop())
+        LOG.info("Rates refresher started")
+
+
+async def close_rates():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+    LOG.info("Rates refresher stopped")
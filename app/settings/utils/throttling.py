@@ -0,0 +1,28 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self._interval = 1 / rate
+        self._tolerance = ((capacity or rate) - 1) * self._interval
+        self._tat = 0.0
+
+    @property
+    def idle(self) -> bool:
+        return self._tat <= time.monotonic()
+
+    def pause(self, seconds: float):
+        self._tat = max(self._tat, time.monotonic() + seconds + self._tolerance)
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        tat = max(self._tat, now)
+        self._tat = tat + self._interval
+        return max(0.0, tat - self._tolerance - now)
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from aiogram import Bot
+from sqlalchemy import select, text, or_
+
+from app.api.marzban import MarzbanClient
+from app.db.cache import get_redis, CacheTTL
+from app.db.db import engine, get_session
+from app.models.db import User, Payment
+from app.payments.registry import get_gateways
+from app.settings.log import get_logger
+from app.settings.utils.identity import get_bot_username
+from app.settings.utils.rates import get_ton_price, get_usdt_rub_rate
+
+LOG = get_logger(__name__)
+
+
+async def _warm_db_pool(connections: int):
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*[ping() for _ in range(connections)])
+
+
+async def _warm_redis_pool(connections: int):
+    redis = await get_redis()
+    await asyncio.gather(*[redis.ping() for _ in range(connections)])
+
+
+async def _warm_rates():
+    await get_ton_price()
+    await get_usdt_rub_rate()
+
+
+async def _warm_gateways():
+    for method, gateway in get_gateways().items():
+        try:
+            await gateway.warm_up()
+        except Exception as e:
+            LOG.warning(f"Warm-up of {method.value} gateway failed: {type(e).__name__}: {e}")
+
+
+async def _warm_node_metrics():
+    await MarzbanClient().get_best_instance_and_node()
+
+
+async def _preload_active_users(days: int, limit: int):
+    since = datetime.utcnow() - timedelta(days=days)
+
+    async with get_session() as session:
+        recent_payers = select(Payment.tg_id).where(Payment.created_at >= since)
+        result = await session.execute(
+            select(User.tg_id, User.lang, User.balance, User.subscription_end)
+            .where(or_(User.created_at >= since, User.tg_id.in_(recent_payers)))
+            .limit(limit)
+        )
+        users = result.all()
+
+    if not users:
+        return 0
+
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for tg_id, lang, balance, sub_end in users:
+        sub_end_ts = sub_end.timestamp() if sub_end else None
+        pipe.setex(f"user:{tg_id}:lang", CacheTTL.LANG, lang or "ru")
+        pipe.setex(f"user:{tg_id}:balance", CacheTTL.BALANCE, str(balance or 0))
+        pipe.setex(f"user:{tg_id}:sub_end", CacheTTL.SUB_END, str(sub_end_ts) if sub_end_ts else 'None')
+    await pipe.execute()
+    return len(users)
+
+
+async def warm_up(
+    bot: Bot,
+    db_connections: int = 5,
+    redis_connections: int = 5,
+    active_days: int = 3,
+    preload_limit: int = 2000
+):
+    started = time.monotonic()
+
+    steps = {
+        'bot_identity': get_bot_username(bot),
+        'db_pool': _warm_db_pool(db_connections),
+        'redis_pool': _warm_redis_pool(redis_connections),
+        'rates': _warm_rates(),
+        'gateways': _warm_gateways(),
+        'node_metrics': _warm_node_metrics(),
+        'active_users': _preload_active_users(active_days, preload_limit),
+    }
+    results = await asyncio.gather(*steps.values(), return_exceptions=True)
+
+    for name, result in zip(steps, results):
+        if isinstance(result, Exception):
+            LOG.warning(f"Warm-up step {name} failed: {type(result).__name__}: {result}")
+        elif name == 'active_users':
+            LOG.info(f"Preloaded cache for {result} recently active users")
+
+    LOG.info(f"Warm-up completed in {time.monotonic() - started:.2f}s")
@@ -0,0 +1,109 @@
+import asyncio
+import hmac
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+from sqlalchemy import text
+
+from app.db.db import get_session
+from app.db.cache import get_redis
+from app.settings.config import env
+from app.settings.log import get_logger
+from app.settings.tasks.leases import OWNER, get_job_status
+from app.workers.streams import publish_update
+from .webhooks import setup_payment_webhooks
+
+LOG = get_logger(__name__)
+
+
+async def health(request: web.Request) -> web.Response:
+    checks = {}
+
+    try:
+        async with get_session() as session:
+            await session.execute(text("SELECT 1"))
+        checks["db"] = True
+    except Exception as e:
+        LOG.warning(f"Health check: database unavailable: {e}")
+        checks["db"] = False
+
+    try:
+        redis = await get_redis()
+        checks["redis"] = bool(await redis.ping())
+    except Exception as e:
+        LOG.warning(f"Health check: redis unavailable: {e}")
+        checks["redis"] = False
+
+    healthy = all(checks.values())
+    return web.json_response(
+        {"status": "ok" if healthy else "degraded", **checks},
+        status=200 if healthy else 503
+    )
+
+
+async def jobs_health(request: web.Request) -> web.Response:
+    try:
+        return web.json_response({"owner": OWNER, "jobs": await get_job_status()})
+    except Exception as e:
+        LOG.warning(f"Health check: job status unavailable: {e}")
+        return web.json_response({"status": "degraded"}, status=503)
+
+
+async def ingress(request: web.Request) -> web.Response:
+    secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not hmac.compare_digest(secret, env.WEBHOOK_SECRET):
+        return web.Response(status=401)
+
+    try:
+        update = await request.json()
+    except ValueError:
+        return web.Response(status=400)
+
+    await publish_update(update)
+    return web.Response()
+
+
+def create_app(dp: Dispatcher, bot: Bot) -> web.Application:
+    app = web.Application()
+    app["bot"] = bot
+
+    if env.UPDATE_STREAMS:
+        app.router.add_post(env.WEBHOOK_PATH, ingress)
+    else:
+        SimpleRequestHandler(
+            dispatcher=dp,
+            bot=bot,
+            secret_token=env.WEBHOOK_SECRET,
+        ).register(app, path=env.WEBHOOK_PATH)
+    setup_payment_webhooks(app)
+    app.router.add_get("/health", health)
+    app.router.add_get("/health/jobs", jobs_health)
+
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot):
+    if not env.WEBHOOK_SECRET:
+        raise ValueError("WEBHOOK_SECRET must be configured in .env when WEBHOOK_URL is set")
+
+    app = create_app(dp, bot)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=env.WEBHOOK_HOST, port=env.WEBHOOK_PORT)
+    await site.start()
+
+    url = env.WEBHOOK_URL.rstrip("/") + env.WEBHOOK_PATH
+    await bot.set_webhook(
+        url=url,
+        secret_token=env.WEBHOOK_SECRET,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+    LOG.info(f"Webhook server listening on {env.WEBHOOK_HOST}:{env.WEBHOOK_PORT}, webhook set to {url}")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        LOG.info("Webhook server stopped")
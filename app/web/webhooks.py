@@ -0,0 +1,81 @@
+import hashlib
+import hmac
+import json
+
+from aiohttp import web
+
+from app.db.db import get_session
+from app.payments.models import PaymentMethod
+from app.payments.registry import get_gateway
+from app.settings.config import env
+from app.settings.log import get_logger
+
+LOG = get_logger(__name__)
+
+
+def _cryptobot_signature_valid(body: bytes, signature: str) -> bool:
+    if not env.CRYPTOBOT_TOKEN or not signature:
+        return False
+    secret = hashlib.sha256(env.CRYPTOBOT_TOKEN.encode()).digest()
+    expected = hmac.new(secret, body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _payment_id(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def cryptobot_webhook(request: web.Request) -> web.Response:
+    body = await request.read()
+    if not _cryptobot_signature_valid(body, request.headers.get("crypto-pay-api-signature", "")):
+        LOG.warning(f"CryptoBot webhook with invalid signature from {request.remote}")
+        return web.Response(status=401)
+
+    try:
+        update = json.loads(body)
+    except ValueError:
+        return web.Response(status=400)
+
+    if update.get("update_type") != "invoice_paid":
+        return web.Response(text="ok")
+
+    payment_id = _payment_id((update.get("payload") or {}).get("payload"))
+    if payment_id is None:
+        LOG.warning(f"CryptoBot webhook without payment id: {update.get('payload')}")
+        return web.Response(text="ok")
+
+    async with get_session() as session:
+        confirmed = await get_gateway(PaymentMethod.CRYPTOBOT).check_payment(session, payment_id)
+
+    LOG.info(f"CryptoBot webhook for payment {payment_id}: confirmed={confirmed}")
+    return web.Response(text="ok")
+
+
+async def yookassa_webhook(request: web.Request) -> web.Response:
+    try:
+        update = await request.json()
+    except ValueError:
+        return web.Response(status=400)
+
+    if update.get("event") != "payment.succeeded":
+        return web.Response(text="ok")
+
+    metadata = (update.get("object") or {}).get("metadata") or {}
+    payment_id = _payment_id(metadata.get("payment_id"))
+    if payment_id is None:
+        LOG.warning(f"YooKassa webhook without payment id: {update.get('object', {}).get('id')}")
+        return web.Response(text="ok")
+
+    async with get_session() as session:
+        confirmed = await get_gateway(PaymentMethod.YOOKASSA).check_payment(session, payment_id)
+
+    LOG.info(f"YooKassa webhook for payment {payment_id}: confirmed={confirmed}")
+    return web.Response(text="ok")
+
+
+def setup_payment_webhooks(app: web.Application):
+    app.router.add_post("/webhooks/cryptobot", cryptobot_webhook)
+    app.router.add_post("/webhooks/yookassa", yookassa_webhook)
@@ -0,0 +1,220 @@
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from redis.exceptions import ResponseError
+
+from app.db.cache import get_redis
+from app.settings.config import env
+from app.settings.log import get_logger
+from app.settings.middlewares.lanes import REJECTED
+
+LOG = get_logger(__name__)
+
+GROUP = "workers"
+
+
+def stream_key(partition: int) -> str:
+    return f"updates:{partition}"
+
+
+def update_user_id(update: dict) -> Optional[int]:
+    for value in update.values():
+        if isinstance(value, dict):
+            user = value.get("from") or value.get("user")
+            if isinstance(user, dict) and "id" in user:
+                return user["id"]
+            chat = value.get("chat")
+            if isinstance(chat, dict) and "id" in chat:
+                return chat["id"]
+    return None
+
+
+def partition_for(update: dict) -> int:
+    tg_id = update_user_id(update)
+    if tg_id is None:
+        return update.get("update_id", 0) % env.STREAM_PARTITIONS
+    return tg_id % env.STREAM_PARTITIONS
+
+
+async def publish_update(update: dict) -> str:
+    redis = await get_redis()
+    return await redis.xadd(
+        stream_key(partition_for(update)),
+        {"update": json.dumps(update, separators=(",", ":"))},
+        maxlen=env.STREAM_MAXLEN,
+        approximate=True,
+    )
+
+
+async def _publish_until_stored(update: dict):
+    delay = 1
+    while True:
+        try:
+            return await publish_update(update)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOG.error(f"Ingress cannot publish update {update.get('update_id')}, retrying in {delay}s: "
+                      f"{type(e).__name__}: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+
+async def poll_to_streams(bot: Bot, allowed_updates: List[str]):
+    offset = None
+    LOG.info(f"Ingress: polling updates into {env.STREAM_PARTITIONS} stream partitions")
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=allowed_updates)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOG.error(f"Ingress getUpdates error: {type(e).__name__}: {e}")
+            await asyncio.sleep(1)
+            continue
+
+        for update in updates:
+            # the offset only moves past updates that are safely in a stream
+            await _publish_until_stored(update.model_dump(mode="json", exclude_none=True, by_alias=True))
+            offset = update.update_id + 1
+
+
+class StreamWorker:
+    def __init__(self, dp: Dispatcher, bot: Bot, index: int, count: int, batch_size: int = 100):
+        self.dp = dp
+        self.bot = bot
+        self.consumer = f"worker-{index}"
+        self.partitions = [p for p in range(env.STREAM_PARTITIONS) if p % count == index]
+        self.batch_size = batch_size
+        self.processed = 0
+
+    async def _ensure_groups(self):
+        redis = await get_redis()
+        for partition in self.partitions:
+            try:
+                await redis.xgroup_create(stream_key(partition), GROUP, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def _feed(self, data: dict) -> bool:
+        update = Update.model_validate(data, context={"bot": self.bot})
+        return await self.dp.feed_update(self.bot, update) is not REJECTED
+
+    async def _process(self, entries: List[Tuple[str, str, dict]]):
+        done: List[Tuple[str, str]] = []
+        by_user: Dict[object, List[Tuple[str, str, dict]]] = OrderedDict()
+        for key, entry_id, fields in entries:
+            if not fields:
+                done.append((key, entry_id))
+                continue
+            data = json.loads(fields["update"])
+            by_user.setdefault(update_user_id(data) or data.get("update_id"), []).append((key, entry_id, data))
+
+        async def _run_in_order(updates: List[Tuple[str, str, dict]]):
+            for key, entry_id, data in updates:
+                try:
+                    if await self._feed(data):
+                        done.append((key, entry_id))
+                    else:
+                        LOG.warning(f"Worker {self.consumer}: update {data.get('update_id')} rejected, "
+                                    f"leaving it pending for redelivery")
+                except Exception as e:
+                    LOG.error(f"Worker {self.consumer}: update {data.get('update_id')} failed, "
+                              f"leaving it pending for redelivery: {type(e).__name__}: {e}")
+
+        await asyncio.gather(*[_run_in_order(updates) for updates in by_user.values()])
+        await self._ack(done)
+        self.processed += len(done)
+
+    async def _ack(self, entries: List[Tuple[str, str]]):
+        if not entries:
+            return
+        redis = await get_redis()
+        pipe = redis.pipeline(transaction=False)
+        for key, entry_id in entries:
+            pipe.xack(key, GROUP, entry_id)
+        await pipe.execute()
+
+    async def _read(self, streams: Dict[str, str], block: Optional[int]) -> List[Tuple[str, str, dict]]:
+        redis = await get_redis()
+        response = await redis.xreadgroup(
+            GROUP,
+            self.consumer,
+            streams,
+            count=self.batch_size,
+            block=block,
+        )
+        return [
+            (key, entry_id, fields)
+            for key, messages in response or []
+            for entry_id, fields in messages
+        ]
+
+    async def _reclaim(self) -> List[Tuple[str, str, dict]]:
+        redis = await get_redis()
+        claimed = []
+        for partition in self.partitions:
+            key = stream_key(partition)
+            _, messages, *_ = await redis.xautoclaim(
+                key, GROUP, self.consumer, min_idle_time=env.STREAM_CLAIM_IDLE_MS, count=self.batch_size
+            )
+            claimed += [(key, entry_id, fields) for entry_id, fields in messages]
+
+        claimed = await self._drop_poisoned(claimed)
+        if claimed:
+            LOG.warning(f"Worker {self.consumer}: reclaimed {len(claimed)} stale updates")
+        return claimed
+
+    async def _drop_poisoned(self, entries: List[Tuple[str, str, dict]]) -> List[Tuple[str, str, dict]]:
+        redis = await get_redis()
+        kept, dropped = [], []
+        for key, entry_id, fields in entries:
+            pending = await redis.xpending_range(key, GROUP, min=entry_id, max=entry_id, count=1)
+            if pending and pending[0]["times_delivered"] > env.STREAM_MAX_DELIVERIES:
+                dropped.append((key, entry_id))
+            else:
+                kept.append((key, entry_id, fields))
+
+        if dropped:
+            LOG.error(f"Worker {self.consumer}: dropping {len(dropped)} updates after "
+                      f"{env.STREAM_MAX_DELIVERIES} failed deliveries: {[entry_id for _, entry_id in dropped]}")
+            await self._ack(dropped)
+        return kept
+
+    async def run(self):
+        await self._ensure_groups()
+        LOG.info(f"Worker {self.consumer} consuming partitions {self.partitions}")
+
+        # walk our own pending entries once; the ones that fail again stay pending for reclaim
+        cursors = {stream_key(p): "0" for p in self.partitions}
+        while True:
+            backlog = await self._read(cursors, None)
+            if not backlog:
+                break
+            await self._process(backlog)
+            for key, entry_id, _ in backlog:
+                cursors[key] = entry_id
+
+        reclaim_every = max(1, env.STREAM_CLAIM_IDLE_MS // 5000)
+        rounds = 0
+        while True:
+            try:
+                rounds += 1
+                if rounds % reclaim_every == 0:
+                    claimed = await self._reclaim()
+                    if claimed:
+                        await self._process(claimed)
+
+                entries = await self._read({stream_key(p): ">" for p in self.partitions}, 5000)
+                if entries:
+                    await self._process(entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOG.error(f"Worker {self.consumer} loop error: {type(e).__name__}: {e}")
+                await asyncio.sleep(1)
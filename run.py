@@ -1,16 +1,14 @@
 import asyncio
-from aiogram import Dispatcher
 
-from app.routers import router
-from app.settings.locales import LocaleMiddleware
-from app.db.cache import init_cache, close_cache
 from app.settings.log import get_logger, setup_aiogram_logger
 from app.settings.tasks import tasker
-from app.db.db import close_db
-from app.db.init_db import init_database
+from app.settings.utils.warmup import warm_up
+from app.settings.config import env
+from app.web.server import run_webhook
+from app.workers.streams import poll_to_streams
 
-from app.settings.factory import create_bot
-from app.settings.middlewares import RateLimitMiddleware, cleanup_rate_limit, RepositoryMiddleware
+from app.settings.factory import create_bot, create_dispatcher, create_rate_limiter, startup, shutdown
+from app.settings.middlewares import cleanup_rate_limit
 
 LOG = get_logger(__name__)
 
@@ -19,34 +17,10 @@ bot = create_bot()
 async def main():
     setup_aiogram_logger()
 
-    await init_database()
-    await init_cache()
+    await startup(bot)
 
-    dp = Dispatcher()
-    dp.include_router(router)
-
-    dp.message.middleware(LocaleMiddleware())
-    dp.callback_query.middleware(LocaleMiddleware())
-
-    dp.message.middleware(RepositoryMiddleware())
-    dp.callback_query.middleware(RepositoryMiddleware())
-
-    limiter = RateLimitMiddleware(
-        default_limit=0.8,
-        custom_limits={
-            '/start': 1,
-            'add_funds': 1.0,
-            'pm_ton': 5.0,
-            'pm_stars': 5.0,
-            'buy_sub': 2.0,
-            'sub_1m': 2.0,
-            'sub_3m': 2.0,
-            'sub_6m': 2.0,
-            'sub_12m': 2.0,
-        },
-    )
-    dp.message.middleware(limiter)
-    dp.callback_query.middleware(limiter)
+    limiter = create_rate_limiter()
+    dp = create_dispatcher(limiter)
 
     rate_limit_cleanup_task = asyncio.create_task(
         cleanup_rate_limit(limiter, interval=3600, max_age=3600)
@@ -54,10 +28,19 @@ async def main():
 
     await tasker.start(bot)
 
+    await warm_up(bot)
+
     LOG.info("Bot started...")
 
     try:
-        await dp.start_polling(bot)
+        if env.WEBHOOK_URL:
+            await run_webhook(dp, bot)
+        elif env.UPDATE_STREAMS:
+            await bot.delete_webhook()
+            await poll_to_streams(bot, dp.resolve_used_update_types())
+        else:
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
     finally:
         rate_limit_cleanup_task.cancel()
 
@@ -67,11 +50,9 @@ async def main():
             pass
         
         await tasker.stop()
-        await bot.session.close()
-        await close_db()
-        await close_cache()
+        await shutdown(bot)
         LOG.info("Bot stopped cleanly")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import Update
+
+from app.keys.callbacks import Cb, _spec
+from app.routers.dispatch import CallbackTable
+
+ITERATIONS = 2000
+
+
+async def handler(callback):
+    return True
+
+
+def filter_dispatcher(routers: int) -> Dispatcher:
+    dp = Dispatcher()
+    for i in range(routers):
+        router = Router()
+        router.callback_query.register(handler, F.data.startswith(f"action{i}_"))
+        dp.include_router(router)
+    router = Router()
+    router.callback_query.register(handler, F.data.startswith("payment_sent_"))
+    dp.include_router(router)
+    return dp
+
+
+def table_dispatcher(routers: int) -> Dispatcher:
+    table = CallbackTable()
+    for i in range(routers):
+        table.on(_spec(f"action{i}_{routers}", ("id", int)))(handler)
+    table.on(Cb.PAYMENT_SENT)(handler)
+
+    dp = Dispatcher()
+    dp.include_router(table.router)
+    return dp
+
+
+async def measure(dp: Dispatcher, bot: Bot, data: str) -> float:
+    update = Update.model_validate({
+        "update_id": 1,
+        "callback_query": {
+            "id": "1",
+            "from": {"id": 1, "is_bot": False, "first_name": "bench"},
+            "chat_instance": "bench",
+            "data": data,
+        },
+    })
+
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / ITERATIONS * 1e6
+
+
+async def main():
+    bot = Bot("1:bench")
+    for routers in (5, 20, 80):
+        filters = await measure(filter_dispatcher(routers), bot, "payment_sent_42")
+        table = await measure(table_dispatcher(routers), bot, Cb.PAYMENT_SENT.pack(42))
+        print(f"{routers:>3} routers: filters {filters:7.1f} us/update, table {table:7.1f} us/update")
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+import asyncio
+import os
+
+import pytest
+
+for key, value in {
+    "BOT_TOKEN": "123:test",
+    "ADMIN_TG_IDS": "[1]",
+    "SUPPORT_USER": "support",
+    "DATABASE_USER": "test",
+    "DATABASE_PASSWORD": "test",
+    "DATABASE_NAME": "test",
+    "PANEL_HOST": "http://panel/",
+    "PANEL_USERNAME": "test",
+    "PANEL_PASSWORD": "test",
+    "TON_ADDRESS": "test",
+    "TONAPI_KEY": "test",
+    "CRYPTOBOT_TOKEN": "test",
+    "YOOKASSA_ID": "1",
+    "YOOKASSA_KEY": "test",
+    "YOOKASSA_ID_T": "1",
+    "YOOKASSA_KEY_T": "test",
+    "REFERRAL_BONUS": "50",
+    "IS_LOGGING": "false",
+}.items():
+    os.environ.setdefault(key, value)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+_redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    from app.db import cache
+
+    run(_redis.flushall())
+    monkeypatch.setattr(cache, "redis_client", _redis)
+    return _redis
+
+
+class FakeResult:
+    def __init__(self, rows=None, rowcount=0):
+        self.rows = rows or []
+        self.rowcount = rowcount
+
+    def all(self):
+        return self.rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+    def scalars(self):
+        return self
+
+
+class FakeSession:
+    """Replays queued results and records executed statements."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.added = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        result = self.results.pop(0) if self.results else []
+        return result if isinstance(result, FakeResult) else FakeResult(result)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
@@ -0,0 +1,67 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db.bans import BANS_CHANNEL, BANS_KEY, BANS_READY_KEY
+from app.settings.utils import bans
+from conftest import FakeSession, run
+
+
+@pytest.fixture
+def ban_table(monkeypatch):
+    table = {"ids": [], "loads": 0}
+
+    @asynccontextmanager
+    async def get_session():
+        table["loads"] += 1
+        yield FakeSession([(tg_id,) for tg_id in table["ids"]])
+
+    monkeypatch.setattr(bans, "get_session", get_session)
+    monkeypatch.setattr(bans, "_listener_task", None)
+    bans._rebuild([])
+    return table
+
+
+def test_empty_ban_table_is_loaded_once(redis, ban_table):
+    run(bans.reload_bans())
+    run(bans.reload_bans())
+
+    assert ban_table["loads"] == 1
+    assert run(redis.exists(BANS_READY_KEY)) and not run(redis.exists(BANS_KEY))
+    assert not bans.might_be_banned(42)
+
+
+def test_reload_event_refreshes_only_the_local_filter(redis, ban_table):
+    run(bans.reload_bans())
+    run(redis.sadd(BANS_KEY, 42))
+
+    run(bans._handle_event("reload"))
+
+    assert ban_table["loads"] == 1
+    assert run(bans.is_banned(42))
+
+
+def test_listener_does_not_feed_back_on_an_empty_table(redis, ban_table):
+    async def scenario():
+        await bans.init_bans()
+        await asyncio.sleep(0.3)
+        await redis.publish(BANS_CHANNEL, "reload")
+        await asyncio.sleep(0.3)
+        await bans.close_bans()
+
+    run(scenario())
+
+    assert ban_table["loads"] == 1
+
+
+def test_ban_and_unban_events_update_the_filter(redis, ban_table):
+    ban_table["ids"] = [7]
+    run(bans.reload_bans())
+    assert run(bans.is_banned(7))
+
+    run(bans._handle_event("ban:8"))
+    run(bans._handle_event("unban:7"))
+
+    assert run(bans.is_banned(8))
+    assert not run(bans.is_banned(7))
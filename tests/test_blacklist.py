@@ -0,0 +1,26 @@
+from app.settings.middlewares.blacklist import BlacklistMiddleware
+
+
+def test_sliding_window_ignores_bursts_spread_over_window_edges():
+    middleware = BlacklistMiddleware(flood_threshold=5, flood_window=10)
+
+    hits = [middleware._is_flooding(1, t) for t in (0, 1, 2, 3, 10.5, 11, 12, 13)]
+
+    assert not any(hits)
+
+
+def test_sliding_window_catches_a_burst_that_straddles_windows():
+    middleware = BlacklistMiddleware(flood_threshold=5, flood_window=10)
+
+    hits = [middleware._is_flooding(1, t) for t in (9, 9.5, 10.1, 10.5, 11)]
+
+    assert hits[-1]
+
+
+def test_first_flood_ban_is_short_and_repeats_escalate():
+    middleware = BlacklistMiddleware(flood_ban_minutes=1, max_flood_ban_minutes=60, strike_memory=3600)
+
+    first = [middleware._ban_minutes(1, t) for t in (0, 100, 200, 300, 400, 500, 600, 700)]
+
+    assert first == [1, 2, 4, 8, 16, 32, 60, 60]
+    assert middleware._ban_minutes(1, 700 + 3600) == 1
@@ -0,0 +1,64 @@
+import pytest
+
+from app.keys import keyboards
+from app.keys.callbacks import Cb, decode
+from app.routers.dispatch import callbacks
+from app.settings.locales import get_translator
+
+t = get_translator("en")
+
+KEYBOARDS = [
+    keyboards.qr_delete_kb(t),
+    keyboards._main_kb(t, False),
+    keyboards.balance_kb(t, show_renew=True),
+    keyboards.balance_button_kb(t),
+    keyboards.renewal_notification_kb(t),
+    keyboards.set_kb(t),
+    keyboards.myvpn_kb(t, [], has_active_sub=True),
+    keyboards.myvpn_kb(t, [], has_active_sub=False),
+    keyboards.myvpn_kb(t, [{"id": 7, "name": "phone"}], has_active_sub=True),
+    keyboards.actions_kb(t, 7),
+    keyboards.language_kb(t),
+    keyboards.sub_kb(t),
+    keyboards.sub_kb(t, is_extension=True),
+    keyboards.payment_methods_kb(t),
+    keyboards.referral_kb(t, "https://t.me/bot?start=ref_1"),
+    keyboards.back_balance(t),
+    keyboards.payment_amounts_kb(t, "ton"),
+    keyboards.payment_success_actions(t, True),
+    keyboards.payment_success_actions(t, False),
+]
+
+
+def _callback_data():
+    for markup in KEYBOARDS:
+        for row in markup.inline_keyboard:
+            for button in row:
+                if button.callback_data is not None:
+                    yield button.callback_data
+
+
+@pytest.mark.parametrize("data", sorted(set(_callback_data())))
+def test_every_keyboard_button_decodes_to_a_handled_callback(data):
+    decoded = decode(data)
+
+    assert decoded is not None
+    assert decoded[0].prefix in callbacks._routes
+
+
+def test_pack_and_decode_round_trip():
+    spec, values = decode(Cb.AMOUNT.pack("ton", 500))
+
+    assert spec is Cb.AMOUNT and values == {"method": "ton", "amount": 500}
+
+
+def test_unknown_plan_has_no_callback():
+    with pytest.raises(ValueError):
+        Cb.plan("sub_24m")
+
+
+def test_admin_button_uses_admin_panel_spec():
+    markup = keyboards._main_kb(t, True)
+    data = [b.callback_data for row in markup.inline_keyboard for b in row if b.callback_data]
+
+    assert decode(data[-1])[0] is Cb.ADMIN_PANEL
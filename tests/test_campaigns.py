@@ -0,0 +1,56 @@
+from app.settings.utils.campaigns import Recipient, _day, run_campaign
+from app.settings.utils.throttling import TokenBucket
+from conftest import run
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        self.sent.append((chat_id, text))
+
+
+def _pages(recipients):
+    async def fetch_page(after_tg_id, limit):
+        return [r for r in recipients if r.tg_id > after_tg_id][:limit]
+
+    return fetch_page
+
+
+def _render(lang, variant):
+    return f"{lang}:{variant}", None
+
+
+def test_campaign_renders_each_variant_once_and_sends_to_everyone(redis):
+    bot = FakeBot()
+    recipients = [Recipient(tg_id=i, lang="ru" if i % 2 else "en", variant=None) for i in range(1, 8)]
+
+    stats = run(run_campaign(bot, "test", _pages(recipients), _render, TokenBucket(1000), page_size=3))
+
+    assert stats.sent == 7
+    assert sorted(chat_id for chat_id, _ in bot.sent) == list(range(1, 8))
+    assert stats.rendered == {("ru", None): 4, ("en", None): 3}
+
+
+def test_delivered_recipients_are_skipped_on_the_next_run(redis):
+    bot = FakeBot()
+    recipients = [Recipient(tg_id=i, lang="en", variant=None) for i in (10, 20)]
+    run(run_campaign(bot, "test", _pages(recipients), _render, TokenBucket(1000)))
+
+    recipients.append(Recipient(tg_id=30, lang="en", variant=None))
+    stats = run(run_campaign(bot, "test", _pages(recipients), _render, TokenBucket(1000)))
+
+    assert stats.sent == 1 and stats.skipped == 2
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [10, 20, 30]
+
+
+def test_checkpoint_off_ignores_a_stale_cursor(redis):
+    bot = FakeBot()
+    run(redis.set(f"campaign:test:{_day()}:cursor", "100"))
+    recipients = [Recipient(tg_id=5, lang="en", variant=None)]
+
+    stats = run(run_campaign(bot, "test", _pages(recipients), _render, TokenBucket(1000), checkpoint=False))
+
+    assert stats.sent == 1
+    assert run(redis.get(f"campaign:test:{_day()}:cursor")) == "100"
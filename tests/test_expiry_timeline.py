@@ -0,0 +1,164 @@
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.db import timeline
+from app.settings.config import env
+from app.settings.tasks.types import expiry_timeline
+from conftest import FakeSession, run
+
+DAY = 86400
+
+
+class FakeBot:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        if chat_id in self.failing:
+            raise ConnectionError("send failed")
+        self.sent.append((chat_id, text))
+
+
+def _user(tg_id, end_ts):
+    return SimpleNamespace(
+        tg_id=tg_id, lang="en", balance=0, subscription_end=datetime.fromtimestamp(end_ts),
+    )
+
+
+class Rows(dict):
+    sessions = None
+
+
+@pytest.fixture
+def users(monkeypatch, redis):
+    rows = Rows()
+
+    sessions = []
+
+    @asynccontextmanager
+    async def get_session():
+        sessions.append(FakeSession(list(rows.values())))
+        yield sessions[-1]
+
+    rows.sessions = sessions
+    monkeypatch.setattr(expiry_timeline, "get_session", get_session)
+    monkeypatch.setattr(env, "CAMPAIGN_JITTER_MS", 0)
+    return rows
+
+
+def _scheduled(redis):
+    return dict(run(redis.zrange(timeline.TIMELINE_KEY, 0, -1, withscores=True)))
+
+
+def test_schedule_expiry_adds_every_live_milestone(redis):
+    end_ts = time.time() + 10 * DAY
+
+    run(timeline.schedule_expiry(7, end_ts))
+
+    assert _scheduled(redis) == {
+        "3d:7": end_ts - 3 * DAY,
+        "1d:7": end_ts - DAY,
+        "renew:7": end_ts - 6 * 3600,
+        "expired:7": end_ts,
+        "cleanup:7": end_ts + timeline.CLEANUP_AFTER_DAYS * DAY,
+    }
+
+
+def test_renewal_runs_hours_after_the_last_day_reminder():
+    end_ts = time.time() + 10 * DAY
+
+    assert timeline.due_at(timeline.RENEWAL, end_ts) - timeline.due_at(timeline.NOTIFY_1D, end_ts) == 18 * 3600
+
+
+def test_stale_milestones_are_not_scheduled(redis):
+    end_ts = time.time() + 12 * 3600
+
+    run(timeline.schedule_expiry(7, end_ts))
+
+    assert set(_scheduled(redis)) == {"1d:7", "renew:7", "expired:7", "cleanup:7"}
+    assert timeline.is_stale(timeline.NOTIFY_3D, end_ts, time.time())
+
+
+def test_pop_due_returns_and_removes_only_due_items(redis):
+    now = time.time()
+    run(timeline.reschedule("1d", 1, now - 10))
+    run(timeline.reschedule("expired", 2, now + 100))
+
+    assert run(timeline.pop_due(now=now)) == [("1d", 1)]
+    assert run(timeline.pop_due(now=now)) == []
+    assert set(_scheduled(redis)) == {"expired:2"}
+
+
+def test_claim_fires_a_milestone_once_per_subscription_end(redis):
+    now = time.time()
+    user = _user(1, now + DAY - 60)
+
+    assert run(expiry_timeline._claim(redis, "1d", 1, user, now))
+    assert run(expiry_timeline._claim(redis, "1d", 1, user, now)) is None
+
+    renewed = _user(1, now + DAY - 30)
+    assert run(expiry_timeline._claim(redis, "1d", 1, renewed, now + 30))
+
+
+def test_claim_reschedules_an_extended_subscription(redis):
+    now = time.time()
+    user = _user(1, now + 5 * DAY)
+
+    assert run(expiry_timeline._claim(redis, "1d", 1, user, now)) is None
+    assert _scheduled(redis) == {"1d:1": user.subscription_end.timestamp() - DAY}
+
+
+def test_claim_skips_stale_milestones(redis):
+    now = time.time()
+    user = _user(1, now - 3 * DAY)
+
+    assert run(expiry_timeline._claim(redis, "expired", 1, user, now)) is None
+    assert _scheduled(redis) == {}
+
+
+def test_due_reminder_is_sent_through_the_campaign_sender_once(users, redis):
+    end_ts = time.time() + DAY - 60
+    users[1] = _user(1, end_ts)
+    run(timeline.schedule_expiry(1, end_ts))
+    bot = FakeBot()
+
+    assert run(expiry_timeline.process_expiry_timeline(bot)) == 1
+
+    assert [chat_id for chat_id, _ in bot.sent] == [1]
+    assert "1d:1" not in _scheduled(redis)
+
+    run(timeline.reschedule("1d", 1, time.time() - 1))
+    assert run(expiry_timeline.process_expiry_timeline(bot)) == 0
+    assert len(bot.sent) == 1
+
+
+def test_recipients_that_fail_individually_are_retried(users, redis):
+    end_ts = time.time() + DAY - 60
+    for tg_id in (1, 2):
+        users[tg_id] = _user(tg_id, end_ts)
+        run(timeline.schedule_expiry(tg_id, end_ts))
+    bot = FakeBot(failing={2})
+
+    assert run(expiry_timeline.process_expiry_timeline(bot)) == 1
+
+    retry_at = _scheduled(redis)["1d:2"]
+    assert time.time() < retry_at <= time.time() + expiry_timeline.RETRY_SECONDS
+    assert "1d:1" not in _scheduled(redis)
+
+    bot.failing.clear()
+    run(timeline.reschedule("1d", 2, time.time() - 1))
+    assert run(expiry_timeline.process_expiry_timeline(bot)) == 1
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2]
+
+
+def test_rebuild_compares_subscription_end_in_utc(users):
+    run(expiry_timeline.rebuild_expiry_timeline())
+
+    since = users.sessions[0].statements[0].compile().params["subscription_end_1"]
+    expected = datetime.utcnow() - timedelta(days=timeline.CLEANUP_AFTER_DAYS + 1)
+    assert abs((since - expected).total_seconds()) < 5
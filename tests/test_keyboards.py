@@ -0,0 +1,42 @@
+import pytest
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.types import InlineKeyboardButton
+from pydantic import ValidationError
+
+from app.keys import screens
+from app.keys.keyboards import balance_kb
+from app.settings.locales import get_translator
+
+
+def test_cached_markups_are_shared_and_frozen():
+    t = get_translator("en")
+    markup = balance_kb(t)
+
+    assert balance_kb(t) is markup
+    with pytest.raises(TypeError):
+        markup.inline_keyboard.append([InlineKeyboardButton(text="x", callback_data="x")])
+    with pytest.raises(TypeError):
+        markup.inline_keyboard[0].clear()
+    with pytest.raises(ValidationError):
+        markup.inline_keyboard[0][0].text = "changed"
+
+
+def test_cached_screens_carry_frozen_markups():
+    t = get_translator("en")
+    _, markup = screens.settings_screen(t)
+
+    assert screens.settings_screen(t)[1] is markup
+    with pytest.raises(TypeError):
+        markup.inline_keyboard.clear()
+
+
+def test_frozen_markups_serialize_like_plain_ones():
+    t = get_translator("en")
+    frozen = balance_kb(t)
+    plain = balance_kb.__wrapped__(t)
+    session = AiohttpSession()
+    bot = Bot("123:test")
+
+    assert session.prepare_value(frozen, bot=bot, files={}) == session.prepare_value(plain, bot=bot, files={})
+    assert frozen.model_copy(deep=True).model_dump() == plain.model_dump()
@@ -0,0 +1,89 @@
+import asyncio
+
+from aiogram.types import Update
+
+from app.settings.middlewares.lanes import (
+    LaneMiddleware, NAVIGATION, PAYMENTS, PROVISIONING, classify_update,
+)
+from conftest import run
+
+USER = {"id": 1, "is_bot": False, "first_name": "test"}
+CHAT = {"id": 1, "type": "private"}
+
+
+def _callback(data: str, update_id: int = 1) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "callback_query": {"id": str(update_id), "from": USER, "chat_instance": "test", "data": data},
+    })
+
+
+def _successful_payment() -> Update:
+    return Update.model_validate({
+        "update_id": 1,
+        "message": {
+            "message_id": 1, "date": 0, "chat": CHAT, "from": USER,
+            "successful_payment": {
+                "currency": "XTR", "total_amount": 100, "invoice_payload": "1",
+                "telegram_payment_charge_id": "a", "provider_payment_charge_id": "b",
+            },
+        },
+    })
+
+
+def test_updates_are_classified_into_lanes():
+    assert classify_update(_successful_payment()) == PAYMENTS
+    assert classify_update(_callback("sub_1m")) == PROVISIONING
+    assert classify_update(_callback("dcfg:5")) == PROVISIONING
+    assert classify_update(_callback("balance")) == NAVIGATION
+
+
+def test_saturated_lane_rejects_new_updates():
+    lanes = LaneMiddleware(navigation_concurrency=1, max_queue=1)
+    handled = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def handler(event, data):
+            await gate.wait()
+            handled.append(event.update_id)
+
+        first = asyncio.create_task(lanes(handler, _callback("balance", 1), {}))
+        queued = asyncio.create_task(lanes(handler, _callback("balance", 2), {}))
+        await asyncio.sleep(0)
+        await lanes(handler, _callback("balance", 3), {})
+        gate.set()
+        await asyncio.gather(first, queued)
+
+    run(scenario())
+
+    metrics = lanes.get_metrics()[NAVIGATION]
+    assert handled == [1, 2]
+    assert metrics["rejected"] == 1 and metrics["processed"] == 2
+
+
+def test_payments_run_while_navigation_is_saturated():
+    lanes = LaneMiddleware(navigation_concurrency=1, max_queue=100)
+    order = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def navigation(event, data):
+            await gate.wait()
+            order.append(data["lane"])
+
+        async def payment(event, data):
+            order.append(data["lane"])
+
+        blocked = [asyncio.create_task(lanes(navigation, _callback("balance", i), {})) for i in range(5)]
+        await asyncio.sleep(0)
+        await asyncio.wait_for(lanes(payment, _successful_payment(), {}), 1)
+        gate.set()
+        await asyncio.gather(*blocked)
+
+    run(scenario())
+
+    assert order[0] == PAYMENTS
+    assert order[1:] == [NAVIGATION] * 5
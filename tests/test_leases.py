@@ -0,0 +1,89 @@
+import asyncio
+
+from app.db import timeline
+from app.settings.tasks import leases
+from conftest import run
+
+
+def test_concurrent_runs_execute_the_job_once(redis):
+    calls = []
+
+    async def job():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+
+    wrapped = leases.leased("test:concurrent", job)
+
+    async def scenario():
+        await asyncio.gather(wrapped(), wrapped())
+
+    run(scenario())
+
+    assert calls == [1]
+    assert run(redis.get("jobs:lease:test:concurrent")) is None
+
+
+def test_fencing_token_grows_with_every_run(redis):
+    tokens = []
+
+    async def job():
+        tokens.append(leases._current.get().token)
+
+    wrapped = leases.leased("test:fence", job)
+    run(wrapped())
+    run(wrapped())
+
+    assert tokens[1] > tokens[0]
+
+
+def test_recent_run_elsewhere_is_skipped(redis):
+    calls = []
+
+    async def job():
+        calls.append(1)
+
+    wrapped = leases.leased("test:interval", job, min_interval=60)
+    run(wrapped())
+    run(wrapped())
+
+    assert calls == [1]
+
+
+def test_fenced_pop_stops_once_the_lease_is_stolen(redis):
+    popped = []
+
+    async def job():
+        await timeline.reschedule("1d", 1, 0)
+        await timeline.reschedule("1d", 2, 0)
+        popped.append(await timeline.pop_due(1, fence=leases.current_fence()))
+        await redis.set("jobs:lease:test:stolen", "other:99")
+        popped.append(await timeline.pop_due(1, fence=leases.current_fence()))
+
+    run(leases.leased("test:stolen", job)())
+
+    assert popped == [[("1d", 1)], None]
+    assert run(redis.zrange(timeline.TIMELINE_KEY, 0, -1)) == ["1d:2"]
+    assert leases.current_fence() is None
+
+
+def test_stale_run_cannot_overwrite_a_newer_status(redis):
+    run(redis.hset("jobs:status:test:stale", mapping={"token": 5, "result": "ok"}))
+
+    written = run(leases._write_status(leases.JobLease("test:stale", "owner:4"), result="error"))
+
+    assert not written
+    assert run(redis.hget("jobs:status:test:stale", "result")) == "ok"
+
+
+def test_job_status_reports_the_last_run(redis):
+    async def job():
+        raise RuntimeError("boom")
+
+    run(leases.leased("test:status", job)())
+
+    status = next(s for s in run(leases.get_job_status()) if s["job"] == "test:status")
+    assert status["holder"] is None
+    assert status["last_owner"] == leases.OWNER
+    assert status["last_result"] == "error"
+    assert status["last_token"] >= 1
+    assert status["seconds_since_run"] == 0
@@ -0,0 +1,60 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from app.settings.locales import get_translator, locales
+from app.settings.locales.locales import LANGUAGES, _compile
+
+APP = Path(__file__).resolve().parent.parent / "app"
+
+
+def _translator_calls():
+    for path in APP.rglob("*.py"):
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Name)
+                and node.func.id == "t"
+                and node.args
+                and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)
+                and all(kw.arg is not None for kw in node.keywords)
+            ):
+                yield f"{path.relative_to(APP)}:{node.lineno}", node.args[0].value, {kw.arg for kw in node.keywords}
+
+
+CALLS = list(_translator_calls())
+
+
+def test_the_scan_finds_translator_calls():
+    assert len(CALLS) > 50
+
+
+@pytest.mark.parametrize("lang", LANGUAGES)
+def test_every_call_passes_exactly_the_template_placeholders(lang):
+    t = get_translator(lang)
+    mismatches = []
+    for where, key, kwargs in CALLS:
+        entry = t._templates.get(key)
+        fields = entry[1] if entry else set()
+        if key in t._constants or entry:
+            if set(fields) != kwargs:
+                mismatches.append(f"{where} {key}: passes {sorted(kwargs)}, template uses {sorted(fields)}")
+
+    assert mismatches == []
+
+
+def test_compiled_templates_match_str_format():
+    template = "Paid {amount:.2f} ({amount!r}) for {days} days, {{literal}}"
+
+    assert _compile(template)(amount=1.5, days=3) == template.format(amount=1.5, days=3)
+
+
+def test_missing_argument_is_reported_not_silently_formatted(monkeypatch):
+    errors = []
+    monkeypatch.setattr(locales.LOG, "error", errors.append)
+    t = get_translator("en")
+
+    assert t("payment_success") == t._templates["payment_success"][0]
+    assert errors and errors[0].startswith("Cannot format en:payment_success")
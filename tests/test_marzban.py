@@ -0,0 +1,66 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from aiomarzban.exceptions import MarzbanException
+
+from app.api import marzban
+from conftest import run
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return str(self.body)
+
+
+def _api(monkeypatch, responses):
+    calls = []
+    held = []
+
+    @asynccontextmanager
+    async def request(method, url, **kwargs):
+        calls.append((url, kwargs))
+        held.append(url)
+        try:
+            yield responses.pop(0)
+        finally:
+            held.remove(url)
+
+    api = marzban.PooledMarzbanAPI(address="http://panel/", username="u", password="p")
+    api.headers = {"Authorization": "Bearer old"}
+
+    async def refresh_credentials():
+        assert not held, "credentials refreshed while holding a request slot"
+        api.headers = {"Authorization": "Bearer new"}
+
+    monkeypatch.setattr(marzban.http_client, "request", request)
+    monkeypatch.setattr(api, "refresh_credentials", refresh_credentials)
+    return api, calls
+
+
+def test_expired_token_is_refreshed_outside_the_slot_and_retried(monkeypatch):
+    expired = FakeResponse(401, {"detail": "Could not validate credentials"})
+    api, calls = _api(monkeypatch, [expired, FakeResponse(200, {"ok": True})])
+
+    result = run(api._async_request("GET", "/users", params={"offset": 5}, not_json_data={"a": 1}))
+
+    assert result == {"ok": True}
+    (_, first), (_, retry) = calls
+    assert retry["params"] == first["params"] == {"offset": 5}
+    assert retry["data"] == {"a": 1}
+    assert retry["headers"] == {"Authorization": "Bearer new"}
+
+
+def test_expired_token_is_retried_only_once(monkeypatch):
+    expired = FakeResponse(401, {"detail": "Could not validate credentials"})
+    api, calls = _api(monkeypatch, [expired, expired])
+
+    with pytest.raises(MarzbanException):
+        run(api._async_request("GET", "/users"))
+    assert len(calls) == 2
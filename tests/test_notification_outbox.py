@@ -0,0 +1,107 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+from sqlalchemy.dialects import postgresql
+
+from app.db.outbox import OutboxRepository
+from app.models.db import NotificationOutbox
+from app.settings.tasks.types import notification_outbox
+from conftest import FakeSession, run
+
+
+def _item(item_id, tg_id, kind="sub_expiry"):
+    return NotificationOutbox(
+        id=item_id, tg_id=tg_id, kind=kind, lang="en", payload={"days": 3},
+        status="pending", attempts=0, next_attempt_at=datetime.utcnow(),
+    )
+
+
+class FakeBot:
+    def __init__(self, errors=None, session=None):
+        self.errors = errors or {}
+        self.session = session
+        self.sent = []
+        self.commits_at_send = []
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        if self.session is not None:
+            self.commits_at_send.append(self.session.commits)
+        if chat_id in self.errors:
+            raise self.errors[chat_id]
+        self.sent.append(chat_id)
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    sessions = []
+
+    def load(*items):
+        sessions.append(FakeSession(list(items)))
+
+        @asynccontextmanager
+        async def get_session():
+            yield sessions[-1]
+
+        monkeypatch.setattr(notification_outbox, "get_session", get_session)
+        return sessions[-1]
+
+    return load
+
+
+def test_claim_is_committed_before_sending(outbox):
+    items = [_item(1, 10), _item(2, 20)]
+    session = outbox(*items)
+    bot = FakeBot(session=session)
+
+    run(notification_outbox.dispatch_notifications(bot, batch_size=10))
+
+    assert "FOR UPDATE SKIP LOCKED" in str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert bot.commits_at_send == [1, 1]
+    assert session.commits == 2
+
+
+def test_claimed_items_are_marked_in_flight():
+    items = [_item(1, 10)]
+
+    claimed = run(OutboxRepository(FakeSession(items)).claim_due(10, inflight_seconds=600))
+
+    assert claimed[0].status == "sending"
+    assert (claimed[0].next_attempt_at - datetime.utcnow()).total_seconds() > 590
+
+
+def test_delivered_and_failed_items_are_settled(outbox):
+    items = [_item(1, 10), _item(2, 20), _item(3, 30, kind="unknown")]
+    outbox(*items)
+    bot = FakeBot({20: TelegramForbiddenError(SendMessage(chat_id=20, text=""), "blocked")})
+
+    assert run(notification_outbox.dispatch_notifications(bot, batch_size=10)) == 1
+
+    assert bot.sent == [10]
+    assert [item.status for item in items] == ["sent", "failed", "failed"]
+    assert items[1].last_error == "forbidden"
+
+
+def test_flood_control_postpones_the_rest_of_the_batch(outbox):
+    items = [_item(1, 10), _item(2, 20), _item(3, 30)]
+    outbox(*items)
+    bot = FakeBot({10: TelegramRetryAfter(SendMessage(chat_id=10, text=""), "flood", retry_after=30)})
+
+    assert run(notification_outbox.dispatch_notifications(bot, batch_size=3)) == 0
+
+    assert bot.sent == []
+    assert all(item.status == "pending" and item.attempts == 0 for item in items)
+    assert all((item.next_attempt_at - datetime.utcnow()).total_seconds() > 25 for item in items)
+
+
+def test_transient_errors_back_off_and_retry(outbox):
+    item = _item(1, 10)
+    outbox(item)
+
+    run(notification_outbox.dispatch_notifications(FakeBot({10: ConnectionError("reset")}), batch_size=10))
+
+    assert item.status == "pending" and item.attempts == 1
+    assert item.last_error == "ConnectionError: reset"
+    assert (item.next_attempt_at - datetime.utcnow()).total_seconds() > 5
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable
+
+from app.db import init_db
+from app.db.payments import PaymentRepository
+from app.models.db import Payment
+from app.payments.types.cryptobot import CryptoBotGateway
+from conftest import FakeSession, run
+
+
+class FakeCryptoPay:
+    def __init__(self, paid_ids):
+        self.paid_ids = paid_ids
+        self.calls = []
+
+    async def get_invoices(self, invoice_ids, count):
+        self.calls.append((len(invoice_ids), count))
+        return [
+            SimpleNamespace(invoice_id=i, status='paid' if i in self.paid_ids else 'active')
+            for i in invoice_ids
+        ]
+
+
+def test_cryptobot_checks_every_pending_invoice_in_chunks():
+    gateway = CryptoBotGateway()
+    gateway._cryptopay = FakeCryptoPay(paid_ids={5, 150, 250})
+    confirmed = {}
+
+    async def confirm_paid(session, paid, allow_expired=True):
+        confirmed.update(paid)
+        return list(paid)
+
+    gateway._confirm_paid = confirm_paid
+    payments = [
+        {'id': 1000 + i, 'status': 'pending', 'extra_data': {'invoice_id': i}}
+        for i in range(1, 251)
+    ]
+
+    assert run(gateway.check_pending_payments(None, payments)) == 3
+    assert gateway._cryptopay.calls == [(100, 100), (100, 100), (50, 50)]
+    assert confirmed == {1005: 'cryptobot_5', 1150: 'cryptobot_150', 1250: 'cryptobot_250'}
+
+
+def test_duplicate_external_id_only_skips_the_conflicting_payment(redis, monkeypatch):
+    session = FakeSession()
+    batches = []
+
+    async def confirm_batch(paid, allow_expired, notify):
+        batches.append(sorted(paid))
+        if len(paid) > 1 or 2 in paid:
+            raise IntegrityError("UPDATE payments", {}, Exception("duplicate tx_hash"))
+        return [SimpleNamespace(payment_id=p, tg_id=p, amount=1, balance=1, tx_hash=h) for p, h in paid.items()]
+
+    repo = PaymentRepository(session, redis)
+    monkeypatch.setattr(repo, "_confirm_batch", confirm_batch)
+
+    confirmed = run(repo.confirm_payments({1: 'a', 2: 'b', 3: 'c'}))
+
+    assert [c.payment_id for c in confirmed] == [1, 3]
+    assert batches == [[1, 2, 3], [1], [2], [3]]
+    assert session.rollbacks == 2
+
+
+class FakeConnection:
+    def __init__(self, index_exists, duplicates=0):
+        self.index_exists = index_exists
+        self.duplicates = duplicates
+        self.statements = []
+
+    async def scalar(self, statement):
+        return self.index_exists
+
+    async def execute(self, statement):
+        self.statements.append(str(statement).strip())
+        return SimpleNamespace(rowcount=self.duplicates)
+
+
+def test_duplicate_tx_hashes_are_renamed_before_the_unique_index():
+    conn = FakeConnection(index_exists=False, duplicates=2)
+
+    run(init_db._ensure_unique_tx_hash(conn))
+
+    assert conn.statements[0].startswith("UPDATE payments p")
+    assert "':dup:'" in conn.statements[0]
+    assert conn.statements[1].startswith("CREATE UNIQUE INDEX IF NOT EXISTS uq_payments_tx_hash")
+
+
+def test_existing_unique_index_skips_the_dedupe():
+    conn = FakeConnection(index_exists=True)
+
+    run(init_db._ensure_unique_tx_hash(conn))
+
+    assert conn.statements == ["ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_tx_hash_key"]
+
+
+def test_model_leaves_tx_hash_uniqueness_to_the_named_index():
+    ddl = str(CreateTable(Payment.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "UNIQUE" not in ddl
+    assert not any(index.unique for index in Payment.__table__.indexes)
@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+import pytest
+
+from app.payments import manager
+from app.payments.models import PaymentMethod, PaymentResult
+from conftest import run
+
+
+class StubRepo:
+    def __init__(self, finalized):
+        self.finalized = finalized
+        self.revived = []
+
+    async def reserve_payment(self, **kwargs):
+        return 5, []
+
+    async def finalize_payment(self, payment_id, extra_data):
+        return self.finalized
+
+    async def revive_reservation(self, payment_id, extra_data):
+        self.revived.append((payment_id, extra_data))
+        return True
+
+
+class StubGateway:
+    def __init__(self, discarded):
+        self.discarded = discarded
+        self.discard_calls = []
+
+    async def create_payment(self, session, t, **kwargs):
+        return PaymentResult(
+            payment_id=kwargs["payment_id"], method=PaymentMethod.CRYPTOBOT, amount=kwargs["amount"],
+            text="", extra_data={"invoice_id": 42},
+        )
+
+    async def discard_payment(self, extra_data):
+        self.discard_calls.append(extra_data)
+        return self.discarded
+
+
+def _create(monkeypatch, repo, gateway):
+    monkeypatch.setattr(manager, "get_gateway", lambda method: gateway)
+    monkeypatch.setattr(manager, "start_polling_if_needed", lambda: None)
+    payments = manager.PaymentManager(session=None)
+    payments.payment_repo = repo
+    return run(payments.create_payment(None, 1, PaymentMethod.CRYPTOBOT, Decimal("100")))
+
+
+def test_remote_payment_is_discarded_when_finalization_loses(monkeypatch):
+    repo, gateway = StubRepo(finalized=False), StubGateway(discarded=True)
+
+    with pytest.raises(ValueError):
+        _create(monkeypatch, repo, gateway)
+
+    assert gateway.discard_calls == [{"invoice_id": 42}]
+    assert repo.revived == []
+
+
+def test_undiscardable_remote_payment_stays_pollable(monkeypatch):
+    repo, gateway = StubRepo(finalized=False), StubGateway(discarded=False)
+
+    with pytest.raises(ValueError):
+        _create(monkeypatch, repo, gateway)
+
+    assert repo.revived == [(5, {"invoice_id": 42})]
+
+
+def test_finalized_payment_is_returned(monkeypatch):
+    repo, gateway = StubRepo(finalized=True), StubGateway(discarded=True)
+
+    result = _create(monkeypatch, repo, gateway)
+
+    assert result.payment_id == 5 and gateway.discard_calls == []
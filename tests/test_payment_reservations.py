@@ -0,0 +1,33 @@
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.payments import PaymentRepository
+from conftest import FakeResult, FakeSession, run
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_reserve_supersedes_in_flight_reservations_under_user_lock():
+    session = FakeSession([1], FakeResult(rowcount=1), [])
+
+    run(PaymentRepository(session).reserve_payment(1, "ton", Decimal("100"), "RUB"))
+
+    lock, supersede, pending = (_sql(s) for s in session.statements)
+    assert lock.startswith("SELECT users.tg_id") and lock.endswith("FOR UPDATE")
+    assert supersede.startswith("UPDATE payments SET status=")
+    assert "payments.status = %(status_1)s" in supersede
+    assert pending.endswith("FOR UPDATE")
+    assert session.commits == 1
+
+
+def test_finalize_locks_the_owner_before_publishing_the_payment():
+    session = FakeSession([], FakeResult(rowcount=0))
+
+    assert not run(PaymentRepository(session).finalize_payment(7, {"invoice_id": 1}))
+
+    lock, publish = (_sql(s) for s in session.statements)
+    assert lock.startswith("SELECT users.tg_id") and lock.endswith("FOR UPDATE")
+    assert publish.startswith("UPDATE payments SET status=")
@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.settings.middlewares.rate_limit import RateLimitMiddleware, RedisRateLimitBackend
+from conftest import run
+
+
+def test_gcra_allows_the_burst_then_blocks(redis):
+    backend = RedisRateLimitBackend(burst=2)
+
+    results = [run(backend.hit(1, "balance", 10)) for _ in range(3)]
+
+    assert results == [True, True, False]
+    assert run(backend.hit(2, "balance", 10))
+
+
+def test_blocked_keys_are_answered_locally_until_retry(redis):
+    backend = RedisRateLimitBackend()
+    assert run(backend.hit(1, "balance", 10))
+    assert not run(backend.hit(1, "balance", 10))
+
+    run(redis.flushall())
+
+    assert not run(backend.hit(1, "balance", 10))
+
+
+def test_gcra_admits_again_after_the_interval(redis):
+    backend = RedisRateLimitBackend()
+    assert run(backend.hit(1, "balance", 0.05))
+    assert not run(backend.hit(1, "balance", 0.05))
+
+    run(asyncio.sleep(0.06))
+
+    assert run(backend.hit(1, "balance", 0.05))
+
+
+def test_callback_ids_share_one_limit_key():
+    limiter = RateLimitMiddleware(custom_limits={"pm:ton": 5})
+
+    assert limiter._get_key(SimpleNamespace(data="dcfg:5")) == "dcfg"
+    assert limiter._get_key(SimpleNamespace(data="amt:ton:500")) == "amt:ton"
+    assert limiter._get_key(SimpleNamespace(data="pm:ton")) == "pm:ton"
+    assert limiter._get_key(SimpleNamespace(text="/start ref_1")) == "/start"
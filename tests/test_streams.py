@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.settings.config import env
+from app.settings.middlewares.lanes import REJECTED
+from app.workers import streams
+from conftest import run
+
+
+def _update(update_id, user_id):
+    return {"update_id": update_id, "message": {"message_id": 1, "date": 0, "chat": {"id": user_id, "type": "private"},
+                                                "from": {"id": user_id, "is_bot": False, "first_name": "u"}, "text": "hi"}}
+
+
+class FakeDispatcher:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.fed = []
+
+    async def feed_update(self, bot, update):
+        self.fed.append(update.update_id)
+        outcome = self.outcomes.get(update.update_id)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def worker(monkeypatch, redis):
+    monkeypatch.setattr(env, "STREAM_PARTITIONS", 1)
+
+    def build(outcomes):
+        w = streams.StreamWorker(FakeDispatcher(outcomes), bot=None, index=0, count=1)
+        run(w._ensure_groups())
+        return w
+
+    return build
+
+
+def _pending(redis):
+    return run(redis.xpending(streams.stream_key(0), streams.GROUP))["pending"]
+
+
+def test_rejected_and_failed_updates_stay_pending(worker, redis):
+    w = worker({2: REJECTED, 3: RuntimeError("boom")})
+    for update_id in (1, 2, 3):
+        run(streams.publish_update(_update(update_id, update_id)))
+
+    run(w._process(run(w._read({streams.stream_key(0): ">"}, None))))
+
+    assert w.processed == 1
+    assert _pending(redis) == 2
+
+
+def test_startup_backlog_walk_does_not_spin_on_failing_updates(worker, redis):
+    w = worker({1: RuntimeError("boom")})
+    run(streams.publish_update(_update(1, 1)))
+    run(w._read({streams.stream_key(0): ">"}, None))
+
+    async def scenario():
+        task = asyncio.create_task(w.run())
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    run(scenario())
+
+    assert w.dp.fed == [1]
+    assert _pending(redis) == 1
+
+
+def test_poisoned_updates_are_dropped_after_max_deliveries(worker, redis, monkeypatch):
+    monkeypatch.setattr(env, "STREAM_MAX_DELIVERIES", 1)
+    w = worker({})
+    run(streams.publish_update(_update(1, 1)))
+    entries = run(w._read({streams.stream_key(0): ">"}, None))
+    run(w._read({streams.stream_key(0): "0"}, None))
+
+    assert run(w._drop_poisoned(entries)) == []
+    assert _pending(redis) == 0
+
+
+def test_ingress_retries_publishing_before_moving_the_offset(monkeypatch):
+    published, offsets = [], []
+    failures = [ConnectionError("redis down")]
+
+    async def publish_update(update):
+        if failures:
+            raise failures.pop()
+        published.append(update["update_id"])
+
+    class FakeUpdate:
+        update_id = 7
+
+        def model_dump(self, **kwargs):
+            return {"update_id": 7}
+
+    class FakeBot:
+        async def get_updates(self, offset, timeout, allowed_updates):
+            offsets.append(offset)
+            if len(offsets) > 1:
+                raise asyncio.CancelledError
+            return [FakeUpdate()]
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(streams, "publish_update", publish_update)
+    monkeypatch.setattr(streams.asyncio, "sleep", no_sleep)
+
+    with pytest.raises(asyncio.CancelledError):
+        run(streams.poll_to_streams(FakeBot(), []))
+
+    assert published == [7]
+    assert offsets == [None, 8]
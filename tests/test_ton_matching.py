@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.payments import PaymentRepository
+from app.models.db import NotificationOutbox
+from conftest import FakeSession, run
+
+
+def _confirmed_row(payment_id, tg_id, amount, tx_hash, balance):
+    return SimpleNamespace(
+        id=payment_id, tg_id=tg_id, amount=Decimal(amount), tx_hash=tx_hash,
+        balance=Decimal(balance), lang="en", subscription_end=datetime.utcnow() + timedelta(days=1),
+    )
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_each_payment_and_transaction_is_matched_once(redis):
+    matches = [(1, "tx-a"), (1, "tx-b"), (2, "tx-a"), (3, "tx-c")]
+    confirmed = [
+        _confirmed_row(1, 10, "100", "tx-a", "100"),
+        _confirmed_row(3, 30, "50", "tx-c", "75"),
+    ]
+    session = FakeSession(matches, [], confirmed)
+
+    result = run(PaymentRepository(session, redis).confirm_ton_matches())
+
+    assert [c.payment_id for c in result] == [1, 3]
+    processed = str(session.statements[1].compile(compile_kwargs={"literal_binds": True}))
+    assert "'tx-a'" in processed and "'tx-c'" in processed and "'tx-b'" not in processed
+    assert session.commits == 1
+    assert run(redis.get("user:10:balance")) == "100"
+    assert run(redis.get("user:30:balance")) == "75"
+
+
+def test_confirmation_credits_and_notifies_in_one_statement(redis):
+    session = FakeSession([(1, "tx-a")], [], [_confirmed_row(1, 10, "100", "tx-a", "100")])
+
+    run(PaymentRepository(session, redis).confirm_ton_matches())
+
+    assert len(session.statements) == 3
+    sql = _sql(session.statements[2])
+    assert sql.startswith("WITH confirmed AS")
+    assert "UPDATE payments" in sql and "UPDATE users" in sql
+    notifications = [obj for obj in session.added if isinstance(obj, NotificationOutbox)]
+    assert [(n.tg_id, n.kind) for n in notifications] == [(10, "payment_success")]
+
+
+def test_no_matches_rolls_back_without_confirming(redis):
+    session = FakeSession([])
+
+    assert run(PaymentRepository(session, redis).confirm_ton_matches()) == []
+    assert len(session.statements) == 1
+    assert session.rollbacks == 1 and session.commits == 0
@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.types import CallbackQuery, User
+
+from app.settings.middlewares.lanes import NAVIGATION, PAYMENTS
+from app.settings.middlewares.user_lock import UserLockMiddleware
+from conftest import run
+
+USER = User(id=1, is_bot=False, first_name="test")
+
+
+def _data(lane=NAVIGATION):
+    return {"event_from_user": USER, "lane": lane}
+
+
+def _callback(data: str) -> CallbackQuery:
+    return CallbackQuery(id="1", from_user=USER, chat_instance="test", data=data)
+
+
+def test_updates_from_one_user_run_one_at_a_time():
+    lock = UserLockMiddleware()
+    active, overlaps = [0], []
+
+    async def handler(event, data):
+        active[0] += 1
+        overlaps.append(active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+
+    async def scenario():
+        await asyncio.gather(*[lock(handler, SimpleNamespace(), _data()) for _ in range(5)])
+
+    run(scenario())
+
+    assert overlaps == [1] * 5
+    assert lock._locks == {} and lock._holders == {}
+
+
+def test_stuck_handler_does_not_block_the_user_forever():
+    lock = UserLockMiddleware(wait_timeout=0.05)
+    done = []
+
+    async def stuck(event, data):
+        await asyncio.sleep(10)
+
+    async def handler(event, data):
+        done.append(event)
+
+    async def scenario():
+        first = asyncio.create_task(lock(stuck, SimpleNamespace(), _data()))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(lock(handler, "second", _data()), 1)
+        first.cancel()
+
+    run(scenario())
+
+    assert done == ["second"]
+
+
+def test_payment_updates_skip_the_user_lock():
+    lock = UserLockMiddleware(wait_timeout=5)
+    order = []
+
+    async def slow(event, data):
+        await asyncio.sleep(0.1)
+        order.append("navigation")
+
+    async def payment(event, data):
+        order.append("payment")
+
+    async def scenario():
+        navigation = asyncio.create_task(lock(slow, SimpleNamespace(), _data()))
+        await asyncio.sleep(0)
+        await lock(payment, SimpleNamespace(), _data(PAYMENTS))
+        await navigation
+
+    run(scenario())
+
+    assert order == ["payment", "navigation"]
+
+
+def test_duplicate_callback_is_dropped_while_the_first_is_in_flight():
+    lock = UserLockMiddleware()
+    calls = []
+
+    async def handler(event, data):
+        calls.append(event.data)
+        await asyncio.sleep(0.05)
+
+    async def scenario():
+        await asyncio.gather(
+            lock(handler, _callback("sub_1m"), _data()),
+            lock(handler, _callback("sub_1m"), _data()),
+            lock(handler, _callback("balance"), _data()),
+        )
+
+    run(scenario())
+
+    assert calls == ["sub_1m", "balance"]
+    assert lock.dropped == 1
+
+
+def test_distributed_lease_is_held_during_the_handler_and_released(redis):
+    lock = UserLockMiddleware(distributed=True, lease_ms=1000)
+    seen = []
+
+    async def handler(event, data):
+        seen.append(await redis.get("lock:user:1"))
+
+    run(lock(handler, _callback("sub_1m"), _data()))
+
+    assert seen and seen[0] is not None
+    assert run(redis.keys("lock:user:*")) == []
+    assert run(redis.keys("inflight:*")) == []
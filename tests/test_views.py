@@ -0,0 +1,48 @@
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageText, SendMessage
+
+from app.settings.middlewares.views import NoopEditMiddleware
+from conftest import run
+
+
+def _request(error=None):
+    calls = []
+
+    async def make_request(bot, method):
+        calls.append(method)
+        if error:
+            raise TelegramBadRequest(method, error)
+        return "message"
+
+    return make_request, calls
+
+
+def test_identical_edits_always_reach_telegram():
+    middleware = NoopEditMiddleware()
+    make_request, calls = _request()
+    edit = EditMessageText(chat_id=1, message_id=2, text="hi")
+
+    assert run(middleware(make_request, None, edit)) == "message"
+    assert run(middleware(make_request, None, edit)) == "message"
+    assert len(calls) == 2
+
+
+def test_not_modified_error_is_absorbed():
+    middleware = NoopEditMiddleware()
+    make_request, _ = _request("Bad Request: message is not modified")
+
+    assert run(middleware(make_request, None, EditMessageText(chat_id=1, message_id=2, text="hi"))) is True
+    assert middleware.not_modified == 1
+
+
+def test_other_errors_propagate():
+    middleware = NoopEditMiddleware()
+    make_request, _ = _request("Bad Request: message is not modified")
+
+    with pytest.raises(TelegramBadRequest):
+        run(middleware(make_request, None, SendMessage(chat_id=1, text="hi")))
+
+    make_request, _ = _request("Bad Request: message to edit not found")
+    with pytest.raises(TelegramBadRequest):
+        run(middleware(make_request, None, EditMessageText(chat_id=1, message_id=2, text="hi")))
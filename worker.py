@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import multiprocessing
+
+from app.settings.log import get_logger, setup_aiogram_logger
+from app.settings.config import env
+from app.settings.utils.warmup import warm_up
+from app.workers.streams import StreamWorker
+
+from app.settings.factory import create_bot, create_dispatcher, create_rate_limiter, startup, shutdown
+
+LOG = get_logger(__name__)
+
+
+async def main(index: int, count: int):
+    setup_aiogram_logger()
+
+    bot = create_bot()
+    await startup(bot)
+
+    dp = create_dispatcher(create_rate_limiter())
+    worker = StreamWorker(dp, bot, index=index, count=count)
+
+    await warm_up(bot)
+
+    try:
+        await worker.run()
+    finally:
+        await shutdown(bot)
+        LOG.info(f"Worker {index} stopped after {worker.processed} updates")
+
+
+def run_worker(index: int, count: int):
+    asyncio.run(main(index, count))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consume bot updates from Redis Streams")
+    parser.add_argument("--index", type=int, default=0, help="worker index when started one process at a time")
+    parser.add_argument("--processes", type=int, default=0, help="spawn this many worker processes")
+    args = parser.parse_args()
+
+    if args.processes:
+        processes = [
+            multiprocessing.Process(target=run_worker, args=(i, args.processes), name=f"worker-{i}")
+            for i in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    else:
+        run_worker(args.index, env.WORKER_COUNT)